@@ -5,9 +5,13 @@
 # This file includes modifications and extensions made by the
 # International Telecommunication Union (ITU) based on the original 
 # work by Intel Corporation.
+import collections
+import hashlib
 import json
 import os
-from typing import List, Optional, Union, Dict, Any
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Union, Dict, Any, AsyncIterator, Iterator
 
 import aiohttp
 import asyncio
@@ -15,7 +19,6 @@ import base64
 import requests
 
 import openai
-from arango import ArangoClient
 from fastapi import Body, File, Form, HTTPException, UploadFile
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_arangodb import ArangoGraph
@@ -35,23 +38,26 @@ from comps import CustomLogger, DocPath, OpeaComponent, OpeaComponentRegistry, S
 
 # Note:- I changed this import from api_protocol to genieai_api_protocol (David)
 from comps.cores.proto.genieai_api_protocol import ArangoDBDataprepRequest, DataprepRequest, ArangoDBDataprepRequestFromDocRepo
+from comps.cores.storages.arango_client import ArangoConnectionManager
+from comps.cores.storages.graph_metadata import GraphMetadataStore, embedding_metadata, metadata_mismatches
+from comps.cores.storages.vector_index import VectorIndexManager
 
 from comps.dataprep.src.utils import ( 
     decode_filename,
     encode_filename,
     get_separators,
-    get_tables_result,
     parse_html,
     save_content_to_local_disk,
 )
 
 # Note:- I replaced the genieai_dataprep_utils.py with the required imports (David)
 from comps.dataprep.src.genieai_dataprep_utils import ( 
-    is_valid_content,
+    validate_chunks,
     docling_document_loader,
     document_loader
 )
 
+from comps.dataprep.src.genieai_table_extractor import collect_table_chunks, start_table_extraction
 from comps.dataprep.src.integrations.arangodb import OpeaArangoDataprep
 
 # Note:- I moved this up to the import above (David)
@@ -111,6 +117,8 @@ HUGGINGFACEHUB_API_TOKEN = os.getenv("HUGGINGFACEHUB_API_TOKEN")
 EMBED_NODES = os.getenv("EMBED_NODES", "true").lower() == "true"
 EMBED_EDGES = os.getenv("EMBED_EDGES", "true").lower() == "true"
 EMBED_CHUNKS = os.getenv("EMBED_CHUNKS", "true").lower() == "true"
+# Distance strategy of the vector indexes built after ingestion (must match the retriever's)
+ARANGO_DISTANCE_STRATEGY = os.getenv("ARANGO_DISTANCE_STRATEGY", "COSINE")
 
 # Guardrail configuration
 GUARDRAIL_URL = os.getenv("GUARDRAIL_URL", "http://guardrail:9090/v1/guardrails")
@@ -138,6 +146,15 @@ EDGE_PROPERTIES = os.getenv("EDGE_PROPERTIES", "description").split(",")
 TEXT_CAPITALIZATION_STRATEGY = os.getenv("TEXT_CAPITALIZATION_STRATEGY", "upper")
 INCLUDE_CHUNKS = os.getenv("INCLUDE_CHUNKS", "true").lower() == "true"
 
+# Graph extraction configuration (concurrent LLMGraphTransformer calls per document)
+GRAPH_EXTRACTION_CONCURRENCY = max(1, int(os.getenv("GRAPH_EXTRACTION_CONCURRENCY", 4)))
+GRAPH_EXTRACTION_TIMEOUT = float(os.getenv("GRAPH_EXTRACTION_TIMEOUT", VLLM_TIMEOUT))
+
+# Chunking configuration: text is split in windows of this many characters
+CHUNK_WINDOW_SIZE = max(1000, int(os.getenv("CHUNK_WINDOW_SIZE", 100000)))
+# New chunks are screened, guardrail-checked and labelled in batches of this size
+CHUNK_STREAM_BATCH = max(1, int(os.getenv("CHUNK_STREAM_BATCH", 256)))
+
 # Content Extraction Configuration ("opea" or "docling") - only affects PDFs
 CONTENT_EXTRACTION_METHOD = os.getenv("CONTENT_EXTRACTION_METHOD", "opea") 
 
@@ -165,6 +182,25 @@ class GenieArangoDataprep(OpeaArangoDataprep):
         # Place to add any additional attributes for GenieArangoDataprep
         self.custom_attribute = "custom_value"
 
+        # Graphs whose retraction indexes were already created and verified
+        self._indexed_graphs = set()
+
+        # Vector indexes of the embedded collections, (re)built in the background after ingestion
+        self.vector_indexes = VectorIndexManager(self.db)
+
+        # Embedding model/dimension recorded per graph, checked by the retriever
+        self.graph_metadata = GraphMetadataStore(self.db)
+        self._embedding_metadata = None
+
+    def _initialize_client(self):
+        """Use the ArangoDB connection shared by the ArangoDB components of the process (see arango_client.py)."""
+        self.client = ArangoConnectionManager.get_client(ARANGO_URL)
+        self.db = ArangoConnectionManager.get_db(ARANGO_URL, ARANGO_DB_NAME, ARANGO_USERNAME, ARANGO_PASSWORD)
+
+    def check_health(self) -> bool:
+        """Checks the health of the dataprep service and of the ArangoDB coordinators."""
+        return ArangoConnectionManager.check_health(self.db, ARANGO_URL)
+
     
     async def get_auth_token(self):
         """Get admin auth token"""
@@ -234,131 +270,129 @@ class GenieArangoDataprep(OpeaArangoDataprep):
         return chunk_embedding
 
     
-    async def _load_and_chunk_document(self, doc_path: DocPath) -> List[str]:
+    async def _load_document_content(self, doc_path: DocPath) -> Any:
         """
-        Load a document from disk and split it into plain text chunks.
+        Load a document from disk with the configured extractor.
 
-        Returns:
-            plain_chunks: List[str] -- list of chunk text strings.
-            Returns an empty list on fatal error (file empty / unreadable).
+        Returns the text (or, for structured files, the list of rows/records),
+        or None when the file is empty or could not be read.
         """
         path = doc_path.path
         if logflag:
-            logger.debug(f"[_load_and_chunk_document] Parsing document {path}")
-
-        # choose a sensible splitter depending on file type
-        if path.endswith(".html"):
-            headers_to_split_on = [("h1", "Header 1"), ("h2", "Header 2"), ("h3", "Header 3")]
-            text_splitter = HTMLHeaderTextSplitter(headers_to_split_on=headers_to_split_on)
-        else:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=doc_path.chunk_size,
-                chunk_overlap=doc_path.chunk_overlap,
-                add_start_index=True,
-                separators=get_separators(),
-            )
+            logger.debug(f"[_load_document_content] Parsing document {path}")
 
         # load content (PDFs may use docling)
         if path.endswith(".pdf") and CONTENT_EXTRACTION_METHOD == "docling":
             if logflag:
-                logger.info("[_load_and_chunk_document] Using docling_document_loader for PDF")
+                logger.info("[_load_document_content] Using docling_document_loader for PDF")
             content = await docling_document_loader(path)
         else:
             if logflag:
-                logger.info("[_load_and_chunk_document] Using document_loader")
+                logger.info("[_load_document_content] Using document_loader")
             content = await document_loader(path)
 
         if logflag:
-            logger.debug(f"[_load_and_chunk_document] content preview: {str(content)[:500]}...")
+            logger.debug(f"[_load_document_content] content preview: {str(content)[:500]}...")
 
         # empty content -> fail early
-        if isinstance(content, str) and len(content) == 0:
+        if content is None or (isinstance(content, str) and len(content) == 0):
             logger.error(f"File {path} is empty or could not be read.")
-            return []
+            return None
+        return content
+
+    def _iter_chunks(self, doc_path: DocPath, content: Any) -> Iterator[str]:
+        """
+        Split loaded content into plain text chunks, lazily and in a single pass.
+
+        Text is split window by window (CHUNK_WINDOW_SIZE characters, cut at a
+        paragraph or line break), so the chunk lists of a huge document are never
+        built at once. A chunk still longer than chunk_size is re-split on its own
+        instead of re-splitting the whole document. Structured files (the loader
+        returns rows/records) are chunked row by row.
+
+        PDF table chunks are not part of it: they come from the background table
+        pass (start_table_extraction) and are appended by the caller.
+        """
+        path = doc_path.path
+        chunk_size = doc_path.chunk_size
+
+        # choose a sensible splitter depending on file type
+        is_html = path.endswith(".html")
+        if is_html:
+            headers_to_split_on = [("h1", "Header 1"), ("h2", "Header 2"), ("h3", "Header 3")]
+            text_splitter = HTMLHeaderTextSplitter(headers_to_split_on=headers_to_split_on)
+        else:
+            text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=doc_path.chunk_overlap,
+                add_start_index=True,
+                separators=get_separators(),
+            )
+        # enforces chunk_size on the (rare) segments the first splitter could not break
+        fallback_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=min(doc_path.chunk_overlap, chunk_size // 2),
+            separators=get_separators(),
+        )
+
+        def bounded(pieces):
+            for piece in pieces:
+                text = piece.page_content if hasattr(piece, "page_content") else str(piece)
+                if len(text) > chunk_size:
+                    yield from fallback_splitter.split_text(text)
+                else:
+                    yield text
 
         # handle structured types (the loader returns a list of items)
         structured_types = [".xlsx", ".csv", ".json", "jsonl", ".xls"]
         _, ext = os.path.splitext(path)
 
-        # chunk the content
         if ext in structured_types and isinstance(content, list):
             # content already as list of string-like rows/records
-            chunks: List[Any] = content
-            new_chunks: List[str] = []
-            for chunk in chunks:
-                # some elements may already be large strings; split further if needed
-                chunk_text = chunk if isinstance(chunk, str) else str(chunk)
-                if len(chunk_text) > doc_path.chunk_size:
-                    split_items = text_splitter.split_text(chunk_text)
-                    # split_text may return list of Document-like objects or strings
-                    for s in split_items:
-                        new_chunks.append(s.page_content if hasattr(s, "page_content") else str(s))
+            for row in content:
+                row_text = row if isinstance(row, str) else str(row)
+                if len(row_text) > chunk_size:
+                    yield from bounded(text_splitter.split_text(row_text))
                 else:
-                    new_chunks.append(chunk_text)
-            chunks = new_chunks
+                    yield row_text
+        elif is_html or not isinstance(content, str):
+            # header splitting needs the whole HTML document
+            yield from bounded(text_splitter.split_text(content if isinstance(content, str) else str(content)))
         else:
-            # standard text chunking path
-            raw_chunks = text_splitter.split_text(content)
-            # check if any chunk exceeded configured chunk size -> fall back to smaller chunk size
-            too_large = False
-            for c in raw_chunks:
-                chunk_content = c.page_content if hasattr(c, "page_content") else str(c)
-                if len(chunk_content) > doc_path.chunk_size:
-                    too_large = True
-                    break
-
-            if too_large:
-                # create a safer splitter (smaller chunk size) and re-split
-                smaller_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=500,  # safe fallback
-                    chunk_overlap=doc_path.chunk_overlap,
-                    add_start_index=True,
-                    separators=get_separators(),
-                )
-                raw_chunks = smaller_splitter.split_text(content)
-
-            # normalize to plaintext strings
-            chunks = [c.page_content if hasattr(c, "page_content") else str(c) for c in raw_chunks]
-
-        # append extracted table chunks if requested and available
-        if getattr(doc_path, "process_table", False) and path.endswith(".pdf"):
-            try:
-                table_chunks = get_tables_result(path, doc_path.table_strategy)
-                if isinstance(table_chunks, list):
-                    chunks.extend(table_chunks)
-            except Exception as e:
-                logger.warning(f"Failed to extract table chunks: {e}")
-
-        # now ensure all chunks are strings
-        plain_chunks: List[str] = [c if isinstance(c, str) else str(c) for c in chunks]
-
-        if logflag:
-            logger.info(f"[_load_and_chunk_document] Created {len(plain_chunks)} plain chunks.")
-            if len(plain_chunks) > 0 and logflag:
-                logger.debug(f"[_load_and_chunk_document] first chunk preview: {plain_chunks[0][:300]}...")
-
-        # validate content: guard against base64/web-archive noise
-        valid_chunks = 0
-        for i, chunk in enumerate(plain_chunks):
-            try:
-                if is_valid_content(chunk):
-                    valid_chunks += 1
-                else:
-                    logger.warning(f"Chunk {i} is not valid content (possible binary/web archive/base64).")
-            except Exception as e:
-                logger.warning(f"is_valid_content raised for chunk {i}: {e}")
-
-        # Avoid division by zero
-        if len(plain_chunks) == 0:
-            logger.error(f"No chunks produced for file {path}.")
-            return []
-
-        valid_ratio = valid_chunks / len(plain_chunks)
-        if valid_ratio < 0.2:
-            logger.error(f"Less than 20% ({valid_ratio:.2f}) of chunks are valid. Aborting.")
-            return []
-
-        return plain_chunks
+            window = max(CHUNK_WINDOW_SIZE, chunk_size * 4)
+            start = 0
+            while start < len(content):
+                end = min(len(content), start + window)
+                if end < len(content):
+                    cut = content.rfind("\n\n", start, end)
+                    if cut <= start:
+                        cut = content.rfind("\n", start, end)
+                    if cut > start:
+                        end = cut
+                yield from bounded(text_splitter.split_text(content[start:end]))
+                start = end
+
+    async def _iter_document_chunks(self, doc_path: DocPath, content: Any, table_task=None) -> AsyncIterator[str]:
+        """Text chunks of the document, then the table chunks of the background table pass (if any)."""
+        for chunk in self._iter_chunks(doc_path, content):
+            yield chunk
+        for table_chunk in await collect_table_chunks(table_task):
+            yield table_chunk if isinstance(table_chunk, str) else str(table_chunk)
+
+    @staticmethod
+    def _screen_chunks(chunks: List[str]) -> int:
+        """Number of valid chunks (guard against base64/web-archive noise)."""
+        try:
+            validity = validate_chunks(chunks)
+        except Exception as e:
+            logger.warning(f"validate_chunks raised: {e}")
+            return 0
+        invalid = [i for i, ok in enumerate(validity) if not ok]
+        if invalid:
+            logger.warning(
+                f"{len(invalid)} chunks are not valid content (possible binary/web archive/base64): {invalid[:20]}"
+            )
+        return len(validity) - len(invalid)
 
     async def _run_guardrail_check(self, plain_chunks: List[str]) -> Dict[str, Any]:
         """
@@ -510,29 +544,113 @@ class GenieArangoDataprep(OpeaArangoDataprep):
             raise ValueError(f"Unknown labelling method: {labelling_method}")
 
     
-    async def _insert_documents_to_graph(self, graph, graph_name, labelled_documents, include_chunks=True, **kwargs):
-        for i, doc in enumerate(labelled_documents):
-            document = Document(
-                page_content=doc["text"],
-                metadata={
-                    "file_id": kwargs["file_id"],
-                    "file_path": kwargs["storage_path"],
-                    "chunk_index": i,
-                    "chunk_labels": doc["labels"],
-                },
-            )
-            if OPENAI_CHAT_ENABLED:
+    @staticmethod
+    async def _report_progress(progress, stage: str, **details):
+        """Forward pipeline progress to an optional callback (used by background ingestion jobs)."""
+        if progress is None:
+            return
+        try:
+            await progress(stage, **details)
+        except Exception as e:
+            logger.warning(f"Failed to report progress for stage {stage}: {e}")
+
+
+    async def _extract_graph_documents(self, documents: List[Document], progress=None) -> Dict[str, Any]:
+        """
+        Run LLM graph extraction for all chunk documents concurrently.
+
+        Uses the transformer's async API with at most GRAPH_EXTRACTION_CONCURRENCY
+        calls in flight. A chunk whose extraction fails or exceeds
+        GRAPH_EXTRACTION_TIMEOUT falls back to chunk-only ingestion.
+
+        Returns:
+            {"graph_documents": List[GraphDocument] (same order as documents),
+             "metrics": {...}}
+        """
+        semaphore = asyncio.Semaphore(GRAPH_EXTRACTION_CONCURRENCY)
+        counters = {"timeouts": 0, "failures": 0, "done": 0}
+
+        async def extract(i: int, document: Document) -> GraphDocument:
+            async with semaphore:
                 try:
-                    graph_doc = self.llm_transformer.process_response(document)
+                    graph_doc = await asyncio.wait_for(
+                        self.llm_transformer.aprocess_response(document),
+                        timeout=GRAPH_EXTRACTION_TIMEOUT,
+                    )
+                    await done()
+                    return graph_doc
+                except asyncio.TimeoutError:
+                    counters["timeouts"] += 1
+                    logger.warning(
+                        f"LLM Graph Extraction timed out after {GRAPH_EXTRACTION_TIMEOUT}s for chunk {i}. "
+                        "Falling back to chunk-only ingestion."
+                    )
                 except Exception as e:
+                    counters["failures"] += 1
                     logger.warning(f"LLM Graph Extraction failed for chunk {i}: {e}. Falling back to chunk-only ingestion.")
-                    # Fallback: Create a GraphDocument with just the source document, no extracted nodes/edges
-                    graph_doc = GraphDocument(nodes=[], relationships=[], source=document)
-            else:
-                if logflag:
-                    logger.info(f"Skipping LLM Graph Extraction for chunk {i} (OPENAI_CHAT_ENABLED=False).")
-                graph_doc = GraphDocument(nodes=[], relationships=[], source=document)
+                # Fallback: Create a GraphDocument with just the source document, no extracted nodes/edges
+                await done()
+                return GraphDocument(nodes=[], relationships=[], source=document)
+
+        async def done():
+            counters["done"] += 1
+            await self._report_progress(progress, "graph_extraction", done=counters["done"], total=len(documents))
+
+        start = time.perf_counter()
+        graph_docs = await asyncio.gather(*(extract(i, d) for i, d in enumerate(documents)))
+        elapsed = time.perf_counter() - start
+
+        metrics = {
+            "chunks": len(documents),
+            "concurrency": GRAPH_EXTRACTION_CONCURRENCY,
+            "seconds": round(elapsed, 3),
+            "chunks_per_second": round(len(documents) / elapsed, 3) if elapsed > 0 else None,
+            "timeouts": counters["timeouts"],
+            "fallbacks": counters["timeouts"] + counters["failures"],
+        }
+        logger.info(
+            f"[ graph extraction ] {metrics['chunks']} chunks in {metrics['seconds']}s "
+            f"({metrics['chunks_per_second']} chunks/s, concurrency={GRAPH_EXTRACTION_CONCURRENCY}, "
+            f"fallbacks={metrics['fallbacks']})"
+        )
+        return {"graph_documents": list(graph_docs), "metrics": metrics}
 
+
+    async def _insert_documents_to_graph(self, graph, graph_name, labelled_documents, include_chunks=True, progress=None, **kwargs):
+        """
+        Extract graph documents for all labelled chunks and insert them into ArangoDB.
+
+        Returns the graph extraction throughput metrics (None when extraction is disabled).
+        """
+        documents = []
+        for i, doc in enumerate(labelled_documents):
+            chunk_hash = doc.get("chunk_hash") or self._chunk_hash(doc["text"])
+            documents.append(
+                Document(
+                    # Content-addressed id: the chunk key only changes when the chunk text changes
+                    id=f"{kwargs['file_id']}:{chunk_hash}",
+                    page_content=doc["text"],
+                    metadata={
+                        "file_id": kwargs["file_id"],
+                        "file_path": kwargs["storage_path"],
+                        "chunk_index": doc.get("chunk_index", i),
+                        "chunk_hash": chunk_hash,
+                        "chunk_labels": doc["labels"],
+                    },
+                )
+            )
+
+        metrics = None
+        if OPENAI_CHAT_ENABLED:
+            extraction = await self._extract_graph_documents(documents, progress=progress)
+            graph_docs = extraction["graph_documents"]
+            metrics = extraction["metrics"]
+        else:
+            if logflag:
+                logger.info("Skipping LLM Graph Extraction for all chunks (OPENAI_CHAT_ENABLED=False).")
+            graph_docs = [GraphDocument(nodes=[], relationships=[], source=document) for document in documents]
+
+        for i, graph_doc in enumerate(graph_docs):
             graph.add_graph_documents(
                 graph_documents=[graph_doc],
                 include_source=include_chunks,
@@ -549,46 +667,504 @@ class GenieArangoDataprep(OpeaArangoDataprep):
                 capitalization_strategy=kwargs.get("text_capitalization_strategy", "none"),
             )
             logger.info(f"Chunk {i}: processed and inserted.")
+            await self._report_progress(progress, "graph_insertion", done=i + 1, total=len(graph_docs))
+
+        return metrics
+
+
+    @staticmethod
+    def _chunk_hash(text: str) -> str:
+        """Content hash used to address a chunk within a file."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+    def _ingest_fingerprint(self, doc_path: DocPath, all_labels=None, **kwargs) -> str:
+        """
+        Fingerprint of every setting that shapes the stored chunks besides their text.
+        Chunks from a previous ingestion are only reused when the fingerprint matches.
+        """
+        settings = {
+            "chunk_size": doc_path.chunk_size,
+            "chunk_overlap": doc_path.chunk_overlap,
+            "chunk_window_size": CHUNK_WINDOW_SIZE,
+            "process_table": getattr(doc_path, "process_table", False),
+            "table_strategy": getattr(doc_path, "table_strategy", None),
+            "content_extraction_method": CONTENT_EXTRACTION_METHOD,
+            "labeling_strategy": LABELING_STRATEGY,
+            "labels": sorted(all_labels or []),
+            "text_capitalization_strategy": kwargs.get("text_capitalization_strategy"),
+            "include_chunks": kwargs.get("include_chunks"),
+            "embed_chunks": kwargs.get("embed_chunks"),
+            "embed_nodes": kwargs.get("embed_nodes"),
+            "embed_edges": kwargs.get("embed_edges"),
+            "embed_model": TEI_EMBED_MODEL,
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+    def _manifest_collection(self, graph_name: str, create: bool = True):
+        """Return the per-graph file manifest collection, creating it if needed."""
+        name = f"{graph_name}_FILE_MANIFEST"
+        if not self.db.has_collection(name):
+            if not create:
+                return None
+            self.db.create_collection(name)
+        return self.db.collection(name)
+
+
+    @staticmethod
+    def _manifest_key(file_id: str) -> str:
+        # file ids come from the document repository and may contain characters not allowed in _key
+        return hashlib.sha1(file_id.encode("utf-8")).hexdigest()
+
+
+    def _get_file_manifest(self, graph_name: str, file_id: str) -> Optional[Dict[str, Any]]:
+        collection = self._manifest_collection(graph_name, create=False)
+        if collection is None:
+            return None
+        return collection.get(self._manifest_key(file_id))
+
+
+    def _save_file_manifest(self, graph_name: str, file_id: str, chunk_hashes: List[str], fingerprint: str):
+        collection = self._manifest_collection(graph_name)
+        collection.insert(
+            {
+                "_key": self._manifest_key(file_id),
+                "file_id": file_id,
+                "chunk_hashes": chunk_hashes,
+                "chunk_count": len(chunk_hashes),
+                "fingerprint": fingerprint,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            },
+            overwrite=True,
+        )
+
+
+    def _graph_collection_names(self, graph_name: str) -> Dict[str, str]:
+        return {
+            "source": f"{graph_name}_SOURCE",
+            "entity": f"{graph_name}_ENTITY",
+            "has_source": f"{graph_name}_HAS_SOURCE",
+            "links_to": f"{graph_name}_LINKS_TO",
+        }
+
+
+    def _ensure_graph_indexes(self, graph_name: str):
+        """
+        Create (idempotently) and verify the indexes used by chunk retraction:
+        - SOURCE: persistent index on (file_id, chunk_hash)
+        - HAS_SOURCE / LINKS_TO: the built-in edge index on _from/_to
+        Collections that do not exist yet (e.g. LINKS_TO for documents without relations)
+        are skipped and handled by a later call; a graph is only remembered as verified
+        once all of its collections exist.
+        """
+        if graph_name in self._indexed_graphs:
+            return
+
+        names = self._graph_collection_names(graph_name)
+        existing = {name for name in names.values() if self.db.has_collection(name)}
+
+        required = {
+            names["source"]: [["file_id", "chunk_hash"]],
+        }
+        for collection_name, field_sets in required.items():
+            if collection_name not in existing:
+                continue
+            collection = self.db.collection(collection_name)
+            for fields in field_sets:
+                collection.add_index(
+                    {
+                        "type": "persistent",
+                        "fields": fields,
+                        "name": f"idx_{'_'.join(fields)}",
+                        "sparse": False,
+                        "unique": False,
+                    }
+                )
+
+        for collection_name in existing:
+            indexes = self.db.collection(collection_name).indexes()
+            for fields in required.get(collection_name, []):
+                if not any(idx["type"] == "persistent" and idx["fields"][: len(fields)] == fields for idx in indexes):
+                    raise RuntimeError(f"Missing persistent index on {fields} in {collection_name}")
+            if collection_name in (names["has_source"], names["links_to"]):
+                if not any(idx["type"] == "edge" for idx in indexes):
+                    raise RuntimeError(f"Missing edge index on {collection_name}")
+
+        if len(existing) == len(names):
+            self._indexed_graphs.add(graph_name)
+        if logflag:
+            logger.info(f"Verified retraction indexes for graph {graph_name} ({len(existing)}/{len(names)} collections).")
+
+
+    def _schedule_vector_index_checks(self, graph_name: str, **kwargs):
+        """Let the vector indexes of the embedded collections follow their growth (built in the background)."""
+        names = self._graph_collection_names(graph_name)
+        embedded = {"source": "embed_chunks", "entity": "embed_nodes", "links_to": "embed_edges"}
+        for kind, flag in embedded.items():
+            if kwargs.get(flag):
+                self.vector_indexes.schedule_check(names[kind], ARANGO_DISTANCE_STRATEGY, force=True)
+
+    async def _check_graph_metadata(self, graph_name: str):
+        """
+        Record the embedding model of a graph on its first ingestion, and refuse to add
+        embeddings of another model (or dimension) to a graph. A graph embedded before its
+        metadata was recorded is only checked against the dimension of a stored embedding,
+        and stays without metadata.
+        """
+        if self._embedding_metadata is None:
+            if not hasattr(self, "embeddings") or self.embeddings is None:
+                self._initialize_embeddings()
+            model_id = OPENAI_EMBED_MODEL if isinstance(self.embeddings, OpenAIEmbeddings) else TEI_EMBED_MODEL
+            # one embedding gives the dimension and whether the model normalises its vectors
+            probe = await asyncio.to_thread(self.embeddings.embed_query, "embedding metadata probe")
+            self._embedding_metadata = embedding_metadata(model_id, probe, ARANGO_DISTANCE_STRATEGY)
+
+        stored = self.graph_metadata.get(graph_name)
+        if stored is None:
+            dimension = self._stored_embedding_dimension(graph_name)
+            if dimension is not None:
+                # embedded before metadata was recorded: the model is unknown, only the dimension can be checked
+                if dimension != self._embedding_metadata["embedding_dimension"]:
+                    raise HTTPException(
+                        status_code=409,
+                        detail=f"Graph '{graph_name}' was embedded with another model (embedding_dimension: "
+                        f"stored {dimension}, current {self._embedding_metadata['embedding_dimension']}). "
+                        f"Delete the graph or ingest into a new one.",
+                    )
+                return
+            # returns the document of another process that recorded the graph first
+            stored = self.graph_metadata.save(graph_name, self._embedding_metadata)
+        mismatches = metadata_mismatches(stored, self._embedding_metadata)
+        if mismatches:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Graph '{graph_name}' was embedded with another model ({'; '.join(mismatches)}). "
+                f"Delete the graph or ingest into a new one.",
+            )
+
+    def _stored_embedding_dimension(self, graph_name: str) -> Optional[int]:
+        """Length of one embedding already stored in the graph collections, None if nothing is embedded yet."""
+        names = self._graph_collection_names(graph_name)
+        for kind in ("source", "entity", "links_to"):
+            if not self.db.has_collection(names[kind]):
+                continue
+            cursor = self.db.aql.execute(
+                """
+                FOR doc IN @@collection
+                    FILTER IS_LIST(doc.embedding)
+                    LIMIT 1
+                    RETURN LENGTH(doc.embedding)
+                """,
+                bind_vars={"@collection": names[kind]},
+            )
+            dimensions = list(cursor)
+            if dimensions:
+                return dimensions[0]
+        return None
+
+    def _begin_graph_transaction(self, graph_name: str):
+        """Start a stream transaction writing to the existing graph collections and the file manifest."""
+        names = list(self._graph_collection_names(graph_name).values()) + [f"{graph_name}_FILE_MANIFEST"]
+        return self.db.begin_transaction(write=[name for name in names if self.db.has_collection(name)])
+
+
+    def _remove_chunks(self, db, graph_name: str, chunk_ids: List[str]) -> Dict[str, int]:
+        """
+        Remove the given chunks together with the graph data derived from them:
+        their HAS_SOURCE edges, the entities left without any source and the
+        LINKS_TO edges touching those entities. A LINKS_TO edge is keyed by its
+        relation text and shared by every chunk (of any file) stating it, so it is
+        only removed with one of its entities. Only the neighbourhood of the chunks
+        is touched; every lookup is served by the edge index or the indexes from
+        _ensure_graph_indexes. `db` is usually a stream transaction.
+
+        Steps on collections that do not exist (e.g. ENTITY / LINKS_TO of a graph
+        built without relations) are skipped.
+        """
+        if not chunk_ids:
+            return {"chunks": 0, "entities": 0, "relations": 0}
+
+        names = self._graph_collection_names(graph_name)
+        existing = {kind for kind, name in names.items() if self.db.has_collection(name)}
+        source_col = names["source"]
+        entity_col = names["entity"]
+        has_source_col = names["has_source"]
+        links_to_col = names["links_to"]
+        chunk_keys = [chunk_id.split("/", 1)[-1] for chunk_id in chunk_ids]
+
+        # 1. HAS_SOURCE edges of the chunks, remembering the entities they came from
+        entity_ids = []
+        if "has_source" in existing:
+            entity_ids = list(set(db.aql.execute(
+                f"""
+                FOR chunk_id IN @chunk_ids
+                    FOR hs IN {has_source_col}
+                        FILTER hs._to == chunk_id
+                        REMOVE hs IN {has_source_col}
+                        RETURN OLD._from
+                """,
+                bind_vars={"chunk_ids": chunk_ids},
+            )))
+
+        # 2. Entities of those chunks that no longer have any source
+        orphan_ids = []
+        if entity_ids and "entity" in existing:
+            orphan_ids = list(db.aql.execute(
+                f"""
+                FOR entity_id IN @entity_ids
+                    FILTER LENGTH(
+                        FOR hs IN {has_source_col}
+                            FILTER hs._from == entity_id
+                            LIMIT 1
+                            RETURN 1
+                    ) == 0
+                    RETURN entity_id
+                """,
+                bind_vars={"entity_ids": entity_ids},
+            ))
+
+        # 3. Relations touching the orphans, then the orphans themselves
+        removed_relations = []
+        if orphan_ids and "links_to" in existing:
+            removed_relations = list(db.aql.execute(
+                f"""
+                FOR entity_id IN @orphan_ids
+                    FOR l IN {links_to_col}
+                        FILTER l._from == entity_id OR l._to == entity_id
+                        REMOVE l IN {links_to_col} OPTIONS {{ ignoreErrors: true }}
+                        RETURN 1
+                """,
+                bind_vars={"orphan_ids": orphan_ids},
+            ))
+        if orphan_ids:
+            db.aql.execute(
+                f"""
+                FOR entity_id IN @orphan_ids
+                    REMOVE PARSE_IDENTIFIER(entity_id).key IN {entity_col} OPTIONS {{ ignoreErrors: true }}
+                """,
+                bind_vars={"orphan_ids": orphan_ids},
+            )
+
+        # 4. The chunks themselves
+        db.aql.execute(
+            f"""
+            FOR chunk_key IN @chunk_keys
+                REMOVE chunk_key IN {source_col} OPTIONS {{ ignoreErrors: true }}
+            """,
+            bind_vars={"chunk_keys": chunk_keys},
+        )
+
+        return {"chunks": len(chunk_ids), "entities": len(orphan_ids), "relations": len(removed_relations)}
+
+
+    def _remove_file_chunks(self, graph_name: str, file_id: str, chunk_hashes: List[str]) -> Dict[str, int]:
+        """Remove the chunks of a file identified by their content hashes, in one stream transaction."""
+        if not chunk_hashes:
+            return {"chunks": 0, "entities": 0, "relations": 0}
+        self._ensure_graph_indexes(graph_name)
+        txn_db = self._begin_graph_transaction(graph_name)
+        try:
+            chunk_ids = list(txn_db.aql.execute(
+                f"""
+                FOR s IN {graph_name}_SOURCE
+                    FILTER s.file_id == @file_id AND s.chunk_hash IN @chunk_hashes
+                    RETURN s._id
+                """,
+                bind_vars={"file_id": file_id, "chunk_hashes": list(chunk_hashes)},
+            ))
+            removed = self._remove_chunks(txn_db, graph_name, chunk_ids)
+            txn_db.commit_transaction()
+        except Exception:
+            txn_db.abort_transaction()
+            raise
+        return removed
+
+
+    def _reindex_file_chunks(self, graph_name: str, file_id: str, positions: Dict[str, int]):
+        """Update chunk_index of retained chunks to their position in the new revision."""
+        if not positions:
+            return
+        self.db.aql.execute(
+            f"""
+            FOR s IN {graph_name}_SOURCE
+                FILTER s.file_id == @file_id AND HAS(@positions, s.chunk_hash)
+                FILTER s.chunk_index != @positions[s.chunk_hash]
+                UPDATE s WITH {{ chunk_index: @positions[s.chunk_hash] }} IN {graph_name}_SOURCE
+            """,
+            bind_vars={"file_id": file_id, "positions": positions},
+        )
 
 
     async def ingest_data_to_arango_with_guardrail(self, doc_path: DocPath, file_id: str, storage_path: str, graph_name: str, **kwargs):
-        """Ingest document to ArangoDB with chunking, guardrails, labelling, and graph insertion."""
+        """
+        Ingest document to ArangoDB with chunking, guardrails, labelling, and graph insertion.
+
+        Chunks are content-addressed and recorded in a per-file manifest. Re-ingesting a
+        file only processes chunks whose hash is new and removes chunks that disappeared,
+        as long as the ingestion settings (see _ingest_fingerprint) are unchanged.
 
-        # --- 1. Load and chunk document ---
-        plain_chunks = await self._load_and_chunk_document(doc_path)
-        if not plain_chunks:
+        An optional `progress` coroutine callback (stage, **details) receives per-stage progress.
+        """
+        progress = kwargs.pop("progress", None)
+
+        # --- 1. Load document ---
+        await self._report_progress(progress, "load_and_chunk")
+        # PDF tables are extracted in a worker process while the text is loaded and chunked
+        table_task = start_table_extraction(doc_path)
+        content = await self._load_document_content(doc_path)
+        if content is None:
+            if table_task is not None:
+                table_task.cancel()
             return {"success": False, "message": "No valid chunks generated."}
 
-        # --- 2. Guardrail check ---
-        if GUARDRAIL_ENABLED:
-            passed = await self._run_guardrail_check(plain_chunks)
-            if not passed["success"]:
-                return passed
+        # --- 2. Previous revision of the file ---
+        fingerprint = self._ingest_fingerprint(doc_path, **kwargs)
+        manifest = self._get_file_manifest(graph_name, file_id)
+
+        removed = {"chunks": 0, "entities": 0, "relations": 0}
+        previous_hashes = set()
+        # Settings changed: stored chunks cannot be reused, start from scratch
+        settings_changed = bool(manifest) and manifest.get("fingerprint") != fingerprint
+        if manifest and not settings_changed:
+            previous_hashes = set(manifest.get("chunk_hashes", []))
+
+        # --- 3. Stream chunks: diff and screening, then guardrail check and labelling per batch ---
+        # The valid-chunk ratio of the whole file is known before any guardrail or
+        # labelling LLM call, so rejected files cost no LLM calls. Only new/changed
+        # chunks are kept (and go through the guardrail and labelling); nothing is
+        # written to the graph before every chunk of the file has been processed.
+        chunk_count = 0
+        valid_chunks = 0
+        positions: Dict[str, int] = {}
+        new_indices: List[int] = []
+        labelled_documents: List[Dict[str, Any]] = []
+        screen_batch: List[str] = []
+        new_chunks: collections.deque = collections.deque()
+
+        async def process_new_batch(batch: List[tuple]):
+            indices = [i for i, _, _ in batch]
+            hashes = [h for _, h, _ in batch]
+            texts = [t for _, _, t in batch]
+            if GUARDRAIL_ENABLED:
+                passed = await self._run_guardrail_check(texts)
+                if not passed["success"]:
+                    if passed.get("chunk_index") is not None:
+                        passed["chunk_index"] = indices[passed["chunk_index"]]
+                    return passed
+            labelled = await self._label_chunks(
+                plain_chunks=texts,
+                all_labels=kwargs["all_labels"],
+                labelling_method=LABELING_STRATEGY
+            )
+            for doc, i, chunk_hash in zip(labelled, indices, hashes):
+                doc["chunk_index"] = i
+                doc["chunk_hash"] = chunk_hash
+            labelled_documents.extend(labelled)
+            await self._report_progress(
+                progress, "chunk_processing", chunks=chunk_count, new_chunks=len(new_indices),
+                labelled=len(labelled_documents),
+            )
+            return None
+
+        async for chunk in self._iter_document_chunks(doc_path, content, table_task):
+            i = chunk_count
+            chunk_count += 1
+            screen_batch.append(chunk)
+            if len(screen_batch) >= CHUNK_STREAM_BATCH:
+                valid_chunks += self._screen_chunks(screen_batch)
+                screen_batch = []
+
+            chunk_hash = self._chunk_hash(chunk)
+            if chunk_hash in positions:
+                continue  # identical chunk repeated in the file, stored once
+            positions[chunk_hash] = i
+            if chunk_hash not in previous_hashes:
+                new_indices.append(i)
+                new_chunks.append((i, chunk_hash, chunk))
+
+        if screen_batch:
+            valid_chunks += self._screen_chunks(screen_batch)
+        if chunk_count == 0:
+            logger.error(f"No chunks produced for file {doc_path.path}.")
+            return {"success": False, "message": "No valid chunks generated."}
+        valid_ratio = valid_chunks / chunk_count
+        if valid_ratio < 0.2:
+            logger.error(f"Less than 20% ({valid_ratio:.2f}) of chunks are valid. Aborting.")
+            return {"success": False, "message": "No valid chunks generated."}
 
-        # --- 3. Initialize graph ---
-        graph = ArangoGraph(db=self.db, generate_schema_on_init=False)
+        while new_chunks:
+            # batches leave the deque as they are labelled, so each chunk text is held once
+            batch = [new_chunks.popleft() for _ in range(min(CHUNK_STREAM_BATCH, len(new_chunks)))]
+            failed = await process_new_batch(batch)
+            if failed:
+                return failed
 
-        # --- 4. Apply labelling strategy ---
-        labelled_documents = await self._label_chunks(
-            plain_chunks=plain_chunks,
-            all_labels=kwargs["all_labels"],
-            labelling_method=LABELING_STRATEGY
+        stale_hashes = previous_hashes - positions.keys()
+        unchanged_count = len(positions) - len(new_indices)
+
+        await self._report_progress(progress, "diff", chunks=chunk_count, new_chunks=len(new_indices))
+        logger.info(
+            f"file_id={file_id}: {len(new_indices)} new/changed chunks, "
+            f"{len(stale_hashes)} stale chunks, {unchanged_count} unchanged chunks."
         )
 
+        if manifest and not new_indices and not stale_hashes:
+            return {
+                "success": True,
+                "message": "File unchanged, nothing to ingest.",
+                "graph_name": graph_name,
+                "chunk_count": len(positions),
+                "chunks_added": 0,
+                "chunks_removed": 0,
+                "chunks_unchanged": unchanged_count,
+            }
+
+        if labelled_documents and any(kwargs.get(flag) for flag in ("embed_chunks", "embed_nodes", "embed_edges")):
+            await self._check_graph_metadata(graph_name)
+
+        if settings_changed:
+            logger.info(f"Ingestion settings changed for file_id={file_id}; re-ingesting all chunks.")
+            removed = self._remove_file_chunks(graph_name, file_id, manifest.get("chunk_hashes", []))
+
+        # --- 4. Initialize graph ---
+        graph = ArangoGraph(db=self.db, generate_schema_on_init=False)
+
         # --- 5. Insert into ArangoDB ---
-        await self._insert_documents_to_graph(
-            graph, graph_name, labelled_documents, file_id=file_id, storage_path=storage_path, **kwargs
-        )
+        extraction_metrics = None
+        if labelled_documents:
+            extraction_metrics = await self._insert_documents_to_graph(
+                graph, graph_name, labelled_documents, file_id=file_id, storage_path=storage_path,
+                progress=progress, **kwargs
+            )
+
+        # --- 6. Drop stale chunks and record the new revision ---
+        await self._report_progress(progress, "cleanup", stale_chunks=len(stale_hashes))
+        # Stale chunks are removed after insertion so entities shared with new chunks survive.
+        if stale_hashes:
+            stale_removed = self._remove_file_chunks(graph_name, file_id, list(stale_hashes))
+            removed = {k: removed[k] + stale_removed[k] for k in removed}
+        if manifest and unchanged_count:
+            self._reindex_file_chunks(
+                graph_name, file_id, {h: i for h, i in positions.items() if h in previous_hashes}
+            )
+        self._save_file_manifest(graph_name, file_id, list(positions), fingerprint)
+        self._ensure_graph_indexes(graph_name)
+        self._schedule_vector_index_checks(graph_name, **kwargs)
 
         return {
             "success": True,
-            "message": f"File ingested with {len(labelled_documents)} chunks.",
+            "message": f"File ingested with {len(positions)} chunks ({len(new_indices)} new or changed).",
             "graph_name": graph_name,
-            "chunk_count": len(labelled_documents),
+            "chunk_count": len(positions),
+            "chunks_added": len(new_indices),
+            "chunks_removed": removed["chunks"],
+            "chunks_unchanged": unchanged_count,
+            "graph_extraction": extraction_metrics,
         }
 
     
-    async def ingest_file_with_guardrail(self, input: ArangoDBDataprepRequestFromDocRepo):
+    async def ingest_file_with_guardrail(self, input: ArangoDBDataprepRequestFromDocRepo, progress=None):
         """Ingest files/links content into ArangoDB database.
 
         Save in the format of vector[768].
@@ -615,6 +1191,7 @@ class GenieArangoDataprep(OpeaArangoDataprep):
                 edge_properties (List[str], optional): The edge properties to be used. Defaults to ["description"].
                 text_capitalization_strategy (str, optional): The text capitalization strategy. Defaults to "upper".
                 include_chunks (bool, optional): Whether to include chunks in the graph. Defaults to True.
+            progress (callable, optional): Coroutine called as progress(stage, **details) while ingesting.
         """
         file_id = input.file_id
         file_name = input.file_name
@@ -679,7 +1256,11 @@ class GenieArangoDataprep(OpeaArangoDataprep):
                 text_capitalization_strategy=text_capitalization_strategy,
                 include_chunks=include_chunks,
                 all_labels=all_labels,
+                progress=progress,
             )
+        except HTTPException:
+            # e.g. 409 when the graph was embedded with another model
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to ingest {file_id} into ArangoDB: {e}")
             result = {
@@ -718,88 +1299,69 @@ class GenieArangoDataprep(OpeaArangoDataprep):
         pass
 
     
+    async def delete_files(self, file_path: str = Body(..., embed=True)):
+        """Delete a Graph according to `file_path` (a graph name or "all"), with its metadata."""
+        graph_names = [graph["name"] for graph in self.db.graphs()] if file_path == "all" else [file_path]
+        result = await super().delete_files(file_path)
+        for graph_name in graph_names:
+            self.graph_metadata.delete(graph_name)
+        return result
+
     async def retract_file(self, file_id: str = Body(..., embed=True), graph_name: str = Body(..., embed=True)):
         """
         Retract chunks, entities, and relations for a given file_id in a specific graph.
+
+        Only the chunks of the file and the entities/edges reachable from them are
+        touched (see _remove_chunks), all within a single stream transaction.
         """
         logger.info(f"[ retraction ] start to retract file {file_id} in graph {graph_name}")
 
-        # 1. Find all chunk ids for this file
-        cursor = self.db.aql.execute(
-            f"""
-            FOR s IN {graph_name}_SOURCE
-                FILTER s.file_id == @file_id
-                RETURN s._id
-            """,
-            bind_vars={"file_id": file_id}
-        )
-        chunk_ids = [doc for doc in cursor] # [GRAPH_TEST_SOURCE/10035803544387714385, GRAPH_TEST_SOURCE/10035803544387714385, ...]
-        logger.info(f"Found {len(chunk_ids)} chunks for file_id={file_id}")
+        names = self._graph_collection_names(graph_name)
+        if not self.db.has_collection(names["source"]):
+            logger.warning(f"No chunks found for file_id={file_id} (collection {names['source']} does not exist)")
+            return {
+                "status": 200,
+                "success": True,
+                "message": f"Data retraction succeeded for file_id={file_id}",
+                "deleted_chunks": [],
+            }
 
-        if not chunk_ids:
-            logger.warning(f"No chunks found for file_id={file_id}")
+        self._ensure_graph_indexes(graph_name)
+        txn_db = self._begin_graph_transaction(graph_name)
+        try:
+            # 1. Find all chunk ids for this file
+            cursor = txn_db.aql.execute(
+                f"""
+                FOR s IN {names['source']}
+                    FILTER s.file_id == @file_id
+                    RETURN s._id
+                """,
+                bind_vars={"file_id": file_id}
+            )
+            chunk_ids = [doc for doc in cursor] # [GRAPH_TEST_SOURCE/10035803544387714385, GRAPH_TEST_SOURCE/10035803544387714385, ...]
+            logger.info(f"Found {len(chunk_ids)} chunks for file_id={file_id}")
 
-        # 2. Delete those chunks
-        self.db.aql.execute(
-            f"""
-            FOR s IN {graph_name}_SOURCE
-                FILTER s.file_id == @file_id
-                REMOVE s IN {graph_name}_SOURCE
-            """,
-            bind_vars={"file_id": file_id}
-        )
-        if logflag:
-            logger.debug(f"Deleted chunks for file_id={file_id}")
+            if not chunk_ids:
+                logger.warning(f"No chunks found for file_id={file_id}")
 
-        # 3. Delete HAS_SOURCE edges pointing to deleted chunks
-        self.db.aql.execute(
-            f"""
-            FOR e IN {graph_name}_HAS_SOURCE
-                FILTER e._to IN @chunk_ids
-                REMOVE e IN {graph_name}_HAS_SOURCE
-            """,
-            bind_vars={"chunk_ids": chunk_ids}
-        )
-        if logflag:
-            logger.debug(f"Deleted {graph_name}_HAS_SOURCE linkages for file_id={file_id}")
+            # 2. Delete the chunks, their HAS_SOURCE edges and the entities left orphaned (with their LINKS_TO edges)
+            removed = self._remove_chunks(txn_db, graph_name, chunk_ids)
+            if logflag:
+                logger.debug(
+                    f"Deleted {removed['chunks']} chunks, {removed['entities']} orphan entities and "
+                    f"{removed['relations']} relations for file_id={file_id}"
+                )
 
-        # 4. Delete orphan entities (no HAS_SOURCE edges left)
-        self.db.aql.execute(
-            f"""
-            FOR ent IN {graph_name}_ENTITY
-                FILTER LENGTH(
-                    FOR hs IN {graph_name}_HAS_SOURCE
-                        FILTER hs._from == ent._id
-                        RETURN 1
-                ) == 0
-                REMOVE ent IN {graph_name}_ENTITY
-            """
-        )
-        if logflag:
-            logger.debug(f"Deleted orphan entities for file_id={file_id}")
+            # 3. Forget the file manifest so a later ingestion starts from scratch
+            manifest_name = f"{graph_name}_FILE_MANIFEST"
+            if txn_db.has_collection(manifest_name):
+                txn_db.collection(manifest_name).delete(self._manifest_key(file_id), ignore_missing=True)
 
-        # 5. Delete orphan HAS_SOURCE edges (whose _from pointing to missing entities)
-        self.db.aql.execute(
-            f"""
-            FOR hs IN {graph_name}_HAS_SOURCE
-                FILTER !DOCUMENT(hs._from) OR !DOCUMENT(hs._to)
-                REMOVE hs IN {graph_name}_HAS_SOURCE
-            """
-        )
-        if logflag:
-            logger.debug(f"Deleted orphan {graph_name}_HAS_SOURCE edges for file_id={file_id}")
-        
-        # 6. Delete orphan LINKS_TO edges (pointing to missing entities)
-        self.db.aql.execute(
-            f"""
-            FOR l IN {graph_name}_LINKS_TO
-                FILTER NOT DOCUMENT({graph_name}_ENTITY, PARSE_IDENTIFIER(l._from).key)
-                OR NOT DOCUMENT({graph_name}_ENTITY, PARSE_IDENTIFIER(l._to).key)
-                REMOVE l IN {graph_name}_LINKS_TO
-            """
-        )
-        if logflag:
-            logger.debug(f"Deleted orphan {graph_name}_LINKS_TO edges for file_id={file_id}")
+            txn_db.commit_transaction()
+        except Exception as e:
+            logger.error(f"[ retraction ] failed for file_id={file_id}, rolling back: {e}")
+            txn_db.abort_transaction()
+            raise
 
         return {
             "status": 200,
@@ -0,0 +1,350 @@
+# Copyright (C) 2025 International Telecommunication Union (ITU)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Background ingestion jobs for the GENIE dataprep microservice.
+
+Ingestion (extraction, guardrail, labelling, graph extraction and insertion)
+can take minutes per document. Instead of holding the HTTP request open,
+documents are spooled to disk and enqueued; a pool of asyncio workers runs the
+pipeline and records per-stage progress. Job state is persisted in ArangoDB so
+queued and interrupted jobs are resumed when the service restarts, and jobs are
+deduplicated on (file id, content hash, ingest settings). Jobs of the same file
+id never run concurrently within the service.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from comps import CustomLogger
+
+logger = CustomLogger("genie_dataprep_jobs")
+logflag = os.getenv("LOGFLAG", False)
+
+# Job queue configuration
+DATAPREP_JOB_COLLECTION = os.getenv("DATAPREP_JOB_COLLECTION", "DATAPREP_JOBS")
+DATAPREP_JOB_WORKERS = max(1, int(os.getenv("DATAPREP_JOB_WORKERS", 2)))
+DATAPREP_JOB_SPOOL_DIR = os.getenv("DATAPREP_JOB_SPOOL_DIR", "./uploaded_files/jobs/")
+DATAPREP_JOB_MAX_ATTEMPTS = max(1, int(os.getenv("DATAPREP_JOB_MAX_ATTEMPTS", 3)))
+DATAPREP_JOB_PROGRESS_INTERVAL = float(os.getenv("DATAPREP_JOB_PROGRESS_INTERVAL", 1.0))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+# a succeeded job whose file was retracted afterwards; submitting the file again ingests it again
+JOB_SUPERSEDED = "superseded"
+ACTIVE_JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+# Signature of the coroutine executing a job: runner(job, progress) -> result
+JobRunner = Callable[[Dict[str, Any], Callable[..., Awaitable[None]]], Awaitable[Any]]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def idempotency_key(file_id: str, content_hash: str, settings: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Key identifying one revision of one document repository file ingested with the
+    given settings (graph name, labels, ...): the same content sent with other
+    settings is a different job.
+    """
+    encoded_settings = json.dumps(settings or {}, sort_keys=True, default=str)
+    return hashlib.sha256(f"{file_id}\0{content_hash}\0{encoded_settings}".encode("utf-8")).hexdigest()
+
+
+def spool_path(job_id: str, file_name: str) -> str:
+    """Location of the uploaded file of a job; it must survive restarts for the job to resume."""
+    _, ext = os.path.splitext(file_name)
+    return os.path.join(DATAPREP_JOB_SPOOL_DIR, f"{job_id}{ext}")
+
+
+class IngestJobStore:
+    """ArangoDB persistence for ingestion jobs."""
+
+    def __init__(self, db, collection_name: str = DATAPREP_JOB_COLLECTION):
+        self.db = db
+        if not db.has_collection(collection_name):
+            db.create_collection(collection_name)
+        self.collection = db.collection(collection_name)
+        self.collection_name = collection_name
+
+        # active_key is the idempotency key of reusable (queued, running or succeeded) jobs and
+        # null otherwise: the unique sparse index lets only one reusable job exist per key
+        self.collection.add_index(
+            {"type": "persistent", "fields": ["active_key"], "unique": True, "sparse": True, "name": "idx_active_key"}
+        )
+        self.collection.add_index({"type": "persistent", "fields": ["status", "created_at"], "name": "idx_status"})
+        self.collection.add_index({"type": "persistent", "fields": ["file_id", "status"], "name": "idx_file_id"})
+
+    def create(
+        self, job_id: str, file_id: str, content_hash: str, file_path: str, request: Dict[str, Any], key: str
+    ) -> Tuple[Dict, bool]:
+        """
+        Insert a queued job; returns (job, True), or (existing job, False) when a reusable
+        job with the same key exists (also when it was created concurrently).
+        """
+        job = {
+            "_key": job_id,
+            "job_id": job_id,
+            "file_id": file_id,
+            "content_hash": content_hash,
+            "idempotency_key": key,
+            "active_key": key,
+            "file_path": file_path,
+            "request": request,
+            "status": JOB_QUEUED,
+            "stage": None,
+            "progress": {},
+            "attempts": 0,
+            "result": None,
+            "error": None,
+            "created_at": _now(),
+            "updated_at": _now(),
+        }
+        try:
+            self.collection.insert(job)
+        except Exception:
+            # unique constraint on active_key: another request enqueued the same revision first
+            existing = self.find_reusable(key)
+            if existing is None:
+                raise
+            return existing, False
+        return job, True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.collection.get(job_id)
+
+    def update(self, job_id: str, **fields):
+        fields["updated_at"] = _now()
+        # merge=False replaces the progress object instead of merging stale stage entries
+        self.collection.update({"_key": job_id, **fields}, merge=False, silent=True)
+
+    def find_reusable(self, key: str) -> Optional[Dict]:
+        """Queued, running or succeeded job for the same file revision and settings."""
+        cursor = self.db.aql.execute(
+            f"""
+            FOR job IN {self.collection_name}
+                FILTER job.active_key == @key
+                LIMIT 1
+                RETURN job
+            """,
+            bind_vars={"key": key},
+        )
+        return next(iter(cursor), None)
+
+    def supersede(self, file_id: str) -> int:
+        """Mark the succeeded jobs of a retracted file as superseded, so it can be ingested again."""
+        cursor = self.db.aql.execute(
+            f"""
+            FOR job IN {self.collection_name}
+                FILTER job.file_id == @file_id AND job.status == @succeeded
+                UPDATE job WITH {{status: @superseded, active_key: null, updated_at: @now}} IN {self.collection_name}
+                COLLECT WITH COUNT INTO superseded
+                RETURN superseded
+            """,
+            bind_vars={"file_id": file_id, "succeeded": JOB_SUCCEEDED, "superseded": JOB_SUPERSEDED, "now": _now()},
+        )
+        return next(iter(cursor), 0)
+
+    def list_active(self) -> List[Dict]:
+        """Queued and running jobs in submission order."""
+        cursor = self.db.aql.execute(
+            f"""
+            FOR job IN {self.collection_name}
+                FILTER job.status IN @statuses
+                SORT job.created_at ASC
+                RETURN job
+            """,
+            bind_vars={"statuses": list(ACTIVE_JOB_STATUSES)},
+        )
+        return list(cursor)
+
+
+class IngestJobQueue:
+    """
+    Bounded pool of asyncio workers executing persisted ingestion jobs.
+
+    Jobs found queued or running at start-up (e.g. interrupted by a restart) are
+    enqueued again. A job is attempted at most DATAPREP_JOB_MAX_ATTEMPTS times,
+    so a document that keeps crashing the service does not block the queue forever.
+
+    Jobs of one file id run one after the other: a job taken while another job of
+    the same file is running waits until it finishes, so two revisions of a file
+    never update its chunk manifest concurrently.
+    """
+
+    def __init__(
+        self,
+        store: IngestJobStore,
+        runner: JobRunner,
+        workers: int = DATAPREP_JOB_WORKERS,
+        max_attempts: int = DATAPREP_JOB_MAX_ATTEMPTS,
+    ):
+        self.store = store
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        # file id -> job ids waiting for the running job of that file
+        self._busy_files: Dict[str, deque] = {}
+
+    async def start(self):
+        for job in self.store.list_active():
+            if job["status"] == JOB_RUNNING:
+                logger.info(f"[ jobs ] resuming interrupted job {job['_key']} (file_id={job['file_id']})")
+                self.store.update(job["_key"], status=JOB_QUEUED)
+            self._queue.put_nowait(job["_key"])
+
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"[ jobs ] started {self.workers} workers, {self._queue.qsize()} jobs pending")
+
+    async def stop(self):
+        # Running jobs stay 'running' in the store and are resumed on the next start
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(
+        self,
+        file_id: str,
+        content_hash: str,
+        file_path: str,
+        request: Dict[str, Any],
+        job_id: str,
+        settings: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict, bool]:
+        """
+        Enqueue the ingestion of a spooled file.
+
+        Returns (job, created). When a job for the same file id, content hash and
+        settings is already queued, running or succeeded (and not superseded by a
+        retraction), that job is returned, created is False and the new spool file
+        is discarded.
+        """
+        key = idempotency_key(file_id, content_hash, settings)
+        existing = self.store.find_reusable(key)
+        if existing is None:
+            existing, created = self.store.create(job_id, file_id, content_hash, file_path, request, key)
+            if created:
+                existing = None
+        if existing:
+            if existing.get("file_path") != file_path:
+                _remove_file(file_path)
+            return existing, False
+
+        job = self.store.get(job_id)
+        self._queue.put_nowait(job_id)
+        if logflag:
+            logger.info(f"[ jobs ] enqueued job {job_id} for file_id={file_id}")
+        return job, True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            file_id = None
+            try:
+                job = self.store.get(job_id)
+                if not job or job["status"] not in ACTIVE_JOB_STATUSES:
+                    continue
+                if job["file_id"] in self._busy_files:
+                    self._busy_files[job["file_id"]].append(job_id)
+                    continue
+                file_id = job["file_id"]
+                self._busy_files[file_id] = deque()
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"[ jobs ] worker {index} failed on job {job_id}: {e}")
+            finally:
+                if file_id is not None:
+                    # hand the next job of the same file back to the queue
+                    waiting = self._busy_files.pop(file_id)
+                    for waiting_job_id in waiting:
+                        self._queue.put_nowait(waiting_job_id)
+                self._queue.task_done()
+
+    async def _run(self, job: Dict[str, Any]):
+        job_id = job["_key"]
+
+        attempts = job.get("attempts", 0) + 1
+        if attempts > self.max_attempts:
+            self.store.update(
+                job_id,
+                status=JOB_FAILED,
+                active_key=None,
+                error=f"Gave up after {self.max_attempts} attempts.",
+                finished_at=_now(),
+            )
+            _remove_file(job["file_path"])
+            return
+
+        self.store.update(job_id, status=JOB_RUNNING, attempts=attempts, started_at=_now(), error=None)
+        start = time.time()
+        try:
+            result = await self.runner(job, self._progress_reporter(job_id))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[ jobs ] job {job_id} (file_id={job['file_id']}) failed: {e}")
+            self.store.update(
+                job_id,
+                status=JOB_FAILED,
+                active_key=None,
+                error=str(getattr(e, "detail", e)),
+                finished_at=_now(),
+                duration_seconds=round(time.time() - start, 3),
+            )
+        else:
+            succeeded = not isinstance(result, dict) or result.get("success", True)
+            self.store.update(
+                job_id,
+                status=JOB_SUCCEEDED if succeeded else JOB_FAILED,
+                active_key=job.get("active_key") if succeeded else None,
+                stage="done" if succeeded else job.get("stage"),
+                result=result,
+                error=None if succeeded else result.get("message"),
+                finished_at=_now(),
+                duration_seconds=round(time.time() - start, 3),
+            )
+            logger.info(f"[ jobs ] job {job_id} (file_id={job['file_id']}) finished in {time.time() - start:.1f}s")
+        _remove_file(job["file_path"])
+
+    def _progress_reporter(self, job_id: str) -> Callable[..., Awaitable[None]]:
+        """
+        Build the progress callback handed to the ingestion pipeline.
+        Stage changes are persisted immediately, updates within a stage at most
+        every DATAPREP_JOB_PROGRESS_INTERVAL seconds and when the stage completes.
+        """
+        stages: Dict[str, Dict[str, Any]] = {}
+        state = {"stage": None, "written_at": 0.0}
+
+        async def report(stage: str, **details):
+            stages[stage] = {**details, "updated_at": _now()}
+            now = time.monotonic()
+            completed = "total" in details and details.get("done") == details["total"]
+            if stage != state["stage"] or completed or now - state["written_at"] >= DATAPREP_JOB_PROGRESS_INTERVAL:
+                state["stage"] = stage
+                state["written_at"] = now
+                self.store.update(job_id, stage=stage, progress=dict(stages))
+
+        return report
+
+
+def _remove_file(path: Optional[str]):
+    try:
+        if path and os.path.exists(path):
+            os.remove(path)
+    except Exception as e:
+        logger.error(f"[ jobs ] failed to remove spooled file {path}: {e}")
@@ -8,14 +8,19 @@ Extends the base OPEA Dataprep microservice with additional endpoints for
 document repository ingestion and retraction, using ArangoDB as the backend.
 """
 
+import asyncio
 import base64
+import hashlib
 import os
 import time
-from typing import List, Optional, Union
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple, Union
 
 from pydantic import BaseModel
-from fastapi import Body
+from fastapi import Body, HTTPException, Query, Request
 
+from genieai_dataprep_jobs import DATAPREP_JOB_SPOOL_DIR, IngestJobQueue, IngestJobStore, spool_path
 from genieai_dataprep_loader import GenieDataprepLoader
 from integrations.genieai_dataprep_arangodb import GenieArangoDataprep
 
@@ -33,11 +38,18 @@ from comps import (
 
 # --- Import custom Pydantic model from our overlay protocol ---
 from comps.cores.proto.genieai_api_protocol import ArangoDBDataprepRequestFromDocRepo
+from comps.cores.storages.arango_client import ArangoConnectionManager
+from comps.dataprep.src.genieai_dataprep_utils import start_background_warmup
+from comps.dataprep.src.recrawl import CrawlStateStore, RecrawlScheduler
 
 
 logger = CustomLogger("genie_dataprep_microservice")
 logflag = os.getenv("LOGFLAG", False)
 upload_folder = "./uploaded_files/" #################################################
+# Upper bound for a streamed upload body; larger requests are rejected with 413
+DATAPREP_MAX_UPLOAD_BYTES = int(os.getenv("DATAPREP_MAX_UPLOAD_BYTES", 200 * 1024 * 1024))
+# Streamed upload bodies are written to disk in blocks of this size
+UPLOAD_WRITE_BUFFER_BYTES = 1024 * 1024
 
 dataprep_component_name = os.getenv("DATAPREP_COMPONENT_NAME", "GENIE_DATAPREP_ARANGODB")
 # Initialize OpeaComponentLoader
@@ -73,6 +85,133 @@ class DocRepoRetractPayload(BaseModel):
     fileId: str
 
 
+class RecrawlPayload(BaseModel):
+    seeds: Optional[List[str]] = None
+    maxDepth: Optional[int] = None
+
+
+# Background ingestion queue, created on service startup
+job_queue: Optional[IngestJobQueue] = None
+# Re-crawl of ingested websites, created on service startup
+recrawl_scheduler: Optional[RecrawlScheduler] = None
+
+
+# ------------------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------------------
+def build_arango_ingest_request(
+    file_id: str,
+    file_name: str,
+    file_path: str,
+    file_type: str,
+    file_labels: Optional[List[str]],
+    upload_date: str,
+    storage_path: Optional[str],
+) -> ArangoDBDataprepRequestFromDocRepo:
+    """Build the Arango dataprep request for a file saved on local disk."""
+
+    # --- Environment-specific Arango config (set via env vars or defaults) ---
+    ARANGO_GRAPH_NAME = os.getenv("ARANGO_GRAPH_NAME", "GRAPH_TEST")
+    #ARANGO_GRAPH_NAME = os.getenv("ARANGO_GRAPH_NAME", "genie_graph")
+    ARANGO_INSERT_ASYNC = os.getenv("ARANGO_INSERT_ASYNC", "false").lower() == "true"
+    #ARANGO_INSERT_ASYNC = os.getenv("ARANGO_INSERT_ASYNC", True)
+    ARANGO_BATCH_SIZE = int(os.getenv("ARANGO_BATCH_SIZE", 1000))
+    #ARANGO_BATCH_SIZE = int(os.getenv("ARANGO_BATCH_SIZE", 100))
+    ALLOWED_NODE_TYPES = os.getenv("ALLOWED_NODE_TYPES", "").split(",") if os.getenv("ALLOWED_NODE_TYPES") else []
+    #ALLOWED_NODE_TYPES = os.getenv("ALLOWED_NODE_TYPES", "Document,Entity").split(",")
+    ALLOWED_EDGE_TYPES = os.getenv("ALLOWED_EDGE_TYPES", "").split(",") if os.getenv("ALLOWED_EDGE_TYPES") else []
+    #ALLOWED_EDGE_TYPES = os.getenv("ALLOWED_EDGE_TYPES", "Relation,Contains").split(",")
+    NODE_PROPERTIES = os.getenv("NODE_PROPERTIES", "description").split(",")
+    #NODE_PROPERTIES = os.getenv("NODE_PROPERTIES", "name,type").split(",")
+    EDGE_PROPERTIES = os.getenv("EDGE_PROPERTIES", "description").split(",")
+    #EDGE_PROPERTIES = os.getenv("EDGE_PROPERTIES", "type,weight").split(",")
+    TEXT_CAPITALIZATION_STRATEGY = os.getenv("TEXT_CAPITALIZATION_STRATEGY", "upper")
+    #TEXT_CAPITALIZATION_STRATEGY = os.getenv("TEXT_CAPITALIZATION_STRATEGY", "preserve")
+    INCLUDE_CHUNKS = os.getenv("INCLUDE_CHUNKS", "true").lower() == "true"
+    #INCLUDE_CHUNKS = os.getenv("INCLUDE_CHUNKS", "true").lower() == "true"
+
+    # --- Construct Arango-specific dataprep request ---
+    # ** FIXED: Removed 'base.' prefix and 'storage_path' argument **
+    return ArangoDBDataprepRequestFromDocRepo(
+        file_id=file_id,
+        file_name=file_name,
+        file_path=file_path,
+        file_type=file_type,
+        file_labels=file_labels,
+        upload_date=upload_date,
+        storage_path=storage_path,
+        graph_name=ARANGO_GRAPH_NAME,
+        insert_async=ARANGO_INSERT_ASYNC,
+        insert_batch_size=ARANGO_BATCH_SIZE,
+        embed_nodes=True,
+        embed_edges=True,
+        embed_chunks=True,
+        allowed_node_types=ALLOWED_NODE_TYPES,
+        allowed_edge_types=ALLOWED_EDGE_TYPES,
+        node_properties=NODE_PROPERTIES,
+        edge_properties=EDGE_PROPERTIES,
+        text_capitalization_strategy=TEXT_CAPITALIZATION_STRATEGY,
+        include_chunks=INCLUDE_CHUNKS,
+    )
+
+
+async def stream_request_to_disk(request: Request, save_path: str) -> Tuple[int, str]:
+    """
+    Write the request body to `save_path` chunk by chunk as it arrives.
+
+    Returns (number of bytes, sha256 hex digest). Raises 413 as soon as the body
+    (declared or actually received) exceeds DATAPREP_MAX_UPLOAD_BYTES.
+    """
+    declared_length = request.headers.get("content-length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > DATAPREP_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {DATAPREP_MAX_UPLOAD_BYTES} bytes.")
+
+    sha256 = hashlib.sha256()
+    size = 0
+    # small network chunks are buffered and written from a worker thread, off the event loop
+    buffer = bytearray()
+    f = await asyncio.to_thread(open, save_path, "wb")
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > DATAPREP_MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds {DATAPREP_MAX_UPLOAD_BYTES} bytes.")
+            sha256.update(chunk)
+            buffer += chunk
+            if len(buffer) >= UPLOAD_WRITE_BUFFER_BYTES:
+                await asyncio.to_thread(f.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await asyncio.to_thread(f.write, bytes(buffer))
+    finally:
+        await asyncio.to_thread(f.close)
+
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Empty upload body.")
+    return size, sha256.hexdigest()
+
+
+def write_file(save_path: str, content: bytes):
+    """Blocking write of a whole upload (run it in a thread)."""
+    with open(save_path, "wb") as f:
+        f.write(content)
+
+
+def upload_path(file_name: str) -> str:
+    """Unique temporary location of an upload, so concurrent uploads of the same name do not collide."""
+    return os.path.join(upload_folder, f"{uuid.uuid4().hex}_{os.path.basename(file_name)}")
+
+
+def remove_uploaded_file(save_path: str):
+    """Cleanup a temporary uploaded file."""
+    try:
+        if os.path.exists(save_path):
+            os.remove(save_path)
+            logger.info(f"[ ingest ] Temporary file removed: {save_path}")
+    except Exception as cleanup_error:
+        logger.error(f"[ ingest ] Failed to remove temporary file {save_path}: {cleanup_error}")
+
+
 # ------------------------------------------------------------------------------
 # Ingest file from document repository
 # ------------------------------------------------------------------------------
@@ -103,37 +242,14 @@ async def ingest_file_from_repo(payload: DocRepoIngestPayload):
     logger.info(f"[ ingest ] file_name: {payload.fileName}")
     logger.info(f"[ ingest ] file_type: {payload.fileType}")
 
-    # --- Environment-specific Arango config (set via env vars or defaults) ---
-    ARANGO_GRAPH_NAME = os.getenv("ARANGO_GRAPH_NAME", "GRAPH_TEST")
-    #ARANGO_GRAPH_NAME = os.getenv("ARANGO_GRAPH_NAME", "genie_graph")
-    ARANGO_INSERT_ASYNC = os.getenv("ARANGO_INSERT_ASYNC", "false").lower() == "true"
-    #ARANGO_INSERT_ASYNC = os.getenv("ARANGO_INSERT_ASYNC", True)
-    ARANGO_BATCH_SIZE = int(os.getenv("ARANGO_BATCH_SIZE", 1000))
-    #ARANGO_BATCH_SIZE = int(os.getenv("ARANGO_BATCH_SIZE", 100))
-    ALLOWED_NODE_TYPES = os.getenv("ALLOWED_NODE_TYPES", "").split(",") if os.getenv("ALLOWED_NODE_TYPES") else []
-    #ALLOWED_NODE_TYPES = os.getenv("ALLOWED_NODE_TYPES", "Document,Entity").split(",")
-    ALLOWED_EDGE_TYPES = os.getenv("ALLOWED_EDGE_TYPES", "").split(",") if os.getenv("ALLOWED_EDGE_TYPES") else []
-    #ALLOWED_EDGE_TYPES = os.getenv("ALLOWED_EDGE_TYPES", "Relation,Contains").split(",")
-    NODE_PROPERTIES = os.getenv("NODE_PROPERTIES", "description").split(",")
-    #NODE_PROPERTIES = os.getenv("NODE_PROPERTIES", "name,type").split(",")
-    EDGE_PROPERTIES = os.getenv("EDGE_PROPERTIES", "description").split(",")
-    #EDGE_PROPERTIES = os.getenv("EDGE_PROPERTIES", "type,weight").split(",")
-    TEXT_CAPITALIZATION_STRATEGY = os.getenv("TEXT_CAPITALIZATION_STRATEGY", "upper")
-    #TEXT_CAPITALIZATION_STRATEGY = os.getenv("TEXT_CAPITALIZATION_STRATEGY", "preserve")
-    INCLUDE_CHUNKS = os.getenv("INCLUDE_CHUNKS", "true").lower() == "true"
-    #INCLUDE_CHUNKS = os.getenv("INCLUDE_CHUNKS", "true").lower() == "true"
-
+    save_path = upload_path(payload.fileName)
     try:
         # --- Decode and temporarily save file ---
         file_bytes = base64.b64decode(payload.fileBase64)
-        save_path = os.path.join(upload_folder, payload.fileName)
-        with open(save_path, "wb") as f:
-            f.write(file_bytes)
+        await asyncio.to_thread(write_file, save_path, file_bytes)
         logger.info(f"[ ingest ] File saved to: {save_path}")
 
-        # --- Construct Arango-specific dataprep request ---
-        # ** FIXED: Removed 'base.' prefix and 'storage_path' argument **
-        input_req = ArangoDBDataprepRequestFromDocRepo(
+        input_req = build_arango_ingest_request(
             file_id=payload.fileId,
             file_name=payload.fileName,
             file_path=save_path,
@@ -141,18 +257,6 @@ async def ingest_file_from_repo(payload: DocRepoIngestPayload):
             file_labels=payload.fileLabels,
             upload_date=payload.uploadDate,
             storage_path=payload.storagePath,
-            graph_name=ARANGO_GRAPH_NAME,
-            insert_async=ARANGO_INSERT_ASYNC,
-            insert_batch_size=ARANGO_BATCH_SIZE,
-            embed_nodes=True,
-            embed_edges=True,
-            embed_chunks=True,
-            allowed_node_types=ALLOWED_NODE_TYPES,
-            allowed_edge_types=ALLOWED_EDGE_TYPES,
-            node_properties=NODE_PROPERTIES,
-            edge_properties=EDGE_PROPERTIES,
-            text_capitalization_strategy=TEXT_CAPITALIZATION_STRATEGY,
-            include_chunks=INCLUDE_CHUNKS,
         )
 
         # --- Perform ingestion using the loader ---
@@ -169,13 +273,233 @@ async def ingest_file_from_repo(payload: DocRepoIngestPayload):
         raise
 
     finally:
-        # --- Cleanup temporary file ---
-        try:
-            if os.path.exists(save_path):
-                os.remove(save_path)
-                logger.info(f"[ ingest ] Temporary file removed: {save_path}")
-        except Exception as cleanup_error:
-            logger.error(f"[ ingest ] Failed to remove temporary file {save_path}: {cleanup_error}")
+        remove_uploaded_file(save_path)
+
+
+# ------------------------------------------------------------------------------
+# Ingest file from document repository (streamed request body)
+# ------------------------------------------------------------------------------
+@register_microservice(
+    name="opea_service@dataprep",
+    service_type=ServiceType.DATAPREP,
+    endpoint="/v1/dataprep/ingest_file_stream",
+    host="0.0.0.0",
+    port=5000,
+)
+@register_statistics(names=["opea_service@dataprep"])
+async def ingest_file_stream_from_repo(
+    request: Request,
+    fileId: str,
+    fileName: str,
+    fileType: str,
+    uploadDate: str,
+    fileLabels: Optional[List[str]] = Query(None),
+    storagePath: Optional[str] = None,
+):
+    """
+    Same as /v1/dataprep/ingest_file, but the request body is the raw file
+    (Content-Type: application/octet-stream) and the metadata is passed as
+    query parameters, e.g.
+
+        POST /v1/dataprep/ingest_file_stream?fileId=...&fileName=report.pdf&fileType=pdf
+             &uploadDate=...&fileLabels=a&fileLabels=b&storagePath=...
+
+    The body is written to disk as it arrives, so memory use does not grow with
+    the file size. Bodies larger than DATAPREP_MAX_UPLOAD_BYTES are rejected
+    with 413. An optional `X-Content-SHA256` header is checked against the
+    hash computed while streaming.
+    """
+    start = time.time()
+    logger.info(f"[ ingest stream ] file_id: {fileId}")
+    logger.info(f"[ ingest stream ] file_name: {fileName}")
+    logger.info(f"[ ingest stream ] file_type: {fileType}")
+
+    save_path = upload_path(fileName)
+    try:
+        size, content_hash = await stream_request_to_disk(request, save_path)
+        logger.info(f"[ ingest stream ] {size} bytes saved to: {save_path} (sha256={content_hash})")
+
+        expected_hash = request.headers.get("x-content-sha256")
+        if expected_hash and expected_hash.lower() != content_hash:
+            raise HTTPException(status_code=400, detail="Uploaded content does not match X-Content-SHA256.")
+
+        input_req = build_arango_ingest_request(
+            file_id=fileId,
+            file_name=fileName,
+            file_path=save_path,
+            file_type=fileType,
+            file_labels=fileLabels,
+            upload_date=uploadDate,
+            storage_path=storagePath,
+        )
+
+        response = await loader.ingest_file_with_guardrail(input_req)
+        if isinstance(response, dict):
+            response["content_sha256"] = content_hash
+            response["content_bytes"] = size
+
+        if logflag:
+            logger.debug(f"[ ingest stream ] Output generated: {response}")
+        statistics_dict["opea_service@dataprep"].append_latency(time.time() - start, None)
+
+        return response
+
+    except Exception as e:
+        logger.error(f"Error during streamed dataprep ingest invocation from document repository: {e}")
+        raise
+
+    finally:
+        remove_uploaded_file(save_path)
+
+
+# ------------------------------------------------------------------------------
+# Background ingestion jobs
+# ------------------------------------------------------------------------------
+async def run_ingest_job(job: dict, progress):
+    """Job runner: ingest the spooled file of a job through the Genie pipeline."""
+    req = job["request"]
+    input_req = build_arango_ingest_request(
+        file_id=req["fileId"],
+        file_name=req["fileName"],
+        file_path=job["file_path"],
+        file_type=req["fileType"],
+        file_labels=req.get("fileLabels"),
+        upload_date=req["uploadDate"],
+        storage_path=req.get("storagePath"),
+    )
+    return await loader.ingest_file_with_guardrail(input_req, progress=progress)
+
+
+def ingest_settings(job_request: dict) -> dict:
+    """Settings deciding what ingesting a job's file produces (graph, labels, ...), part of its idempotency key."""
+    input_req = build_arango_ingest_request(
+        file_id=job_request["fileId"],
+        file_name=job_request["fileName"],
+        file_path="",
+        file_type=job_request["fileType"],
+        file_labels=sorted(job_request.get("fileLabels") or []),
+        upload_date=job_request["uploadDate"],
+        storage_path=job_request.get("storagePath"),
+    )
+    excluded = {"file_id", "file_name", "file_path", "upload_date", "files", "link_list"}
+    return {k: v for k, v in vars(input_req).items() if k not in excluded}
+
+
+async def start_job_queue():
+    global job_queue
+    os.makedirs(DATAPREP_JOB_SPOOL_DIR, exist_ok=True)
+    job_queue = IngestJobQueue(IngestJobStore(loader.component.db), run_ingest_job)
+    await job_queue.start()
+
+
+async def stop_job_queue():
+    if job_queue is not None:
+        await job_queue.stop()
+
+
+def job_response(job: dict, created: Optional[bool] = None) -> dict:
+    keys = (
+        "job_id", "file_id", "content_hash", "status", "stage", "progress", "attempts",
+        "result", "error", "created_at", "updated_at", "started_at", "finished_at", "duration_seconds",
+    )
+    response = {k: job.get(k) for k in keys}
+    if created is not None:
+        response["deduplicated"] = not created
+    return response
+
+
+def get_job_queue() -> IngestJobQueue:
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="Ingestion job queue is not running.")
+    return job_queue
+
+
+@register_microservice(
+    name="opea_service@dataprep",
+    service_type=ServiceType.DATAPREP,
+    endpoint="/v1/dataprep/jobs",
+    host="0.0.0.0",
+    port=5000,
+)
+async def enqueue_ingest_job(payload: DocRepoIngestPayload):
+    """
+    Enqueue the ingestion of a document repository file (same payload as
+    /v1/dataprep/ingest_file) and return immediately with a job id.
+    Re-submitting the same fileId with the same content and settings returns the
+    existing job, unless the file was retracted since.
+    """
+    queue = get_job_queue()
+    job_id = uuid.uuid4().hex
+    save_path = spool_path(job_id, payload.fileName)
+
+    file_bytes = base64.b64decode(payload.fileBase64)
+    content_hash = hashlib.sha256(file_bytes).hexdigest()
+    await asyncio.to_thread(write_file, save_path, file_bytes)
+    del file_bytes
+
+    request = payload.model_dump(exclude={"fileBase64"})
+    job, created = queue.enqueue(
+        payload.fileId, content_hash, save_path, request, job_id=job_id, settings=ingest_settings(request)
+    )
+    logger.info(f"[ jobs ] file_id={payload.fileId} -> job {job['job_id']} ({'new' if created else 'existing'})")
+    return job_response(job, created)
+
+
+@register_microservice(
+    name="opea_service@dataprep",
+    service_type=ServiceType.DATAPREP,
+    endpoint="/v1/dataprep/jobs/stream",
+    host="0.0.0.0",
+    port=5000,
+)
+async def enqueue_ingest_job_stream(
+    request: Request,
+    fileId: str,
+    fileName: str,
+    fileType: str,
+    uploadDate: str,
+    fileLabels: Optional[List[str]] = Query(None),
+    storagePath: Optional[str] = None,
+):
+    """Streamed-body variant of /v1/dataprep/jobs (see /v1/dataprep/ingest_file_stream)."""
+    queue = get_job_queue()
+    job_id = uuid.uuid4().hex
+    save_path = spool_path(job_id, fileName)
+    try:
+        _, content_hash = await stream_request_to_disk(request, save_path)
+    except Exception:
+        remove_uploaded_file(save_path)
+        raise
+
+    job_request = {
+        "fileId": fileId,
+        "fileName": fileName,
+        "fileType": fileType,
+        "uploadDate": uploadDate,
+        "fileLabels": fileLabels,
+        "storagePath": storagePath,
+    }
+    job, created = queue.enqueue(
+        fileId, content_hash, save_path, job_request, job_id=job_id, settings=ingest_settings(job_request)
+    )
+    logger.info(f"[ jobs ] file_id={fileId} -> job {job['job_id']} ({'new' if created else 'existing'})")
+    return job_response(job, created)
+
+
+@register_microservice(
+    name="opea_service@dataprep",
+    service_type=ServiceType.DATAPREP,
+    endpoint="/v1/dataprep/jobs/{job_id}",
+    host="0.0.0.0",
+    port=5000,
+    methods=["GET"],
+)
+async def get_ingest_job(job_id: str):
+    """Status and per-stage progress of an ingestion job."""
+    job = get_job_queue().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job_response(job)
 
 
 # ------------------------------------------------------------------------------
@@ -200,6 +524,11 @@ async def retract_file(payload: DocRepoRetractPayload):
     try:
         if dataprep_component_name == "GENIE_DATAPREP_ARANGODB":
             response = await loader.retract_file(file_id=file_id, graph_name=graph_name)
+            if job_queue is not None:
+                # a later submission of the same revision must ingest it again
+                superseded = job_queue.store.supersede(file_id)
+                if superseded:
+                    logger.info(f"[ retract ] {superseded} ingestion job(s) of file {file_id} superseded")
         else:
             logger.error(f"dataprep_component_name is not set or invalid: {dataprep_component_name}")
             raise RuntimeError("Unsupported dataprep_component_name")
@@ -214,10 +543,100 @@ async def retract_file(payload: DocRepoRetractPayload):
         raise
 
 
+# ------------------------------------------------------------------------------
+# Re-crawl of ingested websites
+# ------------------------------------------------------------------------------
+async def ingest_crawled_page(url: str, content: str, file_id: str, replace: bool):
+    """
+    Re-crawl callback: ingest a new or changed page through the Genie pipeline
+    (guardrail, labelling, chunk manifest, graph metadata). The chunk manifest of
+    file_id replaces the previous version of the page, so nothing is retracted first.
+    """
+    save_path = upload_path(f"{file_id}.txt")
+    await asyncio.to_thread(write_file, save_path, content.encode("utf-8"))
+    try:
+        input_req = build_arango_ingest_request(
+            file_id=file_id,
+            file_name=url,
+            file_path=save_path,
+            file_type="html",
+            file_labels=None,
+            upload_date=datetime.now(timezone.utc).isoformat(),
+            storage_path=url,
+        )
+        response = await loader.ingest_file_with_guardrail(input_req)
+    finally:
+        remove_uploaded_file(save_path)
+    if isinstance(response, dict) and not response.get("success", True):
+        # the page is fetched in full again on the next crawl
+        raise RuntimeError(response.get("message"))
+
+
+async def start_recrawl_schedule():
+    """Create the re-crawl scheduler; it re-crawls RECRAWL_SEEDS periodically (no-op when unset)."""
+    global recrawl_scheduler
+    recrawl_scheduler = RecrawlScheduler(CrawlStateStore(loader.component.db), ingest_crawled_page)
+    recrawl_scheduler.start()
+
+
+async def stop_recrawl_schedule():
+    if recrawl_scheduler is not None:
+        await recrawl_scheduler.stop()
+
+
+@register_microservice(
+    name="opea_service@dataprep",
+    service_type=ServiceType.DATAPREP,
+    endpoint="/v1/dataprep/recrawl",
+    host="0.0.0.0",
+    port=5000,
+)
+@register_statistics(names=["opea_service@dataprep"])
+async def recrawl(payload: RecrawlPayload):
+    """
+    Accepts JSON: { "seeds": ["https://..."], "maxDepth": 2 } (both optional, default RECRAWL_SEEDS / RECRAWL_MAX_DEPTH)
+    Re-crawls the seeds and re-ingests only the pages whose content changed since the last crawl.
+    """
+    start = time.time()
+    logger.info(f"[ recrawl ] Start to recrawl {payload.seeds or 'RECRAWL_SEEDS'}")
+
+    if recrawl_scheduler is None:
+        raise HTTPException(status_code=503, detail="Re-crawl scheduler is not running.")
+    if not (payload.seeds or recrawl_scheduler.seeds):
+        raise HTTPException(status_code=400, detail="No seeds given and RECRAWL_SEEDS is not set.")
+
+    try:
+        response = await recrawl_scheduler.run_once(seeds=payload.seeds, max_depth=payload.maxDepth)
+        if logflag:
+            logger.debug(f"[ recrawl ] recrawl result: {response}")
+        statistics_dict["opea_service@dataprep"].append_latency(time.time() - start, None)
+        return response
+
+    except Exception as e:
+        logger.error(f"Error during dataprep recrawl invocation: {e}")
+        raise
+
+
 # ------------------------------------------------------------------------------
 # Launch microservice (inherits base service registry)
 # ------------------------------------------------------------------------------
-if __name__ == "__main__":
+def main():
     logger.info("GENIE Dataprep Microservice is starting...")
     base.create_upload_folder(upload_folder)
-    base.opea_microservices["opea_service@dataprep"].start()
\ No newline at end of file
+    app = base.opea_microservices["opea_service@dataprep"].app
+    app.add_event_handler("startup", start_job_queue)
+    # Docling / OCR models are loaded lazily; DATAPREP_WARMUP preloads them in the background
+    app.add_event_handler("startup", start_background_warmup)
+    # Periodic re-crawl of RECRAWL_SEEDS through the Genie pipeline
+    app.add_event_handler("startup", start_recrawl_schedule)
+    app.add_event_handler("shutdown", stop_recrawl_schedule)
+    app.add_event_handler("shutdown", stop_job_queue)
+    # Close the shared ArangoDB connection pools once the job queue is stopped
+    app.add_event_handler("shutdown", ArangoConnectionManager.close_all)
+    base.opea_microservices["opea_service@dataprep"].start()
+
+
+# The container starts the service through genieai_dataprep_server.py, so that the
+# spawned extraction workers do not import this module (see that file).
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+# Copyright (C) 2025 International Telecommunication Union (ITU)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Entry point of the GENIE Dataprep Microservice container.
+
+The PDF, Docling and table extraction pools start their workers with 'spawn',
+which re-runs the main script of the service in every worker (as __mp_main__).
+Keeping the service import under the __main__ guard of this small script means
+the workers only import the extraction modules they need, instead of building
+the dataprep component (ArangoDB connection, models, LLM clients) once more each.
+"""
+
+if __name__ == "__main__":
+    import genieai_dataprep_microservice
+
+    genieai_dataprep_microservice.main()
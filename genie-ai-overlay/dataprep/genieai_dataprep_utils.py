@@ -3,62 +3,65 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-import easyocr
-import pymupdf
-import fitz 
-import cv2
-import numpy as np
-from concurrent.futures import ThreadPoolExecutor, as_completed 
-
 # Note:- imorted the os package
 import os
-import asyncio
-
-
-from docling.document_converter import (
-    DocumentConverter,
-    PdfFormatOption,
-    WordFormatOption,
-    )
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import (
-    PdfPipelineOptions, 
-    EasyOcrOptions, 
-    )
+import re
+import string
+import threading
+import time
+from typing import List
 
 # Might need to check the path
 from comps.dataprep.src.utils import document_loader as origin_document_loader
+from comps.dataprep.src.genieai_pdf_extractor import load_pdf_async as genieai_load_pdf_async
+from comps.dataprep.src.genieai_pdf_extractor import warm_up_ocr
+from comps.dataprep.src.genieai_docling_pool import convert_document as docling_convert_document
+from comps.dataprep.src.genieai_docling_pool import warm_up_docling
 
 from comps import CustomLogger
 
 logger = CustomLogger("genie-ai_prepare_doc_util")
 logflag = os.getenv("LOGFLAG", False)
 
-reader = easyocr.Reader(['en']) # Can add more languages later
+# Models are loaded on first use, in the Docling / OCR worker processes: a dataprep
+# process that never converts with Docling (CONTENT_EXTRACTION_METHOD != docling,
+# text files, ...) never pays for it.
+# DATAPREP_WARMUP lists what to load in the background at startup:
+# "auto" (docling when it is the extraction method), "none", or any of "docling,ocr".
+DATAPREP_WARMUP = os.getenv("DATAPREP_WARMUP", "auto")
+
+def _warmup_targets():
+    targets = [t.strip().lower() for t in DATAPREP_WARMUP.split(",") if t.strip()]
+    if targets == ["auto"]:
+        return ["docling"] if os.getenv("CONTENT_EXTRACTION_METHOD", "opea") == "docling" else []
+    return [t for t in targets if t != "none"]
 
-try:
-    # configuring Docling to use easyocr (more lightweight than OPEA default library)
-    ocr_options = EasyOcrOptions(lang=['en']) 
-    
-    # Pipeline for PDFs and Images (for layout analysis and OCR)
-    pdf_and_image_pipeline_config = PdfPipelineOptions(
-        do_ocr=True,  
-        ocr_options=ocr_options
-    )
 
-    # Map PDF file type to relevant pipeline
-    format_options = {
-        InputFormat.PDF: PdfFormatOption(pipeline_options=pdf_and_image_pipeline_config),
-        # Later can add pipelines for other file formats
-        }
+def _warm_up(targets):
+    for target in targets:
+        start = time.time()
+        try:
+            if target == "docling":
+                warm_up_docling()
+            elif target == "ocr":
+                warm_up_ocr()
+            else:
+                logger.warning(f"[ dataprep utils ] unknown DATAPREP_WARMUP target '{target}'")
+                continue
+            logger.info(f"[ dataprep utils ] warm-up of {target} done in {time.time() - start:.1f}s")
+        except Exception as e:
+            logger.error(f"[ dataprep utils ] warm-up of {target} failed: {e}")
 
-    # 5. Initialize the converter once, passing the format_options dict
-    docling_converter = DocumentConverter(format_options=format_options)
 
-except ImportError:
-    print("Please install docling and its dependencies: pip install docling easyocr")
-    raise
-    
+def start_background_warmup():
+    """Load the models listed in DATAPREP_WARMUP in a daemon thread; returns the thread (or None)."""
+    targets = _warmup_targets()
+    if not targets:
+        return None
+    thread = threading.Thread(target=_warm_up, args=(targets,), name="dataprep-warmup", daemon=True)
+    thread.start()
+    return thread
+
 
 ### Docling document loader ############################################################
 # Serves as a more heavy and robust tool for extracting content from more complex PDF files
@@ -66,15 +69,9 @@ async def load_with_docling(doc_path: str) -> str:
     """
     Asynchronously processes any Docling-supported file (PDF, DOCX, PPTX,
     HTML, images, etc.) and returns its content as RAG-ready Markdown.
+    Conversion runs in the Docling worker pool (large PDFs are split in page ranges).
     """
-    def process_doc():
-        # .convert() handles parsing, layout analysis, table extraction, and OCR
-        result = docling_converter.convert(doc_path)
-        # Exporting to Markdown for enhanced readability.
-        return result.document.export_to_markdown()
-
-    loop = asyncio.get_running_loop()
-    content = await loop.run_in_executor(None, process_doc)
+    content, _ = await docling_convert_document(doc_path)
     return content
 
 async def docling_document_loader(doc_path):
@@ -90,50 +87,10 @@ async def docling_document_loader(doc_path):
         print(f'File type {doc_path} not supported by Docling')
 
 
-def genieai_process_page(doc, idx):
-    page = doc.load_page(idx)
-    pagetext = page.get_text().strip()
-    result = pagetext if pagetext.endswith(("!", "?", ".")) else pagetext + "."
-
-    page_images = doc.get_page_images(idx)
-    if page_images:
-        for img_index, img in enumerate(page_images):
-            xref = img[0]
-            img_data = doc.extract_image(xref)
-            img_bytes = img_data["image"]
-
-            # process images
-            img_array = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
-            # img_result = pytesseract.image_to_string(img_array, lang="eng", config="--psm 6")
-            img_result = ''.join(reader.readtext(img_array, detail = 0)) 
-
-            # add results
-            pageimg = img_result.strip()
-            pageimg += "" if pageimg.endswith(("!", "?", ".")) else "."
-            result += pageimg
-
-    return result
-
-
-def genieai_load_pdf(pdf_path):
-    # doc = fitz.open(pdf_path)
-    doc = pymupdf.open(pdf_path)
-    results = {}
-
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = {executor.submit(genieai_process_page, doc, i): i for i in range(doc.page_count)}
-        for future in as_completed(futures):
-            page_idx = futures[future]
-            results[page_idx] = future.result()
-
-    combined_result = "".join(results[i] for i in sorted(results))
-    return combined_result
-
-
 async def document_loader(doc_path):
     if doc_path.endswith(".pdf"):
-        # return await load_pdf_async(doc_path) # to be tested later
-        return genieai_load_pdf(doc_path)
+        # Pages are extracted (and OCR'd) in worker processes, off the event loop
+        return await genieai_load_pdf_async(doc_path)
     elif doc_path.endswith(".txt") or doc_path.endswith(".md"):
         try:
              with open(doc_path, "r", encoding="utf-8") as f:
@@ -159,36 +116,71 @@ async def document_loader(doc_path):
         return origin_document_loader(doc_path)
 
 
-def is_valid_content(chunk):
-    """Check if the chunk content is suitable for llm to process, rather than web archive content or base64 encoded content."""
-    if not chunk:
-        return False
-
-    # Check if content is predominantly base64/web archive
-    lines = chunk.split('\n')
-    
-    # Count problematic lines
-    problematic_lines = 0
-    for line in lines:
-        line = line.strip()
-        if (line.startswith('//') or 
+# Chunk screening ######################################################################
+# is_valid_content is run on every chunk of every document, so it avoids Python-level
+# loops over characters: readable characters are counted with a bytes translate table
+# (regex for non-ASCII text), and problematic lines are only classified one by one
+# when C-level substring counts show they could reach the rejection threshold.
+_ASCII_READABLE = (string.ascii_letters + string.digits + " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f").encode("ascii")
+_ASCII_READABLE_OR_HIGH = _ASCII_READABLE + bytes(range(0x80, 0x100))
+# Readable characters are str.isalnum() or str.isspace(); \w is isalnum() plus '_'
+_UNREADABLE_CHAR = re.compile(r"[^\w\s]|_")
+_NON_ASCII_RUN = re.compile(r"[^\x00-\x7f]+")
+_MIME_MARKERS = ("MIME-Version", "Content-Type:", "Content-Transfer-Encoding")
+_BASE64_LINE_LENGTH = 50
+
+
+def _unreadable_chars(chunk: str) -> int:
+    if chunk.isascii():
+        # C-level delete of the readable bytes; what remains is unreadable
+        return len(chunk.encode("ascii").translate(None, _ASCII_READABLE))
+    # ASCII part through the translate table, only the non-ASCII characters through the regex
+    ascii_unreadable = len(chunk.encode("utf-8").translate(None, _ASCII_READABLE_OR_HIGH))
+    return ascii_unreadable + len(_UNREADABLE_CHAR.findall("".join(_NON_ASCII_RUN.findall(chunk))))
+
+
+def _max_problematic_lines(chunk: str, lines: List[str]) -> int:
+    """Upper bound of the problematic lines: every one contains at least one counted marker."""
+    bound = chunk.count("//") + chunk.count("------=_NextPart_") + chunk.lower().count("base64")
+    bound += sum(chunk.count(marker) for marker in _MIME_MARKERS)
+    # a base64 line is longer than 50 characters
+    bound += sum(map(_BASE64_LINE_LENGTH.__lt__, map(len, lines)))
+    return bound
+
+
+def _is_problematic_line(line: str) -> bool:
+    line = line.strip()
+    return (line.startswith('//') or
             'base64' in line.lower() or
             'MIME-Version' in line or
             'Content-Type:' in line or
             'Content-Transfer-Encoding' in line or
             line.startswith('------=_NextPart_') or
             # Base64 pattern: long strings of alphanumeric chars with + and /
-            (len(line) > 50 and line.replace('+', '').replace('/', '').replace('=', '').isalnum())):
-            problematic_lines += 1
-    
-    # If more than 50% of lines are problematic, consider it invalid
-    if len(lines) > 0 and problematic_lines / len(lines) > 0.5:
+            (len(line) > _BASE64_LINE_LENGTH and line.replace('+', '').replace('/', '').replace('=', '').isalnum()))
+
+
+def is_valid_content(chunk):
+    """Check if the chunk content is suitable for llm to process, rather than web archive content or base64 encoded content."""
+    if not chunk:
         return False
-    
+
+    # If more than 50% of lines are problematic (base64/web archive), consider it invalid
+    lines = chunk.split("\n")
+    if _max_problematic_lines(chunk, lines) / len(lines) > 0.5:
+        problematic_lines = sum(map(_is_problematic_line, lines))
+        if problematic_lines / len(lines) > 0.5:
+            return False
+
     # Also check for readable text content
-    readable_chars = sum(1 for char in chunk if char.isalnum() or char.isspace())
-    if len(chunk) > 0 and readable_chars / len(chunk) < 0.7:
+    readable_chars = len(chunk) - _unreadable_chars(chunk)
+    if readable_chars / len(chunk) < 0.7:
         return False
-    
+
     return True
+
+
+def validate_chunks(chunks: List[str]) -> List[bool]:
+    """is_valid_content over all the chunks of a document."""
+    return [is_valid_content(chunk) for chunk in chunks]
     
\ No newline at end of file
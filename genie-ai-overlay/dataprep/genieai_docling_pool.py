@@ -0,0 +1,218 @@
+# Copyright (C) 2025 International Telecommunication Union (ITU)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Process-pool Docling conversion for GENIE dataprep.
+
+Docling layout analysis is CPU heavy and holds the GIL for long stretches, so
+conversions run in dedicated worker processes:
+
+- every worker builds its own DocumentConverter on first use and reuses it
+- at most DOCLING_WORKERS + DOCLING_QUEUE_SIZE conversions are in flight,
+  further requests wait for a slot instead of piling up on the executor
+- PDFs longer than DOCLING_SPLIT_PAGES are converted in page ranges of
+  DOCLING_PAGE_RANGE pages, so one large document uses several workers
+- every document conversion records timing metrics
+
+Like genieai_pdf_extractor, this module is imported by the spawned workers and
+only imports docling inside them.
+"""
+
+import asyncio
+import collections
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from comps import CustomLogger
+
+logger = CustomLogger("genie-ai_docling_pool")
+logflag = os.getenv("LOGFLAG", False)
+
+# Pool configuration
+# every worker holds its own Docling models (~1-2 GB), hence half the CPUs and at most 4 by default
+DOCLING_DEFAULT_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+DOCLING_WORKERS = max(1, int(os.getenv("DOCLING_WORKERS", DOCLING_DEFAULT_WORKERS)))
+DOCLING_QUEUE_SIZE = max(0, int(os.getenv("DOCLING_QUEUE_SIZE", 4)))
+DOCLING_SPLIT_PAGES = max(1, int(os.getenv("DOCLING_SPLIT_PAGES", 100)))
+DOCLING_PAGE_RANGE = max(1, int(os.getenv("DOCLING_PAGE_RANGE", 50)))
+DOCLING_OCR_LANGUAGES = os.getenv("DOCLING_OCR_LANGUAGES", "en").split(",")
+DOCLING_METRICS_HISTORY = 100
+
+
+##########################################################################
+# Worker-process side
+##########################################################################
+
+_worker_converter = None
+_worker_converter_lock = threading.Lock()
+
+
+def build_docling_converter():
+    try:
+        from docling.document_converter import (
+            DocumentConverter,
+            PdfFormatOption,
+            )
+        from docling.datamodel.base_models import InputFormat
+        from docling.datamodel.pipeline_options import (
+            PdfPipelineOptions,
+            EasyOcrOptions,
+            )
+    except ImportError:
+        print("Please install docling and its dependencies: pip install docling easyocr")
+        raise
+
+    # configuring Docling to use easyocr (more lightweight than OPEA default library)
+    ocr_options = EasyOcrOptions(lang=DOCLING_OCR_LANGUAGES)
+
+    # Pipeline for PDFs and Images (for layout analysis and OCR)
+    pdf_and_image_pipeline_config = PdfPipelineOptions(
+        do_ocr=True,
+        ocr_options=ocr_options
+    )
+
+    # Map PDF file type to relevant pipeline
+    format_options = {
+        InputFormat.PDF: PdfFormatOption(pipeline_options=pdf_and_image_pipeline_config),
+        # Later can add pipelines for other file formats
+        }
+
+    return DocumentConverter(format_options=format_options)
+
+
+def _converter():
+    """This worker's DocumentConverter, built once on first use."""
+    global _worker_converter
+    if _worker_converter is None:
+        with _worker_converter_lock:
+            if _worker_converter is None:
+                _worker_converter = build_docling_converter()
+    return _worker_converter
+
+
+def load_docling_pipeline() -> int:
+    """Build the converter and load the PDF pipeline models of this worker."""
+    from docling.datamodel.base_models import InputFormat
+
+    _converter().initialize_pipeline(InputFormat.PDF)
+    return os.getpid()
+
+
+def convert_part(doc_path: str, page_range: Optional[Tuple[int, int]] = None) -> Tuple[str, float]:
+    """
+    Convert a document (or the 1-based inclusive page range of a PDF) to Markdown.
+    Returns (markdown, seconds spent converting).
+    """
+    start = time.perf_counter()
+    # .convert() handles parsing, layout analysis, table extraction, and OCR
+    if page_range is None:
+        result = _converter().convert(doc_path)
+    else:
+        result = _converter().convert(doc_path, page_range=page_range)
+    # Exporting to Markdown for enhanced readability.
+    return result.document.export_to_markdown(), time.perf_counter() - start
+
+
+##########################################################################
+# Parent-process side
+##########################################################################
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_slots: Optional[asyncio.Semaphore] = None
+_metrics = collections.deque(maxlen=DOCLING_METRICS_HISTORY)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=DOCLING_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(DOCLING_WORKERS + DOCLING_QUEUE_SIZE)
+    return _slots
+
+
+def warm_up_docling():
+    """Start the Docling workers and load their models; blocks until they are ready."""
+    pool = _get_pool()
+    pids = {f.result() for f in [pool.submit(load_docling_pipeline) for _ in range(DOCLING_WORKERS)]}
+    if logflag:
+        logger.info(f"[ docling pool ] workers ready: {sorted(pids)}")
+
+
+def shutdown_pool():
+    """Stop the worker processes (they are started again on demand)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def recent_metrics() -> List[Dict]:
+    """Timing metrics of the last converted documents, oldest first."""
+    return list(_metrics)
+
+
+def _page_count(doc_path: str) -> int:
+    if not doc_path.lower().endswith(".pdf"):
+        return 0
+    import pymupdf
+
+    with pymupdf.open(doc_path) as doc:
+        return doc.page_count
+
+
+def plan_page_ranges(page_count: int) -> List[Optional[Tuple[int, int]]]:
+    """Page ranges converted as separate tasks; [None] converts the document in one go."""
+    if page_count <= DOCLING_SPLIT_PAGES:
+        return [None]
+    return [
+        (first, min(first + DOCLING_PAGE_RANGE - 1, page_count))
+        for first in range(1, page_count + 1, DOCLING_PAGE_RANGE)
+    ]
+
+
+async def _convert_in_slot(doc_path: str, page_range: Optional[Tuple[int, int]], waits: List[float]):
+    queued = time.perf_counter()
+    async with _get_slots():
+        waits.append(time.perf_counter() - queued)
+        return await asyncio.wrap_future(_get_pool().submit(convert_part, doc_path, page_range))
+
+
+async def convert_document(doc_path: str) -> Tuple[str, Dict]:
+    """Convert a Docling-supported file to Markdown in the worker pool; returns (markdown, metrics)."""
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    page_count = await loop.run_in_executor(None, _page_count, doc_path)
+    page_ranges = plan_page_ranges(page_count)
+
+    waits: List[float] = []
+    parts = await asyncio.gather(*[_convert_in_slot(doc_path, r, waits) for r in page_ranges])
+
+    metrics = {
+        "doc_path": doc_path,
+        "pages": page_count,
+        "parts": len(page_ranges),
+        "workers": DOCLING_WORKERS,
+        "queue_wait_seconds": round(max(waits, default=0.0), 3),
+        "convert_seconds": round(sum(seconds for _, seconds in parts), 3),
+        "wall_seconds": round(time.perf_counter() - start, 3),
+    }
+    metrics["pages_per_second"] = round(page_count / metrics["wall_seconds"], 2) if metrics["wall_seconds"] else None
+    _metrics.append(metrics)
+    logger.info(f"[ docling pool ] converted {doc_path}: {metrics}")
+
+    return "\n\n".join(markdown for markdown, _ in parts), metrics
@@ -0,0 +1,326 @@
+# Copyright (C) 2025 International Telecommunication Union (ITU)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Process-pool PDF text extraction for GENIE dataprep.
+
+Page text extraction and EasyOCR inference are CPU/GIL bound, so pages are
+processed in worker processes instead of threads sharing one document:
+
+- the parent only plans the work: the text layer of every page is extracted
+  in batches by the text pool, embedded images go to the OCR pool
+- every worker opens its own pymupdf handle (cached per process and file)
+- results are yielded back in page order as soon as the next page is ready
+
+OCR is planned to run as little as possible:
+
+- pages whose text layer already covers the page are not OCR'd
+- images are hashed, so an image repeated on every page (logos, letterheads)
+  is OCR'd once per document
+- OCR output is cached on disk by image hash, across documents
+
+This module is imported by the spawned workers, so it must stay light at
+import time: heavy libraries (easyocr, cv2) are only loaded inside OCR workers.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import pymupdf
+
+from comps import CustomLogger
+
+logger = CustomLogger("genie-ai_pdf_extractor")
+logflag = os.getenv("LOGFLAG", False)
+
+# Worker pool configuration
+PDF_TEXT_WORKERS = max(1, int(os.getenv("PDF_TEXT_WORKERS", 2)))
+# Every OCR worker loads its own EasyOCR model (on the GPU when available)
+PDF_OCR_WORKERS = max(1, int(os.getenv("PDF_OCR_WORKERS", 1)))
+PDF_TEXT_BATCH_PAGES = max(1, int(os.getenv("PDF_TEXT_BATCH_PAGES", 16)))
+OCR_LANGUAGES = os.getenv("OCR_LANGUAGES", "en").split(",")
+
+# OCR planning configuration
+# Pages whose text blocks cover at least this fraction of the page are not OCR'd
+OCR_TEXT_COVERAGE_THRESHOLD = float(os.getenv("OCR_TEXT_COVERAGE_THRESHOLD", 0.5))
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", "./ocr_cache/")
+
+
+def _terminate(text: str) -> str:
+    return text if text.endswith(("!", "?", ".")) else text + "."
+
+
+##########################################################################
+# Worker-process side
+##########################################################################
+
+# Per-process state: the open document and the OCR reader
+_worker_doc = {"key": None, "doc": None}
+_worker_reader = None
+_worker_reader_lock = threading.Lock()
+
+
+def _open_document(pdf_path: str):
+    """Open (or reuse) this worker's own handle on the file."""
+    stat = os.stat(pdf_path)
+    key = (pdf_path, stat.st_mtime_ns, stat.st_size)
+    if _worker_doc["key"] != key:
+        if _worker_doc["doc"] is not None:
+            _worker_doc["doc"].close()
+        _worker_doc["doc"] = pymupdf.open(pdf_path)
+        _worker_doc["key"] = key
+    return _worker_doc["doc"]
+
+
+def _ocr_reader():
+    global _worker_reader
+    if _worker_reader is None:
+        with _worker_reader_lock:
+            if _worker_reader is None:
+                import easyocr
+
+                _worker_reader = easyocr.Reader(OCR_LANGUAGES)
+    return _worker_reader
+
+
+def load_ocr_reader() -> int:
+    """Load the EasyOCR model of this worker ahead of the first image."""
+    _ocr_reader()
+    return os.getpid()
+
+
+def _ocr_image(img_bytes: bytes) -> str:
+    import cv2
+    import numpy as np
+
+    img_array = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+    return "".join(_ocr_reader().readtext(img_array, detail=0)).strip()
+
+
+def _page_text(doc, idx: int) -> str:
+    return _terminate(doc.load_page(idx).get_text().strip())
+
+
+def extract_text_pages(pdf_path: str, page_indices: List[int]) -> List[Tuple[int, str]]:
+    """Text-layer extraction of a batch of pages."""
+    doc = _open_document(pdf_path)
+    return [(idx, _page_text(doc, idx)) for idx in page_indices]
+
+
+def ocr_document_image(pdf_path: str, xref: int) -> str:
+    """OCR of one embedded image, identified by its xref."""
+    doc = _open_document(pdf_path)
+    return _ocr_image(doc.extract_image(xref)["image"])
+
+
+##########################################################################
+# Parent-process side
+##########################################################################
+
+_pools: Dict[str, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(kind: str, workers: int) -> ProcessPoolExecutor:
+    # 'spawn' keeps workers independent from CUDA/thread state of the service process
+    with _pools_lock:
+        if kind not in _pools:
+            _pools[kind] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pools[kind]
+
+
+def warm_up_ocr():
+    """Start the OCR workers and load their models; blocks until they are ready."""
+    pool = _get_pool("ocr", PDF_OCR_WORKERS)
+    pids = {f.result() for f in [pool.submit(load_ocr_reader) for _ in range(PDF_OCR_WORKERS)]}
+    if logflag:
+        logger.info(f"[ pdf extractor ] OCR workers ready: {sorted(pids)}")
+
+
+def shutdown_pools():
+    """Stop the worker processes (they are started again on demand)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+##########################################################################
+# OCR output cache (shared across documents and processes)
+##########################################################################
+
+def image_hash(img_bytes: bytes) -> str:
+    """Cache key of an image: its content and the OCR languages."""
+    digest = hashlib.sha256(",".join(OCR_LANGUAGES).encode("utf-8") + b"\0")
+    digest.update(img_bytes)
+    return digest.hexdigest()
+
+
+def _cache_path(img_hash: str) -> str:
+    return os.path.join(OCR_CACHE_DIR, img_hash[:2], f"{img_hash}.txt")
+
+
+def ocr_cache_get(img_hash: str) -> Optional[str]:
+    if not OCR_CACHE_ENABLED:
+        return None
+    try:
+        with open(_cache_path(img_hash), "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"[ pdf extractor ] unreadable OCR cache entry {img_hash}: {e}")
+        return None
+
+
+def ocr_cache_put(img_hash: str, text: str):
+    if not OCR_CACHE_ENABLED:
+        return
+    path = _cache_path(img_hash)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write then rename so concurrent readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"[ pdf extractor ] failed to cache OCR output {img_hash}: {e}")
+
+
+##########################################################################
+# Planning and scheduling
+##########################################################################
+
+def _text_coverage(page) -> float:
+    """Fraction of the page area covered by non-empty text blocks."""
+    page_area = page.rect.width * page.rect.height
+    if page_area <= 0:
+        return 0.0
+    covered = sum(
+        (x1 - x0) * (y1 - y0)
+        for x0, y0, x1, y1, text, _, block_type in page.get_text("blocks")
+        if block_type == 0 and text.strip()
+    )
+    return min(1.0, covered / page_area)
+
+
+def plan_pdf_pages(pdf_path: str) -> Dict:
+    """
+    Plan the extraction of a PDF.
+
+    Returns a dict with:
+        page_count: number of pages
+        text_batches: batches of page indices for text-layer extraction (all pages)
+        page_images: {page index: [image hash, ...]} for pages that need OCR
+        ocr_jobs: {image hash: xref} distinct images without cached OCR output
+        cached: {image hash: OCR text} distinct images served from the cache
+        stats: counters for logging
+    """
+    page_images: Dict[int, List[str]] = {}
+    xref_hashes: Dict[int, str] = {}
+    ocr_jobs: Dict[str, int] = {}
+    cached: Dict[str, str] = {}
+    stats = {"ocr_pages": 0, "covered_pages": 0, "images": 0, "distinct_images": 0, "cache_hits": 0}
+
+    with pymupdf.open(pdf_path) as doc:
+        page_count = doc.page_count
+        for idx in range(page_count):
+            images = doc.get_page_images(idx)
+            if not images:
+                continue
+            if _text_coverage(doc.load_page(idx)) >= OCR_TEXT_COVERAGE_THRESHOLD:
+                stats["covered_pages"] += 1
+                continue
+
+            stats["ocr_pages"] += 1
+            hashes = []
+            for img in images:
+                xref = img[0]
+                stats["images"] += 1
+                if xref not in xref_hashes:
+                    xref_hashes[xref] = image_hash(doc.extract_image(xref)["image"])
+                img_hash = xref_hashes[xref]
+                if img_hash not in ocr_jobs and img_hash not in cached:
+                    stats["distinct_images"] += 1
+                    text = ocr_cache_get(img_hash)
+                    if text is None:
+                        ocr_jobs[img_hash] = xref
+                    else:
+                        stats["cache_hits"] += 1
+                        cached[img_hash] = text
+                hashes.append(img_hash)
+            page_images[idx] = hashes
+
+    pages = list(range(page_count))
+    text_batches = [pages[i : i + PDF_TEXT_BATCH_PAGES] for i in range(0, page_count, PDF_TEXT_BATCH_PAGES)]
+    return {
+        "page_count": page_count,
+        "text_batches": text_batches,
+        "page_images": page_images,
+        "ocr_jobs": ocr_jobs,
+        "cached": cached,
+        "stats": stats,
+    }
+
+
+async def iter_pdf_pages(pdf_path: str) -> AsyncIterator[Tuple[int, str]]:
+    """Yield (page index, page text) in page order, extracting pages in the worker pools."""
+    loop = asyncio.get_running_loop()
+    plan = await loop.run_in_executor(None, plan_pdf_pages, pdf_path)
+    page_images = plan["page_images"]
+    logger.info(f"[ pdf extractor ] {pdf_path}: {plan['page_count']} pages, OCR plan {plan['stats']}")
+
+    text_pool = _get_pool("text", PDF_TEXT_WORKERS)
+    ocr_pool = _get_pool("ocr", PDF_OCR_WORKERS)
+
+    # Submit in page order so that the first pages are done first
+    first_use: Dict[str, int] = {}
+    for idx in sorted(page_images):
+        for img_hash in page_images[idx]:
+            first_use.setdefault(img_hash, idx)
+    text_futures = {
+        asyncio.wrap_future(text_pool.submit(extract_text_pages, pdf_path, batch)): None
+        for batch in plan["text_batches"]
+    }
+    ocr_futures = {
+        asyncio.wrap_future(ocr_pool.submit(ocr_document_image, pdf_path, plan["ocr_jobs"][img_hash])): img_hash
+        for img_hash in sorted(plan["ocr_jobs"], key=lambda h: first_use[h])
+    }
+    futures = {**text_futures, **ocr_futures}
+
+    page_texts: Dict[int, str] = {}
+    ocr_texts: Dict[str, str] = dict(plan["cached"])
+    next_idx = 0
+    try:
+        pending = set(futures)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                img_hash = futures[future]
+                if img_hash is None:
+                    page_texts.update(future.result())
+                else:
+                    ocr_texts[img_hash] = future.result()
+                    ocr_cache_put(img_hash, ocr_texts[img_hash])
+
+            while next_idx in page_texts and all(h in ocr_texts for h in page_images.get(next_idx, [])):
+                result = page_texts.pop(next_idx)
+                for img_hash in page_images.get(next_idx, []):
+                    result += _terminate(ocr_texts[img_hash])
+                yield next_idx, result
+                next_idx += 1
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+async def load_pdf_async(pdf_path: str) -> str:
+    """Extract the whole PDF text without blocking the event loop."""
+    return "".join([text async for _, text in iter_pdf_pages(pdf_path)])
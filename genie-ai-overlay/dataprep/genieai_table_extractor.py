@@ -0,0 +1,173 @@
+# Copyright (C) 2025 International Telecommunication Union (ITU)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Background PDF table extraction for GENIE dataprep.
+
+Table extraction (unstructured partition_pdf with table structure inference)
+is slower than the text extraction of the same PDF, so it no longer runs after
+it on the request path:
+
+- the table pass is started in a worker process as soon as the document is
+  received and runs while the text is extracted and chunked
+- "llm" table summaries are generated with at most TABLE_SUMMARY_CONCURRENCY
+  concurrent LLM calls instead of one after the other
+- the caller appends the table chunks to the chunk stream once they are ready
+
+The chunks are identical to the ones of get_tables_result.
+Like genieai_docling_pool, this module is imported by the spawned workers and
+only imports unstructured inside them.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from comps import CustomLogger
+
+logger = CustomLogger("genie-ai_table_extractor")
+logflag = os.getenv("LOGFLAG", False)
+
+# Pool configuration
+TABLE_WORKERS = max(1, int(os.getenv("TABLE_WORKERS", 1)))
+TABLE_SUMMARY_CONCURRENCY = max(1, int(os.getenv("TABLE_SUMMARY_CONCURRENCY", 4)))
+
+
+##########################################################################
+# Worker-process side
+##########################################################################
+
+def partition_tables(pdf_path: str, table_strategy: Optional[str]) -> List[Dict]:
+    """
+    Find the tables of a PDF.
+    Returns [{"content": table HTML, "summary": caption/parent text ("hq") or None}, ...] in document order.
+    """
+    from unstructured.documents.elements import FigureCaption
+    from unstructured.partition.pdf import partition_pdf
+
+    from comps.dataprep.src.utils import get_relation
+
+    raw_pdf_elements = partition_pdf(
+        filename=pdf_path,
+        infer_table_structure=True,
+    )
+    tables = []
+    for table in [el for el in raw_pdf_elements if el.category == "Table"]:
+        table_summary = None
+        if table_strategy == "hq":
+            table_coords = table.metadata.coordinates.points
+            table_page_number = table.metadata.page_number
+            min_distance = float("inf")
+            for element in raw_pdf_elements:
+                if isinstance(element, FigureCaption) or element.text.startswith("Tab"):
+                    related, y_distance = get_relation(
+                        table_coords, element.metadata.coordinates.points,
+                        table_page_number, element.metadata.page_number
+                    )
+                    if related and y_distance < min_distance:
+                        min_distance = y_distance
+                        table_summary = element.text
+            if table_summary is None:
+                parent_id = table.metadata.parent_id
+                for element in raw_pdf_elements:
+                    if element.id == parent_id:
+                        table_summary = element.text
+                        break
+        tables.append({"content": table.metadata.text_as_html, "summary": table_summary})
+    return tables
+
+
+##########################################################################
+# Parent-process side
+##########################################################################
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_summary_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=TABLE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _get_summary_slots() -> asyncio.Semaphore:
+    global _summary_slots
+    if _summary_slots is None:
+        _summary_slots = asyncio.Semaphore(TABLE_SUMMARY_CONCURRENCY)
+    return _summary_slots
+
+
+def shutdown_pool():
+    """Stop the worker processes (they are started again on demand)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def format_table_chunk(content: str, summary: Optional[str]) -> str:
+    if summary is None:
+        return f"[Table: {content}]"
+    return f"|Table: [Summary: {summary}], [Content: {content}]|"
+
+
+async def _summarize(content: str) -> str:
+    from comps.dataprep.src.utils import llm_generate
+
+    async with _get_summary_slots():
+        summary = await asyncio.to_thread(llm_generate, content)
+    return summary.lstrip("\n ")
+
+
+async def extract_table_chunks(pdf_path: str, table_strategy: Optional[str]) -> List[str]:
+    """Table chunks of a PDF (same chunks as get_tables_result), extracted in the worker pool."""
+    if table_strategy == "fast":
+        return []
+    start = time.perf_counter()
+    tables = await asyncio.wrap_future(_get_pool().submit(partition_tables, pdf_path, table_strategy))
+    partitioned = time.perf_counter() - start
+
+    if table_strategy == "llm":
+        summaries = await asyncio.gather(*[_summarize(table["content"]) for table in tables])
+    else:
+        summaries = [table["summary"] for table in tables]
+
+    logger.info(
+        f"[ table extractor ] {pdf_path}: {len(tables)} tables, partition {partitioned:.1f}s, "
+        f"total {time.perf_counter() - start:.1f}s"
+    )
+    return [format_table_chunk(table["content"], summary) for table, summary in zip(tables, summaries)]
+
+
+def start_table_extraction(doc_path) -> Optional[asyncio.Task]:
+    """
+    Start the table pass of a DocPath in the background when it asks for it
+    (process_table on a PDF); returns the task, or None when there is nothing to do.
+    """
+    if not getattr(doc_path, "process_table", False) or not doc_path.path.endswith(".pdf"):
+        return None
+    if doc_path.table_strategy == "fast":
+        return None
+    return asyncio.create_task(extract_table_chunks(doc_path.path, doc_path.table_strategy))
+
+
+async def collect_table_chunks(task: Optional[asyncio.Task]) -> List[str]:
+    """Wait for a table pass started with start_table_extraction; failures only cost the table chunks."""
+    if task is None:
+        return []
+    try:
+        return await task
+    except Exception as e:
+        logger.warning(f"Failed to extract table chunks: {e}")
+        return []
@@ -5,7 +5,6 @@ import os
 from typing import Any, Union
 
 import openai
-from arango import ArangoClient
 from arango.database import StandardDatabase
 from fastapi import HTTPException
 from langchain_arangodb import ArangoVector
@@ -15,6 +14,9 @@ from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 from comps import CustomLogger, EmbedDoc, OpeaComponent, OpeaComponentRegistry, ServiceType
 from comps.cores.proto.genieai_api_protocol import ChatCompletionRequest, RetrievalRequest, RetrievalRequestArangoDB
+from comps.cores.storages.arango_client import ArangoConnectionManager
+from comps.cores.storages.graph_metadata import GraphMetadataStore, metadata_mismatches
+from comps.cores.storages.vector_index import VectorIndexManager
 
 from .config import (
     ARANGO_DB_NAME,
@@ -73,6 +75,15 @@ class OpeaArangoRetriever(OpeaComponent):
         super().__init__(name, ServiceType.RETRIEVER.name.lower(), description, config)
 
         self._initialize_client()
+        self.vector_indexes = VectorIndexManager(self.db, embedding_field=ARANGO_EMBEDDING_FIELD)
+
+        # Embedding model recorded by dataprep for each graph, validated against ours
+        self.graph_metadata = GraphMetadataStore(self.db)
+        if OPENAI_API_KEY and OPENAI_EMBED_MODEL and OPENAI_EMBED_ENABLED:
+            self.embedding_model_id = OPENAI_EMBED_MODEL
+        else:
+            self.embedding_model_id = TEI_EMBED_MODEL
+        self._strategy_warnings = set()
 
         if SUMMARIZER_ENABLED:
             self._initialize_llm()
@@ -111,46 +122,63 @@ class OpeaArangoRetriever(OpeaComponent):
             raise HTTPException(status_code=400, detail="No LLM environment variables are set, cannot generate graphs.")
 
     def _initialize_client(self):
-        """Initialize the ArangoDB connection with retry logic."""
-        import time
-        
-        max_retries = 10
-        retry_delay = 2  # Start with 2 seconds
-        
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"Attempting to connect to ArangoDB (attempt {attempt + 1}/{max_retries})...")
-                self.client = ArangoClient(hosts=ARANGO_URL)
-                sys_db = self.client.db(name="_system", username=ARANGO_USERNAME, password=ARANGO_PASSWORD, verify=True)
+        """Initialize the ArangoDB connection, shared by the ArangoDB components of the process (with retry logic)."""
+        self.client = ArangoConnectionManager.get_client(ARANGO_URL)
+        self.db = ArangoConnectionManager.get_db(ARANGO_URL, ARANGO_DB_NAME, ARANGO_USERNAME, ARANGO_PASSWORD)
+
+    def _embedding_dimension(self, graph_name: str, collection, distance_strategy: str) -> int:
+        """
+        Embedding dimension of a graph, from the metadata dataprep recorded for it (read once).
+        Returns 0 when the graph was embedded with another model than the retriever's.
+        Graphs ingested before the metadata existed are sampled instead.
+        """
+        metadata = self.graph_metadata.get(graph_name)
+        expected = {"embedding_model": self.embedding_model_id}
+        if metadata is not None and metadata_mismatches(metadata, expected):
+            # the graph may have been re-created since its metadata was cached
+            metadata = self.graph_metadata.get(graph_name, refresh=True)
+
+        if metadata is not None:
+            mismatches = metadata_mismatches(metadata, expected)
+            if mismatches:
+                logger.error(
+                    f"Graph '{graph_name}' was embedded with another model than the retriever's "
+                    f"({'; '.join(mismatches)}); similarity scores would be meaningless."
+                )
+                return 0
+            stored_strategy = metadata.get("distance_strategy")
+            if stored_strategy and stored_strategy != str(distance_strategy).upper():
+                if (graph_name, distance_strategy) not in self._strategy_warnings:
+                    self._strategy_warnings.add((graph_name, distance_strategy))
+                    logger.warning(
+                        f"Graph '{graph_name}' was prepared for {stored_strategy} distance, searching with {distance_strategy}."
+                    )
+            return metadata["embedding_dimension"]
 
-                if not sys_db.has_database(ARANGO_DB_NAME):
-                    sys_db.create_database(ARANGO_DB_NAME)
+        random_doc = collection.random()
+        random_doc_id = random_doc["_id"]
+        sample_embedding = random_doc.get(ARANGO_EMBEDDING_FIELD)
 
-                self.db = self.client.db(name=ARANGO_DB_NAME, username=ARANGO_USERNAME, password=ARANGO_PASSWORD, verify=True)
-                logger.info(f"Successfully connected to ArangoDB {self.db.version()}.")
-                return  # Success, exit the retry loop
-                
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"Failed to connect to ArangoDB: {e}. Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    retry_delay = min(retry_delay * 1.5, 30)  # Exponential backoff, max 30 seconds
-                else:
-                    logger.error(f"Failed to connect to ArangoDB after {max_retries} attempts: {e}")
-                    raise
+        if not sample_embedding:
+            logger.error(f"Document '{random_doc_id}' is missing field '{ARANGO_EMBEDDING_FIELD}'.")
+            return 0
+
+        if not isinstance(sample_embedding, list):
+            logger.error(f"Document '{random_doc_id}' has a non-list embedding field, found {type(sample_embedding)}.")
+            return 0
+
+        if logflag:
+            logger.debug(f"Graph '{graph_name}' has no metadata, sampled dimension {len(sample_embedding)}.")
+        return len(sample_embedding)
 
     def check_health(self) -> bool:
         """Checks the health of the retriever service."""
         if logflag:
             logger.debug("[ check health ] start to check health of ArangoDB")
-        try:
-            version = self.db.version()
-            if logflag:
-                logger.debug(f"[ check health ] Successfully connected to ArangoDB {version}!")
-            return True
-        except Exception as e:
-            logger.error(f"[ check health ] Failed to connect to ArangoDB: {e}")
-            return False
+        healthy = ArangoConnectionManager.check_health(self.db, ARANGO_URL)
+        if healthy and logflag:
+            logger.debug("[ check health ] Successfully connected to ArangoDB!")
+        return healthy
 
     def fetch_neighborhoods(
         self,
@@ -437,6 +465,7 @@ class OpeaArangoRetriever(OpeaComponent):
         if not self.db.has_graph(graph_name):
             graph_names_for_debug = [g["name"] for g in self.db.graphs()]
             logger.error(f"Graph '{graph_name}' does not exist in ArangoDB. Graphs: {graph_names_for_debug}")
+            self.graph_metadata.forget(graph_name)
             return []
 
         v_col_exists = self.db.graph(graph_name).has_vertex_collection(collection_name)
@@ -460,32 +489,26 @@ class OpeaArangoRetriever(OpeaComponent):
             logger.error(f"Collection '{collection_name}' is empty.")
             return []
 
-        if collection_count < num_centroids:
-            m = f"Collection '{collection_name}' has fewer documents ({collection_count}) than the number of centroids ({num_centroids}). Please adjust the number of centroids."
-            logger.error(m)
-            return []
-
         ################################
         # Retrieve Embedding Dimension #
         ################################
 
-        random_doc = collection.random()
-        random_doc_id = random_doc["_id"]
-        sample_embedding = random_doc.get(ARANGO_EMBEDDING_FIELD)
-
-        if not sample_embedding:
-            logger.error(f"Document '{random_doc_id}' is missing field '{ARANGO_EMBEDDING_FIELD}'.")
+        dimension = self._embedding_dimension(graph_name, collection, distance_strategy)
+        if not dimension:
             return []
 
-        if not isinstance(sample_embedding, list):
-            logger.error(f"Document '{random_doc_id}' has a non-list embedding field, found {type(embedding)}.")
+        if embedding is not None and len(embedding) != dimension:
+            logger.error(f"Query embedding has {len(embedding)} dimensions, graph '{graph_name}' has {dimension}.")
             return []
 
-        dimension = len(sample_embedding) 
-
-        if dimension == 0:
-            logger.error(f"Document '{random_doc_id}' has an empty embedding field.")
-            return []
+        # Approximate search only runs on a vector index the manager built for the collection size;
+        # while there is none (small collection, index still building) the search is exact.
+        vector_index_name = None
+        if use_approx_search:
+            vector_index_name = self.vector_indexes.index_for_search(collection_name, distance_strategy, dimension)
+            if vector_index_name is None and logflag:
+                logger.debug(f"No vector index ready on '{collection_name}', using exact search.")
+        use_approx = vector_index_name is not None
 
         if OPENAI_API_KEY and OPENAI_EMBED_MODEL and OPENAI_EMBED_ENABLED:
             embeddings = OpenAIEmbeddings(model=OPENAI_EMBED_MODEL, dimensions=dimension)
@@ -509,6 +532,7 @@ class OpeaArangoRetriever(OpeaComponent):
                 distance_strategy=distance_strategy,
                 num_centroids=num_centroids,
                 search_type=search_mode,
+                vector_index_name=vector_index_name or "vector_index",
             )
         except Exception as e:
             logger.error(f"Error during ArangoVector initialization: {e}")
@@ -536,7 +560,7 @@ class OpeaArangoRetriever(OpeaComponent):
                     embedding=embedding, 
                     k=input.k,
                     score_threshold=input.score_threshold,
-                    use_approx=use_approx_search,
+                    use_approx=use_approx,
                     filter_clause=aql_filter_clause if search_start == 'chunk' else "",
                 )
                 search_res = [{"doc": doc, "score": score} for doc, score in docs_and_similarities]
@@ -552,7 +576,7 @@ class OpeaArangoRetriever(OpeaComponent):
                     k=input.k,
                     fetch_k=input.fetch_k,
                     lambda_mult=input.lambda_mult,
-                    use_approx=use_approx_search,
+                    use_approx=use_approx,
                     filter_clause=aql_filter_clause if search_start == 'chunk' else "",  # might need to change to filter_clause as per: https://github.com/arangoml/langchain-arangodb/blob/a1d9a4c064413d5aedc2263540b852f6938421e9/libs/arangodb/langchain_arangodb/vectorstores/arangodb_vector.py#L581
                 )
                 search_res = [{"doc":doc, "score":0.0} for doc in results]
@@ -562,7 +586,7 @@ class OpeaArangoRetriever(OpeaComponent):
                     query=query,
                     embedding=embedding, 
                     k=input.k,
-                    use_approx=use_approx_search,
+                    use_approx=use_approx,
                     filter_clause=aql_filter_clause if search_start == 'chunk' else "",  # might need to change to filter_clause as per: https://github.com/arangoml/langchain-arangodb/blob/a1d9a4c064413d5aedc2263540b852f6938421e9/libs/arangodb/langchain_arangodb/vectorstores/arangodb_vector.py#L581
                 )
                 search_res = [{"doc":doc, "score":0.0} for doc in results]
@@ -43,6 +43,7 @@ from comps.cores.proto.genieai_api_protocol import (
     RetrievalResponse,
     RetrievalResponseData,
 )
+from comps.cores.storages.arango_client import ArangoConnectionManager
 
 logger = CustomLogger("genieai_retriever_microservice")
 logflag = os.getenv("LOGFLAG", False)
@@ -119,6 +120,23 @@ async def retrieve_docs(
         raise
 
 
+@register_microservice(
+    name="opea_service@retrievers",
+    service_type=ServiceType.RETRIEVER,
+    endpoint="/v1/retrieval/vector_indexes",
+    host="0.0.0.0",
+    port=7000,
+    methods=["GET"],
+)
+async def get_vector_indexes():
+    """State of the vector indexes used by approximate search."""
+    vector_indexes = getattr(loader.component, "vector_indexes", None)
+    return {"vector_indexes": vector_indexes.report() if vector_indexes else []}
+
+
 if __name__ == "__main__":
     logger.info("OPEA Retriever Microservice is starting...")
+    app = opea_microservices["opea_service@retrievers"].app
+    # Close the shared ArangoDB connection pools
+    app.add_event_handler("shutdown", ArangoConnectionManager.close_all)
     opea_microservices["opea_service@retrievers"].start()
\ No newline at end of file
@@ -1,25 +1,81 @@
 ﻿# Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Optional
 
 import bson.errors as BsonError
 from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
 
-from comps.chathistory.src.integrations.mongo.config import COLLECTION_NAME
+from comps.chathistory.src.integrations.mongo.config import CHAT_HISTORY_BUCKET_SIZE, COLLECTION_NAME
 from comps.chathistory.src.integrations.mongo.mongo_conn import MongoClient
 
 
+# Sort orders of the paginated listing: sort keys, newest first, with _id as tie-breaker
+LIST_SORTS = {
+    "updated": ("updated_at", "_id"),
+    "created": ("_id",),
+}
+MAX_PAGE_SIZE = 200
+
+
+def _encode_cursor(values: list) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, ObjectId) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str, sort_keys: tuple) -> list:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if len(payload) != len(sort_keys):
+            raise ValueError("cursor does not match the sort order")
+        return [
+            ObjectId(v) if key == "_id" else datetime.fromisoformat(v) if v is not None else None
+            for key, v in zip(sort_keys, payload)
+        ]
+    except (ValueError, TypeError, BsonError.InvalidId) as e:
+        raise KeyError(f"Invalid cursor: {e}")
+
+
 class DocumentStore:
 
     def __init__(
         self,
         user: str,
+        db_client=None,
     ):
         self.user = user
+        # shared database handle; defaults to the process-wide Mongo client
+        self.db_client = db_client
 
     def initialize_storage(self) -> None:
-        self.db_client = MongoClient.get_db_client()
+        if self.db_client is None:
+            self.db_client = MongoClient.get_db_client()
         self.collection = self.db_client[COLLECTION_NAME]
+        # overflow buckets of long conversations (CHAT_HISTORY_BUCKET_SIZE)
+        self.overflow_collection = self.db_client[f"{COLLECTION_NAME}_overflow"]
+
+    async def ensure_indexes(self) -> None:
+        """Creates the indexes of the per-user listings (idempotent, called at service startup).
+
+        Conversations stored before updated_at existed get their creation time, so that
+        they keep their place in the "updated" order.
+        """
+        await self.collection.update_many(
+            {"updated_at": {"$exists": False}}, [{"$set": {"updated_at": {"$toDate": "$_id"}}}]
+        )
+        await self.collection.update_many(
+            {"message_count": {"$exists": False}, "data.messages": {"$type": "array"}},
+            [{"$set": {"message_count": {"$size": "$data.messages"}}}],
+        )
+        await self.overflow_collection.create_index(
+            [("conversation_id", ASCENDING), ("bucket", ASCENDING)], unique=True
+        )
+        await self.collection.create_index([("data.user", ASCENDING), ("_id", DESCENDING)])
+        await self.collection.create_index([("data.user", ASCENDING), ("updated_at", DESCENDING), ("_id", DESCENDING)])
 
     async def save_document(self, document):
         """Stores a new document into the storage.
@@ -34,9 +90,11 @@ class DocumentStore:
             Exception: If an error occurs while storing the document.
         """
         try:
-            inserted_conv = await self.collection.insert_one(
-                document.model_dump(by_alias=True, mode="json", exclude={"id"})
-            )
+            new_document = document.model_dump(by_alias=True, mode="json", exclude={"id"})
+            new_document["updated_at"] = datetime.now(timezone.utc)
+            if isinstance(new_document["data"].get("messages"), list):
+                new_document["message_count"] = len(new_document["data"]["messages"])
+            inserted_conv = await self.collection.insert_one(new_document)
             document_id = str(inserted_conv.inserted_id)
             return document_id
 
@@ -61,14 +119,83 @@ class DocumentStore:
         """
         try:
             _id = ObjectId(document_id)
+            data = updated_data.model_dump(by_alias=True, mode="json")
+            update = {"data": data, "first_query": first_query, "updated_at": datetime.now(timezone.utc)}
+            if isinstance(data.get("messages"), list):
+                update["message_count"] = len(data["messages"])
+            update_result = await self.collection.update_one({"_id": _id, "data.user": self.user}, {"$set": update})
+            if update_result.modified_count == 1:
+                # the full message list replaces any overflow bucket
+                await self.overflow_collection.delete_many({"conversation_id": _id})
+                return "Updated document : {}".format(document_id)
+            else:
+                raise Exception("Not able to Update the Document")
+
+        except BsonError.InvalidId as e:
+            print(e)
+            raise KeyError(e)
+        except Exception as e:
+            print(e)
+            raise Exception(e)
+
+    async def append_messages(self, document_id, messages: list[dict], first_query: Optional[str] = None) -> str:
+        """Appends new messages to a conversation without rewriting the stored ones.
+
+        The messages are $push-ed together with the counters, first_query and
+        updated_at in one atomic update. With CHAT_HISTORY_BUCKET_SIZE set, once the
+        conversation document holds that many messages further messages go to
+        overflow documents, so the size of every write stays constant.
+
+        Args:
+            document_id (str): The ID of the conversation.
+            messages (list[dict]): The new messages, in order.
+            first_query (str, optional): Set as first_query when given.
+
+        Returns:
+            str: A confirmation message.
+
+        Raises:
+            KeyError: If an invalid document_id is provided.
+            Exception: If the conversation does not exist or its messages are not a list.
+        """
+        try:
+            _id = ObjectId(document_id)
+            if not messages:
+                return "Updated document : {}".format(document_id)
+            count = len(messages)
+            fields = {"updated_at": datetime.now(timezone.utc)}
+            if first_query is not None:
+                fields["first_query"] = first_query
+
+            query = {"_id": _id, "data.user": self.user, "data.messages": {"$type": "array"}}
+            if CHAT_HISTORY_BUCKET_SIZE:
+                query["message_count"] = {"$lte": CHAT_HISTORY_BUCKET_SIZE - count}
             update_result = await self.collection.update_one(
-                {"_id": _id, "data.user": self.user},
-                {"$set": {"data": updated_data.model_dump(by_alias=True, mode="json"), "first_query": first_query}},
+                query,
+                {"$push": {"data.messages": {"$each": messages}}, "$inc": {"message_count": count}, "$set": fields},
             )
             if update_result.modified_count == 1:
                 return "Updated document : {}".format(document_id)
-            else:
+            if not CHAT_HISTORY_BUCKET_SIZE:
+                raise Exception("Not able to Update the Document")
+
+            # the conversation document is full: reserve the positions, then append to their bucket
+            conversation = await self.collection.find_one_and_update(
+                {"_id": _id, "data.user": self.user, "data.messages": {"$type": "array"}},
+                {"$inc": {"message_count": count}, "$set": fields},
+                projection={"message_count": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+            if conversation is None:
                 raise Exception("Not able to Update the Document")
+            first_position = conversation["message_count"] - count
+            bucket = max(0, first_position - CHAT_HISTORY_BUCKET_SIZE) // CHAT_HISTORY_BUCKET_SIZE
+            await self.overflow_collection.update_one(
+                {"conversation_id": _id, "bucket": bucket},
+                {"$push": {"messages": {"$each": messages}}, "$setOnInsert": {"user": self.user}},
+                upsert=True,
+            )
+            return "Updated document : {}".format(document_id)
 
         except BsonError.InvalidId as e:
             print(e)
@@ -99,6 +226,69 @@ class DocumentStore:
             print(e)
             raise Exception(e)
 
+    async def get_documents_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        sort_by: str = "updated",
+    ) -> dict:
+        """Retrieves one page of the conversations of the user, newest first.
+
+        Pages are read with a keyset on the sort keys (never with skip), so every
+        page costs the same index range scan however long the history is.
+
+        Args:
+            limit (int): Maximum number of conversations in the page (capped at MAX_PAGE_SIZE).
+            cursor (str, optional): The next_cursor of the previous page; None for the first page.
+            fields (list[str], optional): Fields to return; by default every field but the conversation data.
+            sort_by (str): "updated" (last update) or "created".
+
+        Returns:
+            dict: {"conversations": list of conversation dictionaries, "next_cursor": str | None}.
+
+        Raises:
+            KeyError: If sort_by or cursor is invalid.
+            Exception: If there is an error while retrieving the documents.
+        """
+        if sort_by not in LIST_SORTS:
+            raise KeyError(f"Invalid sort_by: {sort_by}")
+        sort_keys = LIST_SORTS[sort_by]
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        query: dict = {"data.user": self.user}
+        if cursor:
+            values = _decode_cursor(cursor, sort_keys)
+            # documents strictly after the last one of the previous page, in (key1, key2...) descending order
+            query["$or"] = [
+                {**{k: v for k, v in zip(sort_keys[:i], values[:i])}, sort_keys[i]: {"$lt": values[i]}}
+                for i in range(len(sort_keys))
+            ]
+        if fields:
+            projection = {field: 1 for field in fields}
+            projection.update({key: 1 for key in sort_keys})
+        else:
+            projection = {"data": 0}
+
+        try:
+            documents = await (
+                self.collection.find(query, projection)
+                .sort([(key, DESCENDING) for key in sort_keys])
+                .limit(limit + 1)
+                .to_list(length=limit + 1)
+            )
+            next_cursor = None
+            if len(documents) > limit:
+                documents = documents[:limit]
+                next_cursor = _encode_cursor([documents[-1].get(key) for key in sort_keys])
+            for document in documents:
+                document["id"] = str(document.pop("_id"))
+            return {"conversations": documents, "next_cursor": next_cursor}
+
+        except Exception as e:
+            print(e)
+            raise Exception(e)
+
     async def get_user_documents_by_id(self, document_id) -> dict | None:
         """Retrieves a user document from the collection based on the given document ID.
 
@@ -113,6 +303,12 @@ class DocumentStore:
             response: dict | None = await self.collection.find_one({"_id": _id, "data.user": self.user})
             if response:
                 del response["_id"]
+                messages = response["data"].get("messages")
+                # messages appended past the conversation document are in its overflow buckets
+                if isinstance(messages, list) and response.get("message_count", 0) > len(messages):
+                    cursor = self.overflow_collection.find({"conversation_id": _id}).sort("bucket", ASCENDING)
+                    async for bucket in cursor:
+                        messages.extend(bucket["messages"])
                 return response["data"]
             return None
 
@@ -146,6 +342,7 @@ class DocumentStore:
             print(f"Deleted {delete_count} documents!")
 
             if delete_count == 1:
+                await self.overflow_collection.delete_many({"conversation_id": _id})
                 return "Deleted document : {}".format(document_id)
             else:
                 raise Exception("Not able to delete the Document")
@@ -8,3 +8,6 @@ MONGO_HOST = os.getenv("MONGO_HOST", "localhost")
 MONGO_PORT = os.getenv("MONGO_PORT", 27017)
 DB_NAME = os.getenv("DB_NAME", "OPEA")
 COLLECTION_NAME = os.getenv("COLLECTION_NAME", "ChatHistory")
+# Messages kept inline in a conversation document; further messages are appended to
+# overflow documents of this size (0 keeps every message inline)
+CHAT_HISTORY_BUCKET_SIZE = int(os.getenv("CHAT_HISTORY_BUCKET_SIZE", 0))
@@ -1,13 +1,14 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 
 from fastapi import HTTPException
 from pydantic import BaseModel
 
 from comps import CustomLogger
 from comps.chathistory.src.document_store import DocumentStore
+from comps.chathistory.src.integrations.mongo.mongo_conn import MongoClient
 from comps.cores.mega.micro_service import opea_microservices, register_microservice
 from comps.cores.proto.api_protocol import ChatCompletionRequest
 
@@ -24,6 +25,18 @@ class ChatMessage(BaseModel):
 class ChatId(BaseModel):
     user: str
     id: Optional[str] = None
+    # Paginated listing (used when limit or cursor is set)
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    fields: Optional[List[str]] = None
+    sort_by: str = "updated"
+
+
+class ChatAppend(BaseModel):
+    user: str
+    id: str
+    messages: List[Dict]
+    first_query: Optional[str] = None
 
 
 def get_first_string(value):
@@ -77,6 +90,39 @@ async def create_documents(document: ChatMessage):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@register_microservice(
+    name="opea_service@chathistory_mongo",
+    endpoint="/v1/chathistory/append",
+    host="0.0.0.0",
+    input_datatype=ChatAppend,
+    port=6012,
+)
+async def append_messages(document: ChatAppend):
+    """Appends the new messages of a turn to a stored conversation.
+
+    Unlike /create with an id, only the new messages are sent and written.
+
+    Args:
+        document (ChatAppend): The user, conversation id, new messages and optional first query.
+
+    Returns:
+        The result of the operation if successful, None otherwise.
+    """
+    if logflag:
+        logger.info(document)
+    try:
+        store = DocumentStore(document.user)
+        store.initialize_storage()
+        res = await store.append_messages(document.id, document.messages, document.first_query)
+        if logflag:
+            logger.info(res)
+        return res
+    except Exception as e:
+        # Handle the exception here
+        logger.info(f"An error occurred: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @register_microservice(
     name="opea_service@chathistory_mongo",
     endpoint="/v1/chathistory/get",
@@ -89,6 +135,8 @@ async def get_documents(document: ChatId):
 
     Args:
         document (ChatId): The ChatId object containing the user and optional document id.
+            Without id, setting limit (and then the returned next_cursor) pages through the
+            conversations of the user instead of returning all of them.
 
     Returns:
         The retrieved documents if successful, None otherwise.
@@ -98,7 +146,11 @@ async def get_documents(document: ChatId):
     try:
         store = DocumentStore(document.user)
         store.initialize_storage()
-        if document.id is None:
+        if document.id is None and (document.limit or document.cursor):
+            res = await store.get_documents_page(
+                limit=document.limit or 50, cursor=document.cursor, fields=document.fields, sort_by=document.sort_by
+            )
+        elif document.id is None:
             res = await store.get_all_documents_of_user()
         else:
             res = await store.get_user_documents_by_id(document.id)
@@ -145,5 +197,19 @@ async def delete_documents(document: ChatId):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def ensure_indexes():
+    store = DocumentStore(user="")
+    store.initialize_storage()
+    try:
+        await store.ensure_indexes()
+    except Exception as e:
+        logger.info(f"Failed to create the chat history indexes: {str(e)}")
+
+
 if __name__ == "__main__":
+    # One Mongo client (and connection pool) for the whole service
+    app = opea_microservices["opea_service@chathistory_mongo"].app
+    app.add_event_handler("startup", MongoClient.startup)
+    app.add_event_handler("startup", ensure_indexes)
+    app.add_event_handler("shutdown", MongoClient.shutdown)
     opea_microservices["opea_service@chathistory_mongo"].start()
@@ -0,0 +1,204 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import requests
+from arango import ArangoClient
+from arango.database import StandardDatabase
+from arango.http import DefaultHTTPClient
+from urllib3.connection import HTTPConnection
+
+from ..mega.logger import CustomLogger
+
+logger = CustomLogger("ArangoConnectionManager")
+
+# Connection configuration, shared by every ArangoDB-backed component of the process
+ARANGO_POOL_SIZE = int(os.getenv("ARANGO_POOL_SIZE", 32))
+ARANGO_KEEPALIVE_IDLE = int(os.getenv("ARANGO_KEEPALIVE_IDLE", 60))  # seconds, 0 disables TCP keep-alive probes
+ARANGO_REQUEST_TIMEOUT = float(os.getenv("ARANGO_REQUEST_TIMEOUT", 60))
+ARANGO_HOST_RESOLVER = os.getenv("ARANGO_HOST_RESOLVER", "roundrobin")  # used when ARANGO_URL lists several hosts
+ARANGO_AUTH_METHOD = os.getenv("ARANGO_AUTH_METHOD", "jwt")  # "jwt" or "basic"
+ARANGO_CONNECT_RETRIES = int(os.getenv("ARANGO_CONNECT_RETRIES", 10))
+ARANGO_HEALTH_TIMEOUT = float(os.getenv("ARANGO_HEALTH_TIMEOUT", 2))
+
+
+def _socket_options() -> List[Tuple[int, int, int]]:
+    options = list(HTTPConnection.default_socket_options)
+    if ARANGO_KEEPALIVE_IDLE > 0:
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, ARANGO_KEEPALIVE_IDLE))
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, ARANGO_KEEPALIVE_IDLE // 4)))
+    return options
+
+
+class PooledHTTPClient(DefaultHTTPClient):
+    """python-arango HTTP client with a connection pool of ARANGO_POOL_SIZE per host and TCP keep-alive.
+
+    The default client keeps 10 connections per host, so concurrent requests beyond
+    that open (and close) extra connections; idle pooled connections dropped by a
+    load balancer or firewall are kept open by the keep-alive probes.
+    """
+
+    def __init__(self):
+        super().__init__(
+            request_timeout=ARANGO_REQUEST_TIMEOUT, pool_connections=ARANGO_POOL_SIZE, pool_maxsize=ARANGO_POOL_SIZE
+        )
+
+    def create_session(self, host: str) -> requests.Session:
+        session = super().create_session(host)
+        for adapter in session.adapters.values():
+            adapter.init_poolmanager(
+                adapter._pool_connections,
+                adapter._pool_maxsize,
+                block=adapter._pool_block,
+                socket_options=_socket_options(),
+            )
+        return session
+
+
+def parse_hosts(hosts: Union[str, List[str]]) -> List[str]:
+    """Coordinator URLs of a comma separated ARANGO_URL (or of a list)."""
+    if isinstance(hosts, str):
+        hosts = hosts.split(",")
+    return [host.strip().rstrip("/") for host in hosts if host.strip()]
+
+
+class ArangoConnectionManager:
+    """Process-wide registry of ArangoDB clients and database handles.
+
+    One ArangoClient (one pooled HTTP session per coordinator) is created per set of
+    hosts, and one database handle per (hosts, database, user). With the "jwt" auth
+    method the handle obtains a token once and reuses it (refreshing it when it
+    expires) instead of sending basic credentials with every request. The database
+    is only checked through _system (and created) when connecting to it fails.
+    """
+
+    _clients: Dict[Tuple[str, ...], ArangoClient] = {}
+    _databases: Dict[Tuple[Tuple[str, ...], str, str], StandardDatabase] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls, hosts: Union[str, List[str]]) -> ArangoClient:
+        """Returns the shared client of hosts, creating it on first use."""
+        host_list = tuple(parse_hosts(hosts))
+        with cls._lock:
+            client = cls._clients.get(host_list)
+            if client is None:
+                client = ArangoClient(
+                    hosts=list(host_list) if len(host_list) > 1 else host_list[0],
+                    host_resolver=ARANGO_HOST_RESOLVER,
+                    http_client=PooledHTTPClient(),
+                )
+                cls._clients[host_list] = client
+                logger.info(
+                    f"Created ArangoDB client for {list(host_list)} "
+                    f"(pool {ARANGO_POOL_SIZE} connections per host, {ARANGO_HOST_RESOLVER} resolver)."
+                )
+        return client
+
+    @classmethod
+    def _connect(cls, client: ArangoClient, db_name: str, username: str, password: str) -> StandardDatabase:
+        return client.db(
+            name=db_name, username=username, password=password, verify=True, auth_method=ARANGO_AUTH_METHOD
+        )
+
+    @classmethod
+    def get_db(
+        cls,
+        hosts: Union[str, List[str]],
+        db_name: str,
+        username: str,
+        password: str,
+        create: bool = True,
+        retries: int = ARANGO_CONNECT_RETRIES,
+    ) -> StandardDatabase:
+        """Returns the shared handle of db_name, connecting (with retries) on first use.
+
+        Args:
+            hosts: Coordinator URL, comma separated URLs or list of URLs.
+            db_name: Database name.
+            username: ArangoDB user.
+            password: Password of the user.
+            create: Create the database when it does not exist.
+            retries: Connection attempts, with exponential backoff, before giving up.
+        """
+        key = (tuple(parse_hosts(hosts)), db_name, username)
+        db = cls._databases.get(key)
+        if db is not None:
+            return db
+
+        client = cls.get_client(hosts)
+        retry_delay = 2
+        for attempt in range(retries):
+            try:
+                logger.info(f"Attempting to connect to ArangoDB (attempt {attempt + 1}/{retries})...")
+                try:
+                    db = cls._connect(client, db_name, username, password)
+                except Exception:
+                    if not create or db_name == "_system":
+                        raise
+                    sys_db = cls._connect(client, "_system", username, password)
+                    if sys_db.has_database(db_name):
+                        raise
+                    sys_db.create_database(db_name)
+                    db = cls._connect(client, db_name, username, password)
+                logger.info(f"Successfully connected to ArangoDB {db.version()}, database '{db_name}'.")
+                break
+            except Exception as e:
+                if attempt < retries - 1:
+                    logger.warning(f"Failed to connect to ArangoDB: {e}. Retrying in {retry_delay} seconds...")
+                    time.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 1.5, 30)  # Exponential backoff, max 30 seconds
+                else:
+                    logger.error(f"Failed to connect to ArangoDB after {retries} attempts: {e}")
+                    raise
+
+        with cls._lock:
+            return cls._databases.setdefault(key, db)
+
+    @classmethod
+    def probe_hosts(cls, hosts: Union[str, List[str]], timeout: float = ARANGO_HEALTH_TIMEOUT) -> Dict[str, Any]:
+        """Availability of every coordinator (GET /_admin/server/availability, no credentials needed).
+
+        Returns {host: {"available": bool, "latency_ms": float, "error": str (on failure)}}.
+        """
+        status = {}
+        for host in parse_hosts(hosts):
+            start = time.perf_counter()
+            try:
+                response = requests.get(f"{host}/_admin/server/availability", timeout=timeout)
+                status[host] = {"available": response.status_code == 200}
+                if response.status_code != 200:
+                    status[host]["error"] = f"HTTP {response.status_code}"
+            except Exception as e:
+                status[host] = {"available": False, "error": str(e)}
+            status[host]["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return status
+
+    @classmethod
+    def check_health(cls, db: StandardDatabase, hosts: Optional[Union[str, List[str]]] = None) -> bool:
+        """True when the database answers; with hosts, unavailable coordinators are logged."""
+        if hosts is not None and len(parse_hosts(hosts)) > 1:
+            down = {host: s for host, s in cls.probe_hosts(hosts).items() if not s["available"]}
+            if down:
+                logger.warning(f"[ check health ] Unavailable ArangoDB coordinators: {down}")
+        try:
+            db.version()
+            return True
+        except Exception as e:
+            logger.error(f"[ check health ] Failed to connect to ArangoDB: {e}")
+            return False
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Closes every shared client (at service shutdown)."""
+        with cls._lock:
+            for client in cls._clients.values():
+                client.close()
+            cls._clients.clear()
+            cls._databases.clear()
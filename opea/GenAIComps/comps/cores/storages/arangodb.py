@@ -1,12 +1,43 @@
 # Copyright (C) 2025 ArangoDB Inc.
 # SPDX-License-Identifier: Apache-2.0
-from typing import Any
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Iterator
 
 from ..common.storage import OpeaStore
 from ..mega.logger import CustomLogger
 
 logger = CustomLogger("ArangoDBStore")
 
+# on_duplicate policies of save_documents (import_bulk)
+ON_DUPLICATE_POLICIES = ("error", "update", "replace", "ignore")
+# counters of an import_bulk result, summed over the batches
+IMPORT_COUNTERS = ("created", "errors", "empty", "updated", "ignored")
+
+# Index specifications of the stores built on the data models (see models.py), usable as
+# ARANGODB_INDEXES="<preset>". A specification is a dict with:
+#   - type: "persistent", "inverted" or "view" (ArangoSearch view with the identity analyzer)
+#   - fields: the indexed attributes (nested attributes as dotted paths, e.g. "data.user")
+#   - any other index property (unique, sparse, name...)
+# "contains" and "starts_with" searches on the fields of an inverted index or view use it
+# when called with use_text_index=True (both are eventually consistent).
+STORE_INDEXES = {
+    "chathistory": [
+        {"type": "persistent", "fields": ["data.user"]},
+        {"type": "view", "fields": ["first_query"]},
+    ],
+    "feedback": [
+        {"type": "persistent", "fields": ["chat_data.user"]},
+        {"type": "persistent", "fields": ["chat_id"], "sparse": True},
+    ],
+    "prompt": [
+        {"type": "persistent", "fields": ["user"]},
+        {"type": "view", "fields": ["prompt_text"]},
+    ],
+}
+INDEXED_TEXT_SEARCHES = ("contains", "starts_with")
+
 
 class ArangoDBStore(OpeaStore):
     """A concrete implementation of OpeaStore for ArangoDB."""
@@ -18,7 +49,7 @@ class ArangoDBStore(OpeaStore):
             name (str): The name of the component.
             description (str): A brief description of the component.
             config (dict, optional): Configuration parameters for the component, namely:
-                - ARANGODB_HOST: The host URL for the ArangoDB instance.
+                - ARANGODB_HOST: The host URL for the ArangoDB instance (or comma separated coordinator URLs).
                 - ARANGODB_USERNAME: The username for authentication.
                 - ARANGODB_PASSWORD: The password for authentication.
                 - ARANGODB_DB_NAME: The name of the database to connect to.
@@ -26,6 +57,13 @@ class ArangoDBStore(OpeaStore):
                 - client: An instance of arango.ArangoClient (optional).
                 - db: An instance of arango.database.StandardDatabase (optional).
                 - collection: An instance of arango.collection.StandardCollection (optional).
+                - ARANGODB_THREAD_POOL_SIZE: Threads running the blocking client calls of the async API (default 8).
+                - ARANGODB_BATCH_SIZE: Documents per round trip of search cursors and bulk imports (default 1000).
+                - ARANGODB_CURSOR_TTL: Seconds a search cursor is kept alive on the server between batches (default 60).
+                - ARANGODB_INDEXES: Index specifications of the collection, created on startup: a list of
+                    specifications or the name of a STORE_INDEXES preset (optional).
+                - ARANGODB_EXPLAIN_SEARCHES: Explain each new kind of search once and warn when it
+                    scans the whole collection (default True).
         """
 
         try:
@@ -43,15 +81,42 @@ class ArangoDBStore(OpeaStore):
         self.db: StandardDatabase = config.get("db", None)
         self.collection: StandardCollection = config.get("collection", None)
 
+        self.batch_size: int = int(config.get("ARANGODB_BATCH_SIZE", 1000))
+        self.cursor_ttl: int = int(config.get("ARANGODB_CURSOR_TTL", 60))
+
         self._initialize_connection()
 
-        self.async_db = self.db.begin_async_execution()
-        self.async_collection = self.async_db.collection(self.collection.name)
+        indexes = config.get("ARANGODB_INDEXES", [])
+        self.index_specs: list[dict] = [
+            dict(spec) for spec in (STORE_INDEXES[indexes] if isinstance(indexes, str) else indexes)
+        ]
+        for spec in self.index_specs:
+            # inverted indexes are only used through an index hint, which needs a name
+            if spec["type"] == "inverted" and not spec.get("name"):
+                spec["name"] = f"{self.collection.name}_{'_'.join(spec['fields'])}_inverted".replace(".", "_")
+        self.view_name: str = f"{self.collection.name}_view"
+        self.explain_searches: bool = bool(config.get("ARANGODB_EXPLAIN_SEARCHES", True))
+        self._explained: set = set()
+        self.ensure_indexes()
+
+        # python-arango is a blocking client: the async API runs its calls in this pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(config.get("ARANGODB_THREAD_POOL_SIZE", 8)), thread_name_prefix="arangodb-store"
+        )
+
+    async def _run(self, func, *args, **kwargs) -> Any:
+        """Runs a blocking client call in the store's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def close(self) -> None:
+        """Stops the thread pool of the async API."""
+        self._executor.shutdown(wait=False)
 
     def _initialize_connection(self) -> None:
         """Initializes the connection to the ArangoDB database and collection."""
 
-        from arango import ArangoClient
+        from .arango_client import ArangoConnectionManager
 
         try:
             host = self.config.get("ARANGODB_HOST", "http://localhost:8529")
@@ -60,11 +125,15 @@ class ArangoDBStore(OpeaStore):
             database_name = self.config.get("ARANGODB_DB_NAME", "_system")
             collection_name = self.config.get("ARANGODB_COLLECTION_NAME", "default")
 
-            if not self.client:
-                self.client = ArangoClient(hosts=host)
+            if not self.db and self.client:
+                self.db = self.client.db(database_name, username=username, password=password, verify=True)
 
             if not self.db:
-                self.db = self.client.db(database_name, username=username, password=password, verify=True)
+                # shared, already verified handle of the process (see arango_client.py)
+                self.db = ArangoConnectionManager.get_db(host, database_name, username, password, create=False)
+
+            if not self.client:
+                self.client = ArangoConnectionManager.get_client(host)
 
             if not self.collection:
                 if not self.db.has_collection(collection_name):
@@ -77,6 +146,80 @@ class ArangoDBStore(OpeaStore):
             logger.error(f"Failed to initialize ArangoDB connection: {e}")
             raise
 
+    def ensure_indexes(self) -> None:
+        """Creates the indexes and view of index_specs that do not exist yet (idempotent).
+
+        ArangoDB returns the existing index when an identical one is requested, and the
+        links of the view are merged into its current properties.
+        """
+        view_fields = {}
+        for spec in self.index_specs:
+            spec = dict(spec)
+            index_type = spec.pop("type")
+            fields = spec.pop("fields")
+            try:
+                if index_type == "view":
+                    view_fields.update({field: {"analyzers": ["identity"]} for field in fields})
+                elif index_type == "inverted":
+                    self.collection.add_index({"type": "inverted", "fields": [{"name": f} for f in fields], **spec})
+                elif index_type == "persistent":
+                    self.collection.add_index({"type": "persistent", "fields": fields, **spec})
+                else:
+                    raise ValueError(f"Unsupported index type: {index_type}")
+            except Exception as e:
+                logger.error(f"Failed to create {index_type} index on {fields}: {e}")
+                raise
+
+        if view_fields:
+            properties = {"links": {self.collection.name: {"fields": view_fields}}}
+            try:
+                if any(view["name"] == self.view_name for view in self.db.views()):
+                    self.db.update_arangosearch_view(self.view_name, properties)
+                else:
+                    self.db.create_arangosearch_view(self.view_name, properties)
+            except Exception as e:
+                logger.error(f"Failed to create ArangoSearch view {self.view_name}: {e}")
+                raise
+        if self.index_specs:
+            logger.info(f"Indexes of collection '{self.collection.name}' ensured: {self.index_specs}")
+
+    def _indexed_search(self, key: str, search_type: str) -> str | None:
+        """The index type ("view" or "inverted") that serves a contains/starts_with search on key, if any."""
+        if search_type not in INDEXED_TEXT_SEARCHES:
+            return None
+        for index_type in ("view", "inverted"):
+            if any(spec["type"] == index_type and key in spec["fields"] for spec in self.index_specs):
+                # inverted indexes serve STARTS_WITH, contains needs the view's LIKE
+                if index_type == "inverted" and search_type == "contains":
+                    continue
+                return index_type
+        return None
+
+    @staticmethod
+    def _attribute_path(key: str) -> str | list[str]:
+        """Bind value of an attribute key: a dotted key names a nested attribute, bound as its path."""
+        return key.split(".") if "." in key else key
+
+    def _warn_on_full_scan(self, query: str, bind_vars: dict, key: str, search_type: str) -> None:
+        """Explains the first search of each kind and warns when its plan enumerates the whole collection."""
+        if not self.explain_searches or (key, search_type) in self._explained:
+            return
+        self._explained.add((key, search_type))
+        try:
+            plan = self.db.aql.explain(query, bind_vars=bind_vars)
+        except Exception as e:
+            logger.warning(f"Could not explain search on '{key}' ({search_type}): {e}")
+            return
+        if any(node.get("type") == "EnumerateCollectionNode" for node in plan.get("nodes", [])):
+            hint = (
+                "search with use_text_index=True to use its index"
+                if self._indexed_search(key, search_type)
+                else "add an index for it to ARANGODB_INDEXES"
+            )
+            logger.warning(
+                f"Search on '{key}' ({search_type}) scans the whole collection '{self.collection.name}'; {hint}."
+            )
+
     def health_check(self) -> bool:
         """Performs a health check on the ArangoDB connection.
 
@@ -107,31 +250,72 @@ class ArangoDBStore(OpeaStore):
             logger.error(f"Failed to save document: {e}")
             raise
 
-    def save_documents(self, docs: list[dict], **kwargs) -> bool | list:
-        """Save multiple documents to the store.
+    async def asave_document(self, doc: dict, **kwargs) -> bool | dict:
+        """Asynchronously save a single document to the store (see save_document)."""
+        return await self._run(self.save_document, doc, **kwargs)
+
+    def save_documents(
+        self, docs: list[dict], on_duplicate: str = "error", batch_size: int | None = None, **kwargs
+    ) -> dict:
+        """Save multiple documents to the store with the bulk import API.
         Documents can optionally contain unique identifiers.
 
-        NOTE: If inserting a document fails, the exception is not raised
-        but returned as an object in the result list. It is up to you to
-        inspect the list to determine which documents were
-        inserted successfully (returns document metadata)
-        and which were not (returns exception object).
-        Alternatively, you can rely on setting
-        raise_on_document_error to True (defaults to False).
+        NOTE: By default a document that fails is counted and reported in
+        the "details" of the result, the others are still imported.
+        Pass halt_on_error=True to abort the batch on the first error instead.
 
         Args:
             docs (list[dict]): A list of document data to save.
-            **kwargs: Additional arguments for saving the documents.
+            on_duplicate (str): What to do when a document's _key already exists:
+                - "error": Count it as an error (default).
+                - "update": Merge the new attributes into the stored document.
+                - "replace": Replace the stored document.
+                - "ignore": Keep the stored document.
+            batch_size (int, optional): Documents per import request (defaults to the store's batch size).
+            **kwargs: Additional arguments for the import (e.g. halt_on_error, sync).
+                `overwrite` is rejected: for the import it empties the collection first,
+                use on_duplicate="replace" to replace documents on a key conflict.
 
         Returns:
-            bool | list: A list of results for the save operations.
+            dict: The import counters ("created", "errors", "empty", "updated", "ignored")
+                summed over the batches, and the error "details". Earlier versions returned
+                the per-document results of insert_many; its options (e.g.
+                raise_on_document_error) are no longer accepted and raise a TypeError.
         """
+        if on_duplicate not in ON_DUPLICATE_POLICIES:
+            raise ValueError(f"Unsupported on_duplicate policy: {on_duplicate}")
+        if "overwrite" in kwargs:
+            raise ValueError(
+                "save_documents does not accept overwrite (it would empty the collection before the import); "
+                'use on_duplicate="replace" instead.'
+            )
+        if not docs:
+            return {**{counter: 0 for counter in IMPORT_COUNTERS}, "details": []}
+
+        kwargs.setdefault("halt_on_error", False)
         try:
-            return self.collection.insert_many(docs, **kwargs)
+            results = self.collection.import_bulk(
+                docs, on_duplicate=on_duplicate, batch_size=batch_size or self.batch_size, details=True, **kwargs
+            )
         except Exception as e:
             logger.error(f"Failed to save documents: {e}")
             raise
 
+        # one result per batch when batch_size is set
+        if isinstance(results, dict):
+            results = [results]
+        summary = {counter: sum(result.get(counter, 0) for result in results) for counter in IMPORT_COUNTERS}
+        summary["details"] = [detail for result in results for detail in result.get("details", [])]
+        if summary["errors"]:
+            logger.error(f"{summary['errors']} of {len(docs)} documents could not be saved: {summary['details'][:5]}")
+        return summary
+
+    async def asave_documents(
+        self, docs: list[dict], on_duplicate: str = "error", batch_size: int | None = None, **kwargs
+    ) -> dict:
+        """Asynchronously save multiple documents to the store (see save_documents)."""
+        return await self._run(self.save_documents, docs, on_duplicate=on_duplicate, batch_size=batch_size, **kwargs)
+
     def update_document(self, doc: dict, **kwargs) -> bool | dict:
         """Update a single document in the store.
         Document must contain its unique identifier.
@@ -149,6 +333,10 @@ class ArangoDBStore(OpeaStore):
             logger.error(f"Failed to update document: {e}")
             raise
 
+    async def aupdate_document(self, doc: dict, **kwargs) -> bool | dict:
+        """Asynchronously update a single document in the store (see update_document)."""
+        return await self._run(self.update_document, doc, **kwargs)
+
     def update_documents(self, docs: list[dict], **kwargs) -> bool | list:
         """Update multiple documents in the store.
         Each document must contain its unique identifier.
@@ -174,6 +362,10 @@ class ArangoDBStore(OpeaStore):
             logger.error(f"Failed to update documents: {e}")
             raise
 
+    async def aupdate_documents(self, docs: list[dict], **kwargs) -> bool | list:
+        """Asynchronously update multiple documents in the store (see update_documents)."""
+        return await self._run(self.update_documents, docs, **kwargs)
+
     def get_document_by_id(self, id: str, **kwargs) -> dict | None:
         """Retrieve a single document by its unique identifier.
 
@@ -190,6 +382,10 @@ class ArangoDBStore(OpeaStore):
             logger.error(f"Failed to retrieve document by ID {id}: {e}")
             raise
 
+    async def aget_document_by_id(self, id: str, **kwargs) -> dict | None:
+        """Asynchronously retrieve a single document by its unique identifier (see get_document_by_id)."""
+        return await self._run(self.get_document_by_id, id, **kwargs)
+
     def get_documents_by_ids(self, ids: list[str], **kwargs) -> list[dict]:
         """Retrieve multiple documents by their unique identifiers.
 
@@ -206,6 +402,10 @@ class ArangoDBStore(OpeaStore):
             logger.error(f"Failed to retrieve documents by IDs {ids}: {e}")
             raise
 
+    async def aget_documents_by_ids(self, ids: list[str], **kwargs) -> list[dict]:
+        """Asynchronously retrieve multiple documents by their unique identifiers (see get_documents_by_ids)."""
+        return await self._run(self.get_documents_by_ids, ids, **kwargs)
+
     def delete_document(self, id: str, **kwargs) -> bool | dict:
         """Delete a single document from the store.
 
@@ -222,6 +422,10 @@ class ArangoDBStore(OpeaStore):
             logger.error(f"Failed to delete document by ID {id}: {e}")
             raise
 
+    async def adelete_document(self, id: str, **kwargs) -> bool | dict:
+        """Asynchronously delete a single document from the store (see delete_document)."""
+        return await self._run(self.delete_document, id, **kwargs)
+
     def delete_documents(self, ids: list[str], **kwargs) -> bool | list:
         """Delete multiple documents from the store.
 
@@ -246,6 +450,87 @@ class ArangoDBStore(OpeaStore):
             logger.error(f"Failed to delete documents by IDs {ids}: {e}")
             raise
 
+    async def adelete_documents(self, ids: list[str], **kwargs) -> bool | list:
+        """Asynchronously delete multiple documents from the store (see delete_documents)."""
+        return await self._run(self.delete_documents, ids, **kwargs)
+
+    def _search_query(self, key: str, value: Any, search_type: str, kwargs: dict) -> tuple[str, dict]:
+        """Builds the AQL query and bind variables of a search (pops filter_clause and use_text_index from kwargs)."""
+
+        if search_type == "exact":
+            filter_clause = "FILTER doc.@key == @value"
+        elif search_type == "contains":
+            filter_clause = "FILTER CONTAINS(doc.@key, @value)"
+        elif search_type == "starts_with":
+            filter_clause = "FILTER STARTS_WITH(doc.@key, @value)"
+        elif search_type == "ends_with":
+            filter_clause = "FILTER RIGHT(doc.@key, LENGTH(@value)) == @value"
+        elif search_type == "regex":
+            filter_clause = "FILTER REGEX_TEST(doc.@key, @value)"
+        elif search_type == "custom":
+            filter_clause = kwargs.pop("filter_clause", None)
+            if not filter_clause or not isinstance(filter_clause, str):
+                raise ValueError("Custom filter clause is a required string for 'custom' search type.")
+            if not filter_clause.lstrip().upper().startswith("FILTER"):
+                filter_clause = f"FILTER {filter_clause}"
+        else:
+            raise ValueError(f"Unsupported search type: {search_type}")
+
+        # views and inverted indexes are eventually consistent: only used when the caller opts in
+        index_type = self._indexed_search(key, search_type) if kwargs.pop("use_text_index", False) else None
+        attribute = self._attribute_path(key)
+        if index_type == "view":
+            # ArangoSearch: identity analyzer, LIKE pattern with the wildcards of the value escaped
+            search_value = value
+            if search_type == "contains":
+                escaped = str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                search_value = f"%{escaped}%"
+            search_clause = "LIKE(doc.@key, @value)" if search_type == "contains" else "STARTS_WITH(doc.@key, @value)"
+            query = f"""
+            FOR doc IN @@view
+                SEARCH ANALYZER({search_clause}, "identity")
+                RETURN doc
+        """
+            return query, {"@view": self.view_name, "key": attribute, "value": search_value}
+
+        options = ""
+        if index_type == "inverted":
+            # the optimizer only uses an inverted index when hinted
+            name = next(
+                spec["name"] for spec in self.index_specs if spec["type"] == "inverted" and key in spec["fields"]
+            )
+            options = f'OPTIONS {{ indexHint: "{name}", forceIndexHint: true }}'
+        query = f"""
+            FOR doc IN @@col {options}
+                {filter_clause}
+                RETURN doc
+        """
+        return query, {"@col": self.collection.name, "key": attribute, "value": value}
+
+    def _execute_search(self, key: str, value: Any, search_type: str, kwargs: dict):
+        """Starts a search and returns its server-side cursor (batch_size and ttl default to the store's)."""
+        query, bind_vars = self._search_query(key, value, search_type, kwargs)
+        if search_type == "custom":
+            # a custom filter clause may not use @key / @value
+            bind_vars = {k: v for k, v in bind_vars.items() if k == "@col" or f"@{k}" in query}
+        self._warn_on_full_scan(query, bind_vars, key, search_type)
+        kwargs.setdefault("batch_size", self.batch_size)
+        kwargs.setdefault("ttl", self.cursor_ttl)
+        try:
+            return self.db.aql.execute(query, bind_vars=bind_vars, **kwargs)
+        except Exception as e:
+            logger.error(f"Failed to search documents with {key} / {value}: {e}. Query: {query}")
+            raise
+
+    def iter_search(self, key: str, value: Any, search_type: str = "exact", **kwargs) -> Iterator[dict]:
+        """Search for documents, yielding them as the cursor fetches them batch by batch (see search)."""
+        cursor = self._execute_search(key, value, search_type, kwargs)
+        try:
+            yield from cursor
+        finally:
+            if cursor.has_more():
+                cursor.close(ignore_missing=True)
+
     def search(self, key: str, value: Any, search_type: str = "exact", **kwargs) -> list[dict]:
         """Search for documents in the store based on a specific key-value pair.
 
@@ -260,39 +545,37 @@ class ArangoDBStore(OpeaStore):
                 - "regex": Regular expression match.
                 - "custom": Custom filter clause. In this case,
                     the `filter_clause` argument must be provided as a string
-                    in `kwargs`.
-            **kwargs: Additional arguments passed to the query execution.
+                    in `kwargs` (e.g. "doc.@key > @value").
+            **kwargs: Additional arguments passed to the query execution
+                (e.g. batch_size and ttl of the cursor). use_text_index=True runs
+                "contains" / "starts_with" searches on the view or inverted index of key
+                (see ARANGODB_INDEXES); they are eventually consistent, so documents
+                written in about the last second may be missing from the results.
 
         Returns:
             list[dict]: A list of documents matching the search criteria.
         """
+        return list(self.iter_search(key, value, search_type, **kwargs))
 
-        if search_type == "exact":
-            filter_clause = "doc.@key == @value"
-        elif search_type == "contains":
-            filter_clause = "CONTAINS(doc.@key, @value)"
-        elif search_type == "starts_with":
-            filter_clause = "STARTS_WITH(doc.@key, @value)"
-        elif search_type == "ends_with":
-            filter_clause = "ENDS_WITH(doc.@key, @value)"
-        elif search_type == "regex":
-            filter_clause = "REGEX_MATCHES(doc.@key, @value)"
-        elif search_type == "custom":
-            filter_clause = kwargs.pop("filter_clause")
-            if not filter_clause or not isinstance(filter_clause, str):
-                raise ValueError("Custom filter clause is a required string for 'custom' search type.")
-        else:
-            raise ValueError(f"Unsupported search type: {search_type}")
+    async def asearch(self, key: str, value: Any, search_type: str = "exact", **kwargs) -> list[dict]:
+        """Asynchronously search for documents in the store (see search)."""
+        return [doc async for doc in self.astream_search(key, value, search_type, **kwargs)]
 
-        query = f"""
-            FOR doc IN @@col
-                {filter_clause}
-                RETURN doc
-        """
+    async def astream_search(self, key: str, value: Any, search_type: str = "exact", **kwargs) -> AsyncIterator[dict]:
+        """Asynchronously search for documents, yielding each batch of the cursor as soon as it is fetched.
 
+        Only one batch (batch_size documents) is held in memory at a time; the
+        cursor is closed on the server if the caller stops early.
+        """
+        cursor = await self._run(self._execute_search, key, value, search_type, kwargs)
         try:
-            bind_vars = {"@col": self.collection.name, "key": key, "value": value}
-            return list(self.db.aql.execute(query, bind_vars=bind_vars, **kwargs))
-        except Exception as e:
-            logger.error(f"Failed to search documents with {key} / {value}: {e}. Query: {query}")
-            raise
+            while True:
+                batch = cursor.batch()
+                while batch:
+                    yield batch.popleft()
+                if not cursor.has_more():
+                    break
+                await self._run(cursor.fetch)
+        finally:
+            if cursor.has_more():
+                await self._run(cursor.close, ignore_missing=True)
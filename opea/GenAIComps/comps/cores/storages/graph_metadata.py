@@ -0,0 +1,113 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import math
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from ..mega.logger import CustomLogger
+
+logger = CustomLogger("GraphMetadataStore")
+
+GRAPH_METADATA_COLLECTION = os.getenv("GRAPH_METADATA_COLLECTION", "GRAPH_METADATA")
+
+# fields that must match between the ingestion and the retrieval of a graph
+EMBEDDING_FIELDS = ("embedding_model", "embedding_dimension")
+
+
+def embedding_metadata(model_id: str, vector: List[float], distance_strategy: str) -> Dict[str, Any]:
+    """Embedding description of a graph, from the model id and one vector it produced."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    return {
+        "embedding_model": model_id,
+        "embedding_dimension": len(vector),
+        "normalized": abs(norm - 1.0) < 1e-3,
+        "distance_strategy": str(distance_strategy).upper(),
+    }
+
+
+def metadata_mismatches(stored: Dict[str, Any], expected: Dict[str, Any]) -> List[str]:
+    """Descriptions of the EMBEDDING_FIELDS whose values differ (fields absent from expected are not compared)."""
+    return [
+        f"{field}: graph has {stored.get(field)!r}, configured {expected[field]!r}"
+        for field in EMBEDDING_FIELDS
+        if field in expected and stored.get(field) != expected[field]
+    ]
+
+
+class GraphMetadataStore:
+    """Per-graph metadata documents (embedding model, dimension, normalisation, distance strategy).
+
+    Dataprep writes the document of a graph when it first embeds into it; the retriever
+    reads it once per graph instead of sampling a document of the graph on every request.
+    Documents are keyed by graph name and cached once read, since they never change for
+    the lifetime of a graph.
+    """
+
+    def __init__(self, db, collection_name: str = GRAPH_METADATA_COLLECTION):
+        self.db = db
+        self.collection_name = collection_name
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _collection(self, create: bool = False):
+        if not self.db.has_collection(self.collection_name):
+            if not create:
+                return None
+            self.db.create_collection(self.collection_name)
+        return self.db.collection(self.collection_name)
+
+    def get(self, graph_name: str, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Metadata of a graph, None for graphs ingested before metadata was recorded.
+
+        refresh reads the document again instead of using the cached one.
+        """
+        metadata = None if refresh else self._cache.get(graph_name)
+        if metadata is None:
+            collection = self._collection()
+            metadata = collection.get(graph_name) if collection is not None else None
+            with self._lock:
+                if metadata is not None:
+                    self._cache[graph_name] = metadata
+                else:
+                    self._cache.pop(graph_name, None)
+        return metadata
+
+    def save(self, graph_name: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Records the metadata of a graph that has none; returns the stored document.
+
+        When another process recorded it first, its document is returned unchanged.
+        """
+        collection = self._collection(create=True)
+        document = {
+            "_key": graph_name,
+            "graph_name": graph_name,
+            **metadata,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            collection.insert(document)
+            logger.info(f"Recorded metadata of graph '{graph_name}': {metadata}")
+        except Exception as e:
+            stored = collection.get(graph_name)
+            if stored is None:
+                logger.error(f"Failed to record metadata of graph '{graph_name}': {e}")
+                raise
+            document = stored
+        with self._lock:
+            self._cache[graph_name] = document
+        return document
+
+    def delete(self, graph_name: str) -> None:
+        """Deletes the metadata of a deleted graph, so a new graph of that name can use another model."""
+        with self._lock:
+            self._cache.pop(graph_name, None)
+        collection = self._collection()
+        if collection is not None:
+            collection.delete(graph_name, ignore_missing=True)
+
+    def forget(self, graph_name: str) -> None:
+        """Drops the cached document of a graph (the graph no longer exists for this process)."""
+        with self._lock:
+            self._cache.pop(graph_name, None)
@@ -0,0 +1,70 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import os
+from typing import Any, Dict
+
+from ..mega.logger import CustomLogger
+
+logger = CustomLogger("MongoClientRegistry")
+
+# Connection pool configuration, shared by every Mongo-backed store of the process
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 2))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000))
+
+
+class MongoClientRegistry:
+    """Process-wide registry of Motor clients, one per connection URL.
+
+    A Motor client owns a connection pool and its monitoring threads, so it is
+    created once (at service startup) and shared by every store of the process
+    instead of being built for every request.
+    """
+
+    _clients: Dict[str, Any] = {}
+
+    @classmethod
+    def get_client(cls, conn_url: str) -> Any:
+        """Returns the shared client of conn_url, creating it on first use."""
+        client = cls._clients.get(conn_url)
+        if client is None:
+            try:
+                import motor.motor_asyncio as motor
+            except ImportError:
+                logger.error("Motor is not installed. Please install it using 'pip install motor'.")
+                raise
+
+            client = motor.AsyncIOMotorClient(
+                conn_url,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            )
+            cls._clients[conn_url] = client
+            logger.info(
+                f"Created Mongo client (pool {MONGO_MIN_POOL_SIZE}-{MONGO_MAX_POOL_SIZE} connections)."
+            )
+        return client
+
+    @classmethod
+    def get_db(cls, conn_url: str, db_name: str) -> Any:
+        """Returns the database handle of db_name on the shared client."""
+        return cls.get_client(conn_url)[db_name]
+
+    @classmethod
+    async def startup(cls, conn_url: str) -> None:
+        """Creates the shared client and opens its first connection, so the first request does not pay for it."""
+        try:
+            await cls.get_client(conn_url).admin.command("ping")
+        except Exception as e:
+            # the service still starts; requests retry the connection through the pool
+            logger.error(f"Mongo is not reachable at startup: {e}")
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Closes every shared client (at service shutdown)."""
+        for client in cls._clients.values():
+            client.close()
+        cls._clients.clear()
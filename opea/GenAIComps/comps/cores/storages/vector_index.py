@@ -0,0 +1,272 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..mega.logger import CustomLogger
+
+logger = CustomLogger("VectorIndexManager")
+
+# Vector index lifecycle configuration
+VECTOR_INDEX_ENABLED = os.getenv("VECTOR_INDEX_ENABLED", "true").lower() == "true"
+VECTOR_INDEX_MIN_DOCS = int(os.getenv("VECTOR_INDEX_MIN_DOCS", 1000))  # below this, exact search is used
+VECTOR_INDEX_REBUILD_GROWTH = float(os.getenv("VECTOR_INDEX_REBUILD_GROWTH", 2.0))
+VECTOR_INDEX_CHECK_INTERVAL = float(os.getenv("VECTOR_INDEX_CHECK_INTERVAL", 60))  # seconds
+# a replaced index is dropped this long after its replacement is ready
+VECTOR_INDEX_DROP_GRACE = 2 * VECTOR_INDEX_CHECK_INTERVAL
+VECTOR_INDEX_PREFIX = "vector_index"
+
+# langchain-arangodb distance strategies -> vector index metrics
+VECTOR_INDEX_METRICS = {"COSINE": "cosine", "EUCLIDEAN_DISTANCE": "l2"}
+
+
+def choose_n_lists(count: int) -> int:
+    """Number of IVF lists (centroids) for a collection of count documents.
+
+    Follows the ArangoDB recommendation of 15 * sqrt(N), capped by the number of
+    documents since every list needs training points.
+    """
+    return max(1, min(count, int(15 * math.sqrt(count))))
+
+
+def _trained_count(n_lists: int) -> int:
+    """Collection size an index with n_lists lists was sized for (inverse of choose_n_lists)."""
+    return max(n_lists, math.ceil((n_lists / 15) ** 2))
+
+
+class VectorIndexManager:
+    """Creates and re-trains the ArangoDB vector indexes used by approximate search.
+
+    A vector index is trained once, when it is created, so its lists stop fitting the
+    data as the collection grows. The manager:
+
+    - creates a `vector` index (named vector_index_<metric>_<nLists>) once a collection
+      has VECTOR_INDEX_MIN_DOCS documents, with nLists chosen from its size
+    - builds a new index in the background when the collection grew by
+      VECTOR_INDEX_REBUILD_GROWTH since the current one was trained, switches to it
+      once it is ready and drops the previous one after a grace period
+    - reports the state of every index it manages
+
+    Searches ask `index_for_search` which index to use, and search exactly while it
+    returns None (no index ready). It only queries the database when the cached
+    index was last seen more than VECTOR_INDEX_DROP_GRACE ago, since another service
+    may have replaced and dropped it in the meantime.
+    """
+
+    def __init__(self, db, embedding_field: str = "embedding"):
+        self.db = db
+        self.embedding_field = embedding_field
+        self._states: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # index builds are long and CPU heavy on the server: one at a time
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-index")
+
+    @staticmethod
+    def metric_of(distance_strategy: str) -> Optional[str]:
+        """Vector index metric of a distance strategy, None when approximate search does not support it."""
+        return VECTOR_INDEX_METRICS.get(str(distance_strategy).upper())
+
+    def _state(self, collection_name: str, metric: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._states.setdefault(
+                (collection_name, metric),
+                {
+                    "collection": collection_name,
+                    "metric": metric,
+                    "status": "unknown",  # unknown | missing | building | ready | failed
+                    "index_name": None,
+                    "index_id": None,
+                    "n_lists": 0,
+                    "dimension": None,
+                    "trained_count": 0,
+                    "count": 0,
+                    "building": None,
+                    "retired": [],
+                    "error": None,
+                    "built_at": None,
+                    "last_checked": 0.0,
+                    "verified_at": 0.0,
+                    "scheduled": False,
+                },
+            )
+
+    def index_for_search(self, collection_name: str, distance_strategy: str, dimension: int) -> Optional[str]:
+        """Name of the ready vector index for an approximate search, or None to search exactly.
+
+        Schedules a (background) check of the collection at most every
+        VECTOR_INDEX_CHECK_INTERVAL seconds, which creates or rebuilds its index when needed.
+        """
+        metric = self.metric_of(distance_strategy)
+        if not VECTOR_INDEX_ENABLED or metric is None:
+            return None
+        state = self._state(collection_name, metric)
+        if state["index_name"] and time.monotonic() - state["verified_at"] >= VECTOR_INDEX_DROP_GRACE:
+            # not seen for a grace period (idle service): it may have been replaced and dropped
+            try:
+                self._sync_indexes(self.db.collection(collection_name), state)
+            except Exception as e:
+                logger.warning(f"Could not verify the vector index of '{collection_name}': {e}")
+                return None
+        self.schedule_check(collection_name, distance_strategy, dimension)
+        if state["index_name"] and state["dimension"] == dimension:
+            return state["index_name"]
+        return None
+
+    def schedule_check(
+        self, collection_name: str, distance_strategy: str = "COSINE", dimension: Optional[int] = None, force=False
+    ) -> bool:
+        """Checks the index of a collection in the background; returns False when a check is already pending."""
+        metric = self.metric_of(distance_strategy)
+        if not VECTOR_INDEX_ENABLED or metric is None:
+            return False
+        state = self._state(collection_name, metric)
+        with self._lock:
+            due = force or time.monotonic() - state["last_checked"] >= VECTOR_INDEX_CHECK_INTERVAL
+            if state["scheduled"] or not due:
+                return False
+            state["scheduled"] = True
+            state["last_checked"] = time.monotonic()
+        self._executor.submit(self._check, state, dimension)
+        return True
+
+    def _vector_indexes(self, collection, metric: str) -> List[Dict[str, Any]]:
+        return [
+            index
+            for index in collection.indexes()
+            if index.get("type") == "vector"
+            and index.get("fields") == [self.embedding_field]
+            and index.get("params", {}).get("metric") == metric
+            and index.get("name", "").startswith(VECTOR_INDEX_PREFIX)
+        ]
+
+    def _sample_dimension(self, collection) -> Optional[int]:
+        cursor = self.db.aql.execute(
+            "FOR doc IN @@col FILTER IS_LIST(doc.@field) LIMIT 1 RETURN LENGTH(doc.@field)",
+            bind_vars={"@col": collection.name, "field": self.embedding_field},
+        )
+        return next(iter(cursor), None) or None
+
+    def _check(self, state: Dict[str, Any], dimension: Optional[int]) -> None:
+        collection_name = state["collection"]
+        try:
+            if not self.db.has_collection(collection_name):
+                state["status"] = "missing"
+                return
+            collection = self.db.collection(collection_name)
+            self._sync_indexes(collection, state)
+            self._drop_retired(collection, state)
+
+            count = collection.count()
+            state["count"] = count
+            if count < VECTOR_INDEX_MIN_DOCS:
+                return
+            if state["index_name"] and count < state["trained_count"] * VECTOR_INDEX_REBUILD_GROWTH:
+                return
+            if choose_n_lists(count) <= state["n_lists"]:
+                return
+
+            dimension = dimension or state["dimension"] or self._sample_dimension(collection)
+            if not dimension:
+                return
+            self._build(collection, state, count, dimension)
+        except Exception as e:
+            state["error"] = str(e)
+            logger.error(f"Vector index check of '{collection_name}' failed: {e}")
+        finally:
+            state["scheduled"] = False
+
+    def _sync_indexes(self, collection, state: Dict[str, Any]) -> None:
+        """Points the state at the newest index of the collection; it may have been built (or rebuilt) by another service."""
+        indexes = self._vector_indexes(collection, state["metric"])
+        if indexes:
+            current = max(indexes, key=lambda index: index["params"]["nLists"])
+            if current["name"] != state["index_name"]:
+                state.update(
+                    status="ready",
+                    index_name=current["name"],
+                    index_id=current["id"],
+                    n_lists=current["params"]["nLists"],
+                    dimension=current["params"]["dimension"],
+                    trained_count=max(state["trained_count"], _trained_count(current["params"]["nLists"])),
+                )
+            # superseded indexes (e.g. left by a service that stopped before dropping them) are dropped after the grace period
+            building = (state.get("building") or {}).get("index_name")
+            retired = {retired["index_id"] for retired in state["retired"]}
+            for index in indexes:
+                if index["id"] != current["id"] and index["id"] not in retired and index["name"] != building:
+                    state["retired"].append({"index_id": index["id"], "retired_at": time.monotonic()})
+        elif state["status"] != "failed":
+            state.update(status="missing", index_name=None, index_id=None, n_lists=0)
+        state["verified_at"] = time.monotonic()
+
+    def _build(self, collection, state: Dict[str, Any], count: int, dimension: int) -> None:
+        metric = state["metric"]
+        n_lists = choose_n_lists(count)
+        name = f"{VECTOR_INDEX_PREFIX}_{metric}_{n_lists}"
+        previous = state["index_id"]
+        state.update(building={"index_name": name, "n_lists": n_lists, "count": count}, error=None)
+        if state["index_name"] is None:
+            state["status"] = "building"
+        logger.info(f"Building vector index '{name}' on '{collection.name}' ({count} documents, {dimension} dims).")
+
+        start = time.time()
+        try:
+            index = collection.add_index(
+                {
+                    "type": "vector",
+                    "name": name,
+                    "fields": [self.embedding_field],
+                    "inBackground": True,
+                    "params": {"metric": metric, "dimension": dimension, "nLists": n_lists},
+                }
+            )
+        except Exception as e:
+            state.update(building=None, error=str(e), status="ready" if state["index_name"] else "failed")
+            logger.error(f"Failed to build vector index '{name}' on '{collection.name}': {e}")
+            return
+
+        state.update(
+            status="ready",
+            index_name=name,
+            index_id=index["id"],
+            n_lists=n_lists,
+            dimension=dimension,
+            trained_count=count,
+            building=None,
+            built_at=datetime.now(timezone.utc).isoformat(),
+            verified_at=time.monotonic(),
+        )
+        if previous and previous != index["id"]:
+            # other services may still search with the previous index until their next check
+            state["retired"].append({"index_id": previous, "retired_at": time.monotonic()})
+        logger.info(f"Vector index '{name}' on '{collection.name}' ready in {time.time() - start:.1f}s.")
+
+    def _drop_retired(self, collection, state: Dict[str, Any]) -> None:
+        for retired in list(state["retired"]):
+            if time.monotonic() - retired["retired_at"] < VECTOR_INDEX_DROP_GRACE:
+                continue
+            try:
+                collection.delete_index(retired["index_id"], ignore_missing=True)
+                state["retired"].remove(retired)
+                logger.info(f"Dropped previous vector index {retired['index_id']}.")
+            except Exception as e:
+                logger.warning(f"Failed to drop previous vector index {retired['index_id']}: {e}")
+
+    def report(self) -> List[Dict[str, Any]]:
+        """State of the managed vector indexes."""
+        with self._lock:
+            states = [dict(state) for state in self._states.values()]
+        for state in states:
+            state.pop("last_checked")
+            state.pop("scheduled")
+            state.pop("verified_at")
+            state["retired"] = [retired["index_id"] for retired in state["retired"]]
+        return states
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -10,7 +10,6 @@ import base64
 import requests
 
 import openai
-from arango import ArangoClient
 from fastapi import Body, File, Form, HTTPException, UploadFile
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_arangodb import ArangoGraph
@@ -26,16 +25,18 @@ from openai import AsyncOpenAI
 
 from comps import CustomLogger, DocPath, OpeaComponent, OpeaComponentRegistry, ServiceType, TextDoc
 from comps.cores.proto.api_protocol import ArangoDBDataprepRequest, DataprepRequest, ArangoDBDataprepRequestFromDocRepo
+from comps.cores.storages.arango_client import ArangoConnectionManager
 from comps.dataprep.src.utils import (
     decode_filename,
     document_loader,
     encode_filename,
     get_separators,
     get_tables_result,
-    parse_html,
     save_content_to_local_disk,
+    stream_html_pages,
     is_valid_content
 )
+from comps.dataprep.src.recrawl import RECRAWL_SEEDS, CrawlStateStore, RecrawlScheduler
 
 logger = CustomLogger("OPEA_DATAPREP_ARANGODB")
 logflag = os.getenv("LOGFLAG", "false").lower() == "true"
@@ -105,6 +106,7 @@ class OpeaArangoDataprep(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.DATAPREP.name.lower(), description, config)
         self.upload_folder = "./uploaded_files/"
+        self.recrawl_scheduler: Optional[RecrawlScheduler] = None
 
         self.llm_transformer: LLMGraphTransformer
         self.embeddings: Embeddings
@@ -220,47 +222,19 @@ class OpeaArangoDataprep(OpeaComponent):
             )
 
     def _initialize_client(self):
-        """Initialize the ArangoDB connection with retry logic."""
-        import time
-        
-        max_retries = 10
-        retry_delay = 2  # Start with 2 seconds
-        
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"Attempting to connect to ArangoDB (attempt {attempt + 1}/{max_retries})...")
-                self.client = ArangoClient(hosts=ARANGO_URL)
-                sys_db = self.client.db(name="_system", username=ARANGO_USERNAME, password=ARANGO_PASSWORD, verify=True)
-
-                if not sys_db.has_database(ARANGO_DB_NAME):
-                    sys_db.create_database(ARANGO_DB_NAME)
-
-                self.db = self.client.db(name=ARANGO_DB_NAME, username=ARANGO_USERNAME, password=ARANGO_PASSWORD, verify=True)
-                logger.info(f"Successfully connected to ArangoDB {self.db.version()}.")
-                return  # Success
-                
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"Failed to connect to ArangoDB: {e}. Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    retry_delay = min(retry_delay * 1.5, 30)  # Exponential backoff, max 30s
-                else:
-                    logger.error(f"Failed to connect to ArangoDB after {max_retries} attempts: {e}")
-                    raise
+        """Initialize the ArangoDB connection, shared by the ArangoDB components of the process (with retry logic)."""
+        self.client = ArangoConnectionManager.get_client(ARANGO_URL)
+        self.db = ArangoConnectionManager.get_db(ARANGO_URL, ARANGO_DB_NAME, ARANGO_USERNAME, ARANGO_PASSWORD)
 
     def check_health(self) -> bool:
         """Checks the health of the retriever service."""
 
         if logflag:
             logger.info("[ check health ] start to check health of ArangoDB")
-        try:
-            version = self.db.version()
-            if logflag:
-                logger.info(f"[ check health ] Successfully connected to ArangoDB {version}!")
-            return True
-        except Exception as e:
-            logger.info(f"[ check health ] Failed to connect to ArangoDB: {e}")
-            return False
+        healthy = ArangoConnectionManager.check_health(self.db, ARANGO_URL)
+        if healthy and logflag:
+            logger.info("[ check health ] Successfully connected to ArangoDB!")
+        return healthy
 
     async def ingest_data_to_arango(
         self,
@@ -273,8 +247,9 @@ class OpeaArangoDataprep(OpeaComponent):
         embed_chunks: bool,
         include_chunks: bool,
         text_capitalization_strategy: str,
+        file_id: Optional[str] = None,
     ):
-        """Ingest document to ArangoDB."""
+        """Ingest document to ArangoDB. Chunks are tagged with file_id (when given) so they can be retracted."""
 
         path = doc_path.path
         if logflag:
@@ -327,7 +302,10 @@ class OpeaArangoDataprep(OpeaComponent):
         graph = ArangoGraph(db=self.db, generate_schema_on_init=False)
 
         for i, text in enumerate(chunks):
-            document = Document(page_content=text, metadata={"file_name": path, "chunk_index": i})
+            metadata = {"file_name": path, "chunk_index": i}
+            if file_id:
+                metadata["file_id"] = file_id
+            document = Document(page_content=text, metadata=metadata)
 
             if logflag:
                 logger.info(f"Chunk {i}: extracting nodes & relationships")
@@ -463,10 +441,10 @@ class OpeaArangoDataprep(OpeaComponent):
             link_list = json.loads(link_list)  # Parse JSON string to list
             if not isinstance(link_list, list):
                 raise HTTPException(status_code=400, detail="link_list should be a list.")
-            for link in link_list:
+            # pages are fetched concurrently and ingested as soon as each one arrives
+            async for link, content in stream_html_pages(link_list):
                 encoded_link = encode_filename(link)
                 save_path = self.upload_folder + encoded_link + ".txt"
-                content = parse_html([link])[0][0]
                 await save_content_to_local_disk(save_path, content)
                 try:
                     graph_name = await self.ingest_data_to_arango(
@@ -505,6 +483,56 @@ class OpeaArangoDataprep(OpeaComponent):
         return result
 
 
+    def _get_recrawl_scheduler(self, graph_name: str) -> RecrawlScheduler:
+        """The re-crawl scheduler; changed pages are re-ingested into graph_name with the default settings."""
+
+        async def ingest_page(url, content, file_id, replace):
+            # the previous version of the page is removed before its new chunks are ingested
+            if replace:
+                await self.retract_file(file_id=file_id, graph_name=graph_name)
+            save_path = self.upload_folder + encode_filename(url) + ".txt"
+            await save_content_to_local_disk(save_path, content)
+            await self.ingest_data_to_arango(
+                DocPath(path=save_path, chunk_size=1500, chunk_overlap=100, process_table=False, table_strategy="fast"),
+                graph_name=graph_name,
+                insert_async=ARANGO_INSERT_ASYNC,
+                insert_batch_size=ARANGO_BATCH_SIZE,
+                embed_nodes=EMBED_NODES,
+                embed_edges=EMBED_EDGES,
+                embed_chunks=EMBED_CHUNKS,
+                include_chunks=INCLUDE_CHUNKS,
+                text_capitalization_strategy=TEXT_CAPITALIZATION_STRATEGY,
+                file_id=file_id,
+            )
+
+        if self.recrawl_scheduler is None:
+            self._initialize_llm(
+                allowed_node_types=ALLOWED_NODE_TYPES,
+                allowed_edge_types=ALLOWED_EDGE_TYPES,
+                node_properties=NODE_PROPERTIES,
+                edge_properties=EDGE_PROPERTIES,
+            )
+            self.recrawl_scheduler = RecrawlScheduler(CrawlStateStore(self.db), ingest_page)
+        return self.recrawl_scheduler
+
+    async def recrawl(self, seeds: Optional[List[str]] = None, max_depth: Optional[int] = None, graph_name: str = ARANGO_GRAPH_NAME):
+        """
+        Re-crawl the seed URLs and re-ingest only the pages whose main content changed.
+        Returns the counters of the crawl (pages fetched, not modified, unchanged, changed, new, failed).
+        """
+        return await self._get_recrawl_scheduler(graph_name).run_once(seeds=seeds, max_depth=max_depth)
+
+    def start_recrawl_schedule(self):
+        """Start the periodic re-crawl of RECRAWL_SEEDS (must be called from the running event loop)."""
+        if not RECRAWL_SEEDS:
+            return
+        self._get_recrawl_scheduler(ARANGO_GRAPH_NAME).start()
+
+    async def stop_recrawl_schedule(self):
+        if self.recrawl_scheduler is not None:
+            await self.recrawl_scheduler.stop()
+
+
     async def fetch_all_labels(self): # Unused now but might be helpful for more complicated labelling system
         """Not used for the current label management. Might be helpful for more complicated labelling system.
         Fetch all labels from the document repository."""
@@ -47,6 +47,21 @@ class OpeaDataprepLoader(OpeaComponentLoader):
             logger.info("[ dataprep loader ] get indices")
         return self.component.get_list_of_indices(*args, **kwargs)
 
+    async def recrawl(self, *args, **kwargs):
+        if logflag:
+            logger.info("[ dataprep loader ] recrawl")
+        return await self.component.recrawl(*args, **kwargs)
+
+    def start_recrawl_schedule(self):
+        if logflag:
+            logger.info("[ dataprep loader ] start recrawl schedule")
+        return self.component.start_recrawl_schedule()
+
+    async def stop_recrawl_schedule(self):
+        if logflag:
+            logger.info("[ dataprep loader ] stop recrawl schedule")
+        return await self.component.stop_recrawl_schedule()
+
 
 class OpeaDataprepMultiModalLoader(OpeaComponentLoader):
     def __init__(self, component_name, **kwargs):
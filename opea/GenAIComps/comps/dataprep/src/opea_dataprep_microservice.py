@@ -37,6 +37,7 @@ from comps.cores.proto.api_protocol import (
     RedisDataprepRequest,
     ArangoDBDataprepRequestFromDocRepo
 )
+from comps.cores.storages.arango_client import ArangoConnectionManager
 from comps.dataprep.src.utils import create_upload_folder
 
 
@@ -119,6 +120,10 @@ class DocRepoIngestPayload(BaseModel):
 class DocRepoRetractPayload(BaseModel):
     fileId: str
 
+class RecrawlPayload(BaseModel):
+    seeds: Optional[List[str]] = None
+    maxDepth: Optional[int] = None
+
 async def resolve_dataprep_request(request: Request):
     form = await request.form()
 
@@ -393,6 +398,39 @@ async def retract_file(payload: DocRepoRetractPayload):
         raise
 
 
+@register_microservice(
+    name="opea_service@dataprep",
+    service_type=ServiceType.DATAPREP,
+    endpoint="/v1/dataprep/recrawl",
+    host="0.0.0.0",
+    port=5000,
+)
+@register_statistics(names=["opea_service@dataprep"])
+async def recrawl(payload: RecrawlPayload):
+    """ Accepts JSON: { "seeds": ["https://..."], "maxDepth": 2 } (both optional, default RECRAWL_SEEDS / RECRAWL_MAX_DEPTH)
+    Re-crawls the seeds and re-ingests only the pages whose content changed since the last crawl.
+    """
+    start = time.time()
+    logger.info(f"[ recrawl ] Start to recrawl {payload.seeds or 'RECRAWL_SEEDS'}")
+
+    if dataprep_component_name != "OPEA_DATAPREP_ARANGODB":
+        logger.error('Error during dataprep - recrawl: only supported with "OPEA_DATAPREP_ARANGODB".')
+        raise HTTPException(status_code=400, detail="Recrawl is only supported with OPEA_DATAPREP_ARANGODB.")
+
+    try:
+        # Use the loader to invoke the component
+        response = await loader.recrawl(seeds=payload.seeds, max_depth=payload.maxDepth, graph_name=ARANGO_GRAPH_NAME)
+
+        # Log the result if logging is enabled
+        if logflag:
+            logger.debug(f"[ recrawl ] recrawl result: {response}")
+        # Record statistics
+        statistics_dict["opea_service@dataprep"].append_latency(time.time() - start, None)
+        return response
+    except Exception as e:
+        logger.error(f"Error during dataprep recrawl invocation: {e}")
+        raise
+
 
 # Default OPEA get list of indices method.
 @register_microservice(
@@ -433,4 +471,11 @@ async def get_list_of_indices():
 if __name__ == "__main__":
     logger.info("OPEA Dataprep Microservice is starting...")
     create_upload_folder(upload_folder)
+    app = opea_microservices["opea_service@dataprep"].app
+    if dataprep_component_name == "OPEA_DATAPREP_ARANGODB":
+        # Periodic re-crawl of RECRAWL_SEEDS (no-op when unset)
+        app.add_event_handler("startup", loader.start_recrawl_schedule)
+        app.add_event_handler("shutdown", loader.stop_recrawl_schedule)
+    # Close the shared ArangoDB connection pools
+    app.add_event_handler("shutdown", ArangoConnectionManager.close_all)
     opea_microservices["opea_service@dataprep"].start()
@@ -0,0 +1,188 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+"""Incremental re-crawl of ingested websites.
+
+Every crawled URL has a state document in ArangoDB with its ETag, Last-Modified,
+outgoing links and the hash of its normalised main content. A re-crawl sends
+conditional requests, skips pages answered with 304 (still following their
+recorded links) and pages whose main content hash did not change, and only hands
+the changed (or new) pages to the ingest callback.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from comps import CustomLogger
+from comps.dataprep.src.utils import Crawler, html_main_content
+
+logger = CustomLogger("dataprep_recrawl")
+logflag = os.getenv("LOGFLAG", False)
+
+RECRAWL_STATE_COLLECTION = os.getenv("RECRAWL_STATE_COLLECTION", "CRAWL_STATE")
+RECRAWL_SEEDS = [url.strip() for url in os.getenv("RECRAWL_SEEDS", "").split(",") if url.strip()]
+RECRAWL_MAX_DEPTH = int(os.getenv("RECRAWL_MAX_DEPTH", 2))
+RECRAWL_INTERVAL_SECONDS = int(os.getenv("RECRAWL_INTERVAL_SECONDS", 24 * 3600))
+RECRAWL_WORKERS = int(os.getenv("RECRAWL_WORKERS", 10))
+RECRAWL_PER_HOST = int(os.getenv("RECRAWL_PER_HOST", 2))
+RECRAWL_HOST_DELAY = float(os.getenv("RECRAWL_HOST_DELAY", 0.5))
+
+# ingest(url, content, file_id, replace) -> awaitable; replace is True when the URL was ingested before
+IngestCallback = Callable[[str, str, str, bool], Awaitable[None]]
+
+
+def normalise_content(text: str) -> str:
+    """Main content as compared between crawls: NFKC, whitespace collapsed."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalise_content(text).encode("utf-8")).hexdigest()
+
+
+def url_file_id(url: str) -> str:
+    """Stable file id of a crawled page, used to retract its previous chunks."""
+    return "crawler-" + hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+class CrawlStateStore:
+    """
+    Per-URL crawl state in ArangoDB, also used as the Crawler's http_cache.
+
+    The crawler records the validators of every 200 answer; they are only kept
+    in memory until `commit` is called once the page was handled, so a page whose
+    ingestion failed is fetched in full again on the next crawl.
+    """
+
+    def __init__(self, db, collection_name: str = RECRAWL_STATE_COLLECTION):
+        if not db.has_collection(collection_name):
+            db.create_collection(collection_name)
+        self.collection = db.collection(collection_name)
+        self.pending: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def state(self, url: str) -> Optional[Dict]:
+        return self.collection.get(self._key(url))
+
+    # http_cache interface used by Crawler.afetch
+    def get(self, url: str, default=None):
+        state = self.state(url)
+        if not state:
+            return default
+        return {"etag": state.get("etag"), "last_modified": state.get("last_modified"), "links": state.get("links")}
+
+    def __setitem__(self, url: str, validators: Dict):
+        self.pending[url] = {
+            "etag": validators.get("etag"),
+            "last_modified": validators.get("last_modified"),
+            "links": validators.get("links"),
+        }
+
+    def commit(self, url: str, **fields):
+        now = datetime.now(timezone.utc).isoformat()
+        document = {"_key": self._key(url), "url": url, "last_checked": now, **self.pending.pop(url, {}), **fields}
+        if "content_hash" in fields:
+            document["last_changed"] = now
+        self.collection.insert(document, overwrite=True, overwrite_mode="update")
+
+    def touch(self, url: str):
+        """Record a check of an unchanged page (new validators, if any, are kept)."""
+        self.commit(url)
+
+
+class RecrawlScheduler:
+    """Periodically re-crawls the seed URLs and re-ingests the pages that changed."""
+
+    def __init__(
+        self,
+        store: CrawlStateStore,
+        ingest: IngestCallback,
+        seeds: Optional[List[str]] = None,
+        max_depth: int = RECRAWL_MAX_DEPTH,
+        interval: int = RECRAWL_INTERVAL_SECONDS,
+        workers: int = RECRAWL_WORKERS,
+        per_host: int = RECRAWL_PER_HOST,
+        host_delay: float = RECRAWL_HOST_DELAY,
+    ):
+        self.store = store
+        self.ingest = ingest
+        self.seeds = seeds if seeds is not None else RECRAWL_SEEDS
+        self.max_depth = max_depth
+        self.interval = interval
+        self.workers = workers
+        self.per_host = per_host
+        self.host_delay = host_delay
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def run_once(self, seeds: Optional[List[str]] = None, max_depth: Optional[int] = None) -> Dict:
+        """Crawl once; returns counters of what was fetched, skipped and re-ingested."""
+        seeds = seeds or self.seeds
+        max_depth = self.max_depth if max_depth is None else max_depth
+        summary = {"pages": 0, "not_modified": 0, "unchanged": 0, "changed": 0, "new": 0, "failed": 0}
+        start = time.time()
+
+        async with self._lock:
+            crawler = Crawler(http_cache=self.store, host_delay=self.host_delay)
+            async for page in crawler.iter_pages(seeds, max_depth=max_depth, workers=self.workers, per_host=self.per_host):
+                summary["pages"] += 1
+                url = page.url
+                if page.fetch.not_modified:
+                    summary["not_modified"] += 1
+                    self.store.touch(url)
+                    continue
+
+                content = await asyncio.to_thread(html_main_content, page.soup, crawler)
+                new_hash = content_hash(content or "")
+                previous = self.store.state(url)
+                if previous and previous.get("content_hash") == new_hash:
+                    summary["unchanged"] += 1
+                    self.store.touch(url)
+                    continue
+                if not content:
+                    self.store.pending.pop(url, None)
+                    continue
+
+                try:
+                    await self.ingest(url, content.strip(), url_file_id(url), previous is not None)
+                except Exception as e:
+                    summary["failed"] += 1
+                    self.store.pending.pop(url, None)
+                    logger.error(f"[ recrawl ] failed to ingest {url}: {e}")
+                    continue
+                summary["changed" if previous else "new"] += 1
+                self.store.commit(url, content_hash=new_hash, file_id=url_file_id(url))
+
+        summary["seconds"] = round(time.time() - start, 1)
+        logger.info(f"[ recrawl ] {seeds}: {summary}")
+        return summary
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[ recrawl ] crawl failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.seeds and self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+            logger.info(f"[ recrawl ] scheduled every {self.interval}s for {self.seeds}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
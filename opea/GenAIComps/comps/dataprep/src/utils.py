@@ -7,7 +7,6 @@ import base64
 import errno
 import functools
 import json
-import multiprocessing
 import os
 import re
 import shutil
@@ -18,9 +17,10 @@ import timeit
 import unicodedata
 import urllib.parse
 import uuid
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Union
 from urllib.parse import urlparse, urlunparse
 
 #########################################
@@ -451,8 +451,69 @@ async def document_loader(doc_path):
         )
 
 
+def _detect_encoding(content_type, html_text):
+    """Charset from the Content-Type header, else from the HTML meta tags, else utf-8."""
+    content_type = (content_type or "").lower()
+    if "charset=" in content_type:
+        # Extract charset value from the content-type header
+        charset = content_type.split("charset=")[-1].strip()
+        if logflag:
+            logger.info(f"Charset detected and set: {charset}")
+        return charset
+    # Check for <meta charset="...">
+    match = re.search(r'<meta\s+charset=["\']?([^"\'>]+)["\']?', html_text, re.IGNORECASE)
+    # Check for <meta http-equiv="Content-Type" content="...; charset=...">
+    if not match:
+        match = re.search(
+            r'<meta\s+http-equiv=["\']?content-type["\']?\s+content=["\']?[^"\']*charset=([^"\'>]+)["\']?',
+            html_text,
+            re.IGNORECASE,
+        )
+    if match:
+        if logflag:
+            logger.info(f"Charset detected and set from meta tag: {match.group(1)}")
+        return match.group(1)
+    # Fallback to default encoding
+    if logflag:
+        logger.info("Charset not specified, using default utf-8")
+    return "utf-8"
+
+
+class FetchResult(NamedTuple):
+    url: str
+    status: int
+    text: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+    # outgoing links of a 304 page, as recorded when it was last fetched (None when unknown)
+    links: Optional[List[str]] = None
+
+
+class CrawledPage(NamedTuple):
+    url: str
+    depth: int
+    soup: BeautifulSoup
+    fetch: FetchResult
+
+
 class Crawler:
-    def __init__(self, pool=None):
+    """
+    Web crawler used for link ingestion.
+
+    `iter_pages` crawls asynchronously: one aiohttp session (connection pool) is
+    shared by all requests, at most `workers` requests are in flight, at most
+    `per_host` per host (optionally spaced by `host_delay` seconds), and every
+    URL is fetched once (`fetched_pool`). Validators of fetched pages are kept in
+    `http_cache` (any dict-like, url -> {"etag", "last_modified", "text", "links"})
+    and sent back as conditional GET headers; a 304 answer is served from the
+    cache, and the links recorded for the page are followed again so the pages
+    below an unchanged page are still checked.
+    Pages are yielded as soon as they are fetched, so callers can chunk and
+    ingest them while the crawl goes on.
+    """
+
+    def __init__(self, pool=None, http_cache=None, host_delay=0.0):
         if pool:
             assert isinstance(pool, (str, list, tuple)), "url pool should be str, list or tuple"
         self.pool = pool
@@ -465,6 +526,8 @@ class Crawler:
             like Gecko) Chrome/113.0.0.0 Safari/537.36",
         }
         self.fetched_pool = set()
+        self.http_cache = http_cache if http_cache is not None else {}
+        self.host_delay = host_delay
 
     def get_sublinks(self, soup):
         sublinks = []
@@ -519,41 +582,7 @@ class Crawler:
                 if response.status_code != 200:
                     print("fail to fetch %s, response status code: %s", url, response.status_code)
                 else:
-                    # Extract charset from the Content-Type header
-                    content_type = response.headers.get("Content-Type", "").lower()
-                    if "charset=" in content_type:
-                        # Extract charset value from the content-type header
-                        charset = content_type.split("charset=")[-1].strip()
-                        response.encoding = charset
-                        if logflag:
-                            logger.info(f"Charset detected and set: {response.encoding}")
-                    else:
-                        import re
-
-                        # Extract charset from the response HTML content
-                        charset_from_meta = None
-                        # Check for <meta charset="...">
-                        match = re.search(r'<meta\s+charset=["\']?([^"\'>]+)["\']?', response.text, re.IGNORECASE)
-                        if match:
-                            charset_from_meta = match.group(1)
-                        # Check for <meta http-equiv="Content-Type" content="...; charset=...">
-                        if not charset_from_meta:
-                            match = re.search(
-                                r'<meta\s+http-equiv=["\']?content-type["\']?\s+content=["\']?[^"\']*charset=([^"\'>]+)["\']?',
-                                response.text,
-                                re.IGNORECASE,
-                            )
-                            if match:
-                                charset_from_meta = match.group(1)
-                        if charset_from_meta:
-                            response.encoding = charset_from_meta
-                            if logflag:
-                                logger.info(f"Charset detected and set from meta tag: {response.encoding}")
-                        else:
-                            # Fallback to default encoding
-                            response.encoding = "utf-8"
-                            if logflag:
-                                logger.info("Charset not specified, using default utf-8")
+                    response.encoding = _detect_encoding(response.headers.get("Content-Type"), response.text)
                     return response
             except Exception as e:
                 print("fail to fetch %s, caused by %s", url, e)
@@ -561,6 +590,142 @@ class Crawler:
             max_times -= 1
         return None
 
+    async def afetch(self, session, url, headers=None, max_times=5) -> Optional[FetchResult]:
+        """Asynchronous fetch with conditional GET; returns None when the page could not be fetched."""
+        if not urlparse(url).scheme:
+            url = "http://" + url
+        request_headers = dict(headers or {})
+        cached = self.http_cache.get(url)
+        if cached and cached.get("links") is None:
+            # recorded without its links: fetch in full once, so the pages below it are still crawled
+            cached = None
+        if cached:
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(max_times):
+            if logflag:
+                logger.info("start fetch %s..." % url)
+            try:
+                async with session.get(url, headers=request_headers) as response:
+                    if response.status == 304 and cached:
+                        return FetchResult(
+                            url,
+                            304,
+                            cached.get("text", ""),
+                            cached.get("etag"),
+                            cached.get("last_modified"),
+                            True,
+                            cached.get("links"),
+                        )
+                    if response.status != 200:
+                        logger.warning(f"fail to fetch {url}, response status code: {response.status}")
+                        if 400 <= response.status < 500 and response.status != 429:
+                            return None
+                        continue
+                    raw = await response.read()
+                    encoding = _detect_encoding(
+                        response.headers.get("Content-Type"), raw[:4096].decode("ascii", errors="ignore")
+                    )
+                    try:
+                        text = raw.decode(encoding, errors="replace")
+                    except LookupError:
+                        text = raw.decode("utf-8", errors="replace")
+                    return FetchResult(
+                        url, 200, text, response.headers.get("ETag"), response.headers.get("Last-Modified")
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"fail to fetch {url} (attempt {attempt + 1}/{max_times}), caused by {e}")
+        return None
+
+    async def iter_pages(
+        self, pool, max_depth=10, workers=10, per_host=2, timeout=30
+    ) -> AsyncIterator[CrawledPage]:
+        """
+        Crawl from the seed URLs and yield every fetched page as soon as it is parsed.
+
+        Links found on a page of depth d are followed while d < max_depth. Yielded
+        pages are buffered up to `workers` items: a slow consumer pauses the crawl.
+        """
+        if isinstance(pool, str):
+            pool = [pool]
+        frontier: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue(maxsize=workers)
+        host_slots = defaultdict(lambda: asyncio.Semaphore(per_host))
+        host_next_request = defaultdict(float)
+        done = object()
+
+        def enqueue(url, depth):
+            url = urlunparse(urlparse(url)._replace(fragment=""))
+            if url not in self.fetched_pool:
+                self.fetched_pool.add(url)
+                frontier.put_nowait((url, depth))
+
+        for url in pool:
+            enqueue(url, 0)
+
+        async def polite_fetch(session, url):
+            host = urlparse(url).netloc
+            async with host_slots[host]:
+                if self.host_delay:
+                    loop = asyncio.get_running_loop()
+                    wait = host_next_request[host] - loop.time()
+                    host_next_request[host] = max(loop.time(), host_next_request[host]) + self.host_delay
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                return await self.afetch(session, url)
+
+        async def worker(session):
+            while True:
+                url, depth = await frontier.get()
+                try:
+                    result = await polite_fetch(session, url)
+                    if result is None:
+                        continue
+                    soup = await asyncio.to_thread(self.parse, result.text)
+                    if result.not_modified and result.links is not None:
+                        links = result.links
+                    else:
+                        links = self.get_hyperlink(soup, self.get_base_url(url))
+                    if not result.not_modified and (result.etag or result.last_modified):
+                        # cached with its links, which a later 304 answer follows again
+                        self.http_cache[url] = {
+                            "etag": result.etag, "last_modified": result.last_modified, "text": result.text,
+                            "links": links,
+                        }
+                    if depth < max_depth:
+                        for link in links:
+                            enqueue(link, depth + 1)
+                    await results.put(CrawledPage(url, depth, soup, result))
+                except Exception as e:
+                    logger.error(f"fail to crawl {url}, caused by {e}")
+                finally:
+                    frontier.task_done()
+
+        async def close_when_drained():
+            await frontier.join()
+            await results.put(done)
+
+        connector = aiohttp.TCPConnector(limit=workers, limit_per_host=per_host)
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        # brotli support is optional in aiohttp, only advertise what it can always decode
+        session_headers = {**self.headers, "Accept-Encoding": "gzip, deflate"}
+        async with aiohttp.ClientSession(headers=session_headers, connector=connector, timeout=client_timeout) as session:
+            tasks = [asyncio.create_task(worker(session)) for _ in range(workers)]
+            tasks.append(asyncio.create_task(close_when_drained()))
+            try:
+                while True:
+                    page = await results.get()
+                    if page is done:
+                        break
+                    yield page
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
     def process_work(self, sub_url, work):
         response = self.fetch(sub_url)
         if response is None:
@@ -574,29 +739,14 @@ class Crawler:
         return sublinks
 
     def crawl(self, pool, work=None, max_depth=10, workers=10):
-        url_pool = set()
-        for url in pool:
-            base_url = self.get_base_url(url)
-            response = self.fetch(url)
-            soup = self.parse(response.text)
-            sublinks = self.get_hyperlink(soup, base_url)
-            self.fetched_pool.add(url)
-            url_pool.update(sublinks)
-            depth = 0
-            while len(url_pool) > 0 and depth < max_depth:
-                print("current depth %s...", depth)
-                mp = multiprocessing.Pool(processes=workers)
-                results = []
-                for sub_url in url_pool:
-                    if sub_url not in self.fetched_pool:
-                        results.append(mp.apply_async(self.process_work, (sub_url, work)))
-                mp.close()
-                mp.join()
-                url_pool = set()
-                for result in results:
-                    sublinks = result.get()
-                    url_pool.update(sublinks)
-                depth += 1
+        """Synchronous wrapper of iter_pages calling work(url, soup) for every page (use iter_pages from async code)."""
+
+        async def run():
+            async for page in self.iter_pages(pool, max_depth=max_depth, workers=workers):
+                if work:
+                    work(page.url, page.soup)
+
+        asyncio.run(run())
 
     def parse(self, html_doc):
         soup = BeautifulSoup(html_doc, "lxml")
@@ -625,14 +775,20 @@ class Crawler:
         return "\n".join([i for i in text if i and i != " "])
 
 
+# str.translate table of uni_pro, filled as new characters are met: ASCII and non-spacing marks are kept
+_UNI_PRO_TABLE: Dict[int, Optional[int]] = {}
+
+
 def uni_pro(text):
     """Check if the character is ASCII or falls in the category of non-spacing marks."""
+    if text.isascii():
+        return text
     normalized_text = unicodedata.normalize("NFKD", text)
-    filtered_text = ""
-    for char in normalized_text:
-        if ord(char) < 128 or unicodedata.category(char) == "Mn":
-            filtered_text += char
-    return filtered_text
+    for char in set(normalized_text):
+        code = ord(char)
+        if code not in _UNI_PRO_TABLE:
+            _UNI_PRO_TABLE[code] = code if code < 128 or unicodedata.category(char) == "Mn" else None
+    return normalized_text.translate(_UNI_PRO_TABLE)
 
 
 def load_html_data(url):
@@ -640,31 +796,50 @@ def load_html_data(url):
     res = crawler.fetch(url)
     if res is None:
         return None
-    soup = crawler.parse(res.text)
-    all_text = crawler.clean_text(soup.select_one("body").text)
-    main_content = ""
+    return html_main_content(crawler.parse(res.text), crawler)
+
+
+def html_main_content(soup, crawler=None):
+    """Main text content of a parsed HTML page (the .main/#main or .container/#container blocks, else the body)."""
+    crawler = crawler or Crawler()
+    kept = set()
+    seen_texts = set()
+    parts = []
     for element_name in ["main", "container"]:
-        main_block = None
-        if soup.select(f".{element_name}"):
-            main_block = soup.select(f".{element_name}")
-        elif soup.select(f"#{element_name}"):
-            main_block = soup.select(f"#{element_name}")
-        if main_block:
-            for element in main_block:
-                text = crawler.clean_text(element.text)
-                if text not in main_content:
-                    main_content += f"\n{text}"
-            main_content = crawler.clean_text(main_content)
-    main_content = all_text if main_content == "" else main_content
-    main_content = main_content.replace("\n", "")
-    main_content = main_content.replace("\n\n", "")
-    main_content = re.sub(r"\s+", " ", main_content)
+        main_block = soup.select(f".{element_name}") or soup.select(f"#{element_name}")
+        for element in main_block:
+            # a block nested in an already kept block only repeats part of its text
+            if any(id(parent) in kept for parent in element.parents):
+                continue
+            kept.add(id(element))
+            text = crawler.clean_text(element.text)
+            if text and text not in seen_texts:
+                seen_texts.add(text)
+                parts.append(text)
+    if parts:
+        main_content = crawler.clean_text("\n".join(parts))
+    else:
+        main_content = crawler.clean_text(soup.select_one("body").text)
+    main_content = re.sub(r"\s+", " ", main_content.replace("\n", ""))
     if logflag:
         logger.info("main_content=[%s]" % main_content)
 
     return main_content
 
 
+async def stream_html_pages(links, max_depth=0, workers=10, per_host=2, http_cache=None):
+    """
+    Crawl the links concurrently and yield (url, main content) as soon as each page
+    is fetched, so that the caller chunks and ingests pages while the crawl goes on.
+    """
+    crawler = Crawler(http_cache=http_cache)
+    links = [link for link in links if re.match(r"^https?:/{2}\w.+$", link)]
+    async for page in crawler.iter_pages(links, max_depth=max_depth, workers=workers, per_host=per_host):
+        content = await asyncio.to_thread(html_main_content, page.soup, crawler)
+        if content:
+            yield page.url, content.strip()
+
+
 def parse_html(input):
     """Parse the uploaded file."""
     chucks = []
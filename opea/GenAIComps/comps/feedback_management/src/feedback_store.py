@@ -1,10 +1,41 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
 import bson.errors as BsonError
+from bson import json_util
 from bson.objectid import ObjectId
-from integrations.mongo.config import COLLECTION_NAME
+from integrations.mongo.config import COLLECTION_NAME, FEEDBACK_EXPORT_BATCH_SIZE
 from integrations.mongo.mongo_conn import MongoClient
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+
+# Group keys of rating_statistics
+STATISTICS_GROUPS = {
+    "time": None,  # date bucket of created_at, see STATISTICS_BUCKETS
+    "model": "$chat_data.model",
+    "label": "$feedback_data.labels",
+}
+STATISTICS_BUCKETS = ["hour", "day", "week", "month", "year"]
+RATINGS = range(0, 6)
+
+
+def _created_at_range(start: Optional[datetime], end: Optional[datetime]) -> dict:
+    created_at = {}
+    if start is not None:
+        created_at["$gte"] = start
+    if end is not None:
+        created_at["$lt"] = end
+    return {"created_at": created_at} if created_at else {}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return json_util.default(value)
 
 
 class FeedbackStore:
@@ -12,14 +43,37 @@ class FeedbackStore:
     def __init__(
         self,
         user: str,
+        db_client=None,
     ):
         self.user = user
+        # shared database handle; defaults to the process-wide Mongo client
+        self.db_client = db_client
 
     def initialize_storage(self, db_type="mongo") -> None:
-        if db_type == "mongo":
+        if db_type == "mongo" and self.db_client is None:
             self.db_client = MongoClient.get_db_client()
         self.collection = self.db_client[COLLECTION_NAME]
 
+    async def ensure_indexes(self) -> None:
+        """Creates the indexes of the per-user reads and of the statistics (idempotent, called at startup).
+
+        Feedback stored before created_at existed gets the creation time of its _id, so
+        that the time statistics and the start/end filters include it.
+        """
+        await self.collection.update_many(
+            {"created_at": {"$exists": False}}, [{"$set": {"created_at": {"$toDate": "$_id"}}}]
+        )
+        await self.collection.create_index([("chat_data.user", ASCENDING), ("created_at", ASCENDING)])
+        await self.collection.create_index([("created_at", ASCENDING)])
+        await self.collection.create_index([("chat_data.model", ASCENDING), ("created_at", ASCENDING)])
+        await self.collection.create_index([("feedback_data.labels", ASCENDING), ("created_at", ASCENDING)])
+
+    @staticmethod
+    def _new_document(feedback_data) -> dict:
+        document = feedback_data.model_dump(by_alias=True, mode="json", exclude={"feedback_id"})
+        document["created_at"] = datetime.now(timezone.utc)
+        return document
+
     async def save_feedback(self, feedback_data) -> str:
         """Stores a new feedback data into the storage.
 
@@ -33,9 +87,7 @@ class FeedbackStore:
             Exception: If an error occurs while storing the feedback_data.
         """
         try:
-            inserted_feedback_data = await self.collection.insert_one(
-                feedback_data.model_dump(by_alias=True, mode="json", exclude={"feedback_id"})
-            )
+            inserted_feedback_data = await self.collection.insert_one(self._new_document(feedback_data))
             feedback_id = str(inserted_feedback_data.inserted_id)
             return feedback_id
 
@@ -43,6 +95,126 @@ class FeedbackStore:
             print(e)
             raise Exception(e)
 
+    async def save_feedback_bulk(self, feedback_list) -> dict:
+        """Stores many feedback data at once.
+
+        The insert is unordered: the server writes the documents in parallel and
+        a failing document does not stop the others.
+
+        Args:
+            feedback_list (list): The documents to be stored.
+
+        Returns:
+            dict: {"inserted": number of stored documents, "errors": [{"index": i, "message": str}, ...]}.
+
+        Raises:
+            Exception: If an error other than per-document write errors occurs.
+        """
+        if not feedback_list:
+            return {"inserted": 0, "errors": []}
+        try:
+            result = await self.collection.insert_many(
+                [self._new_document(feedback_data) for feedback_data in feedback_list], ordered=False
+            )
+            return {"inserted": len(result.inserted_ids), "errors": []}
+
+        except BulkWriteError as e:
+            details = e.details
+            errors = [{"index": error["index"], "message": error["errmsg"]} for error in details.get("writeErrors", [])]
+            return {"inserted": details.get("nInserted", 0), "errors": errors}
+
+        except Exception as e:
+            print(e)
+            raise Exception(e)
+
+    async def rating_statistics(
+        self,
+        group_by: str = "time",
+        bucket: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user: Optional[str] = None,
+    ) -> list[dict]:
+        """Computes rating statistics on the server, grouped by time bucket, model or label.
+
+        Args:
+            group_by (str): "time" (created_at truncated to bucket), "model" or "label".
+            bucket (str): Time bucket of group_by="time": hour, day, week, month or year.
+            start (datetime, optional): Only feedback created at or after start.
+            end (datetime, optional): Only feedback created before end.
+            user (str, optional): Only feedback of this user.
+
+        Returns:
+            list[dict]: One entry per group, ordered by group: {"group", "count", "thumbs_up",
+                "thumbs_down", "average_rating", "ratings": {"0": count, ..., "5": count}}.
+
+        Raises:
+            KeyError: If group_by or bucket is invalid.
+            Exception: If there is an error while aggregating data.
+        """
+        if group_by not in STATISTICS_GROUPS:
+            raise KeyError(f"Invalid group_by: {group_by}")
+        if group_by == "time" and bucket not in STATISTICS_BUCKETS:
+            raise KeyError(f"Invalid bucket: {bucket}")
+
+        match = _created_at_range(start, end)
+        if user is not None:
+            match["chat_data.user"] = user
+        pipeline = [{"$match": match}] if match else []
+        if group_by == "time":
+            group_key = {"$dateTrunc": {"date": "$created_at", "unit": bucket}}
+        else:
+            group_key = STATISTICS_GROUPS[group_by]
+            if group_by == "label":
+                pipeline.append({"$unwind": "$feedback_data.labels"})
+
+        group = {
+            "_id": group_key,
+            "count": {"$sum": 1},
+            "thumbs_up": {"$sum": {"$cond": ["$feedback_data.is_thumbs_up", 1, 0]}},
+            "average_rating": {"$avg": "$feedback_data.rating"},
+        }
+        for rating in RATINGS:
+            group[f"rating_{rating}"] = {"$sum": {"$cond": [{"$eq": ["$feedback_data.rating", rating]}, 1, 0]}}
+        pipeline += [{"$group": group}, {"$sort": {"_id": 1}}]
+
+        try:
+            statistics = []
+            async for row in self.collection.aggregate(pipeline, allowDiskUse=True):
+                statistics.append(
+                    {
+                        "group": row["_id"],
+                        "count": row["count"],
+                        "thumbs_up": row["thumbs_up"],
+                        "thumbs_down": row["count"] - row["thumbs_up"],
+                        "average_rating": row["average_rating"],
+                        "ratings": {str(rating): row[f"rating_{rating}"] for rating in RATINGS},
+                    }
+                )
+            return statistics
+
+        except Exception as e:
+            print(e)
+            raise Exception(e)
+
+    async def export_feedback(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None, user: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Yields the matching feedback data as NDJSON lines, reading the collection in batches.
+
+        Args:
+            start (datetime, optional): Only feedback created at or after start.
+            end (datetime, optional): Only feedback created before end.
+            user (str, optional): Only feedback of this user.
+        """
+        query = _created_at_range(start, end)
+        if user is not None:
+            query["chat_data.user"] = user
+        cursor = self.collection.find(query, batch_size=FEEDBACK_EXPORT_BATCH_SIZE).sort("created_at", ASCENDING)
+        async for document in cursor:
+            document["feedback_id"] = str(document.pop("_id"))
+            yield json.dumps(document, default=_json_default) + "\n"
+
     async def update_feedback(self, feedback_data) -> bool:
         """Update a feedback data in the collection with given id.
 
@@ -8,3 +8,5 @@ MONGO_HOST = os.getenv("MONGO_HOST", "localhost")
 MONGO_PORT = os.getenv("MONGO_PORT", 27017)
 DB_NAME = os.getenv("DB_NAME", "OPEA")
 COLLECTION_NAME = os.getenv("COLLECTION_NAME", "Feedback")
+# Documents fetched per round trip by the NDJSON export
+FEEDBACK_EXPORT_BATCH_SIZE = int(os.getenv("FEEDBACK_EXPORT_BATCH_SIZE", 1000))
@@ -1,10 +1,13 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 import os
-from typing import Annotated, Optional
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional
 
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 from feedback_store import FeedbackStore
+from integrations.mongo.mongo_conn import MongoClient
 from pydantic import BaseModel, Field
 
 from comps import CustomLogger
@@ -22,11 +25,13 @@ class FeedbackData(BaseModel):
         is_thumbs_up (bool): True if the response is satisfy, False otherwise.
         rating: (int)[Optional]: Score rating. Range from 0 (bad rating) to 5(good rating).
         comment (str)[Optional]: Comment given for response.
+        labels (list[str])[Optional]: Labels of the feedback (e.g. "outdated", "wrong source"), used by the statistics.
     """
 
     is_thumbs_up: bool
     rating: Annotated[Optional[int], Field(ge=0, le=5)] = None
     comment: Optional[str] = None
+    labels: Optional[List[str]] = None
 
 
 class ChatFeedback(BaseModel):
@@ -93,6 +98,129 @@ async def create_feedback_data(feedback: ChatFeedback):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class ChatFeedbackBatch(BaseModel):
+    """This class represents a batch of ChatFeedback to store in database at once.
+
+    Attributes:
+        feedbacks (list[ChatFeedback]): The feedback data to be stored.
+    """
+
+    feedbacks: List[ChatFeedback]
+
+
+class FeedbackQuery(BaseModel):
+    """This class represents the filters and grouping of the feedback statistics and export.
+
+    Attributes:
+        group_by (str): Statistics group: "time", "model" or "label".
+        bucket (str): Time bucket of group_by "time": "hour", "day", "week", "month" or "year".
+        start (datetime)[Optional]: Only feedback created at or after start.
+        end (datetime)[Optional]: Only feedback created before end.
+        user (str)[Optional]: Only feedback of this user.
+    """
+
+    group_by: Literal["time", "model", "label"] = "time"
+    bucket: Literal["hour", "day", "week", "month", "year"] = "day"
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    user: Optional[str] = None
+
+
+@register_microservice(
+    name="opea_service@feedback_mongo",
+    endpoint="/v1/feedback/bulk_create",
+    host="0.0.0.0",
+    input_datatype=ChatFeedbackBatch,
+    port=6016,
+)
+async def bulk_create_feedback_data(batch: ChatFeedbackBatch):
+    """Stores many feedback data in database with one unordered bulk write.
+
+    Args:
+        batch (ChatFeedbackBatch): The feedback data to be stored.
+
+    Returns:
+        response (dict): Number of stored documents and the per-document errors.
+    """
+    if logflag:
+        logger.info(f"bulk feedback: {len(batch.feedbacks)} documents")
+
+    try:
+        feedback_store = FeedbackStore(user="")
+        feedback_store.initialize_storage()
+        response = await feedback_store.save_feedback_bulk(batch.feedbacks)
+
+        if logflag:
+            logger.info(response)
+        return response
+
+    except Exception as e:
+        logger.info(f"An error occurred: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@register_microservice(
+    name="opea_service@feedback_mongo",
+    endpoint="/v1/feedback/statistics",
+    host="0.0.0.0",
+    input_datatype=FeedbackQuery,
+    port=6016,
+)
+async def get_feedback_statistics(query: FeedbackQuery):
+    """Computes rating statistics in the database, grouped by time bucket, model or label.
+
+    Args:
+        query (FeedbackQuery): The grouping and filters of the statistics.
+
+    Returns:
+        JSON: One entry per group with counts, thumbs up/down, average rating and rating distribution.
+    """
+    if logflag:
+        logger.info(query)
+
+    try:
+        feedback_store = FeedbackStore(user="")
+        feedback_store.initialize_storage()
+        response = await feedback_store.rating_statistics(
+            group_by=query.group_by, bucket=query.bucket, start=query.start, end=query.end, user=query.user
+        )
+
+        if logflag:
+            logger.info(response)
+        return response
+
+    except Exception as e:
+        logger.info(f"An error occurred: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@register_microservice(
+    name="opea_service@feedback_mongo",
+    endpoint="/v1/feedback/export",
+    host="0.0.0.0",
+    input_datatype=FeedbackQuery,
+    port=6016,
+)
+async def export_feedback(query: FeedbackQuery):
+    """Streams the matching feedback data as NDJSON (one document per line).
+
+    Args:
+        query (FeedbackQuery): The filters of the export (group_by and bucket are ignored).
+
+    Returns:
+        StreamingResponse: application/x-ndjson stream of the feedback documents.
+    """
+    if logflag:
+        logger.info(query)
+
+    feedback_store = FeedbackStore(user="")
+    feedback_store.initialize_storage()
+    return StreamingResponse(
+        feedback_store.export_feedback(start=query.start, end=query.end, user=query.user),
+        media_type="application/x-ndjson",
+    )
+
+
 @register_microservice(
     name="opea_service@feedback_mongo",
     endpoint="/v1/feedback/get",
@@ -167,5 +295,19 @@ async def delete_feedback(feedback: FeedbackId):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def ensure_indexes():
+    feedback_store = FeedbackStore(user="")
+    feedback_store.initialize_storage()
+    try:
+        await feedback_store.ensure_indexes()
+    except Exception as e:
+        logger.info(f"Failed to create the feedback indexes: {str(e)}")
+
+
 if __name__ == "__main__":
+    # One Mongo client (and connection pool) for the whole service
+    app = opea_microservices["opea_service@feedback_mongo"].app
+    app.add_event_handler("startup", MongoClient.startup)
+    app.add_event_handler("startup", ensure_indexes)
+    app.add_event_handler("shutdown", MongoClient.shutdown)
     opea_microservices["opea_service@feedback_mongo"].start()
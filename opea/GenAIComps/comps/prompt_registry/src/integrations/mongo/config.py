@@ -8,3 +8,5 @@ MONGO_HOST = os.getenv("MONGO_HOST", "localhost")
 MONGO_PORT = os.getenv("MONGO_PORT", 27017)
 DB_NAME = os.getenv("DB_NAME", "OPEA")
 COLLECTION_NAME = os.getenv("COLLECTION_NAME", "Prompt")
+# Recent keyword search results kept in memory (0 disables the cache)
+PROMPT_SEARCH_CACHE_SIZE = int(os.getenv("PROMPT_SEARCH_CACHE_SIZE", 256))
@@ -3,7 +3,7 @@
 
 from typing import Any
 
-import motor.motor_asyncio as motor
+from comps.cores.storages.mongo_client import MongoClientRegistry
 
 from .config import DB_NAME, MONGO_HOST, MONGO_PORT
 
@@ -13,11 +13,18 @@ class MongoClient:
 
     @staticmethod
     def get_db_client() -> Any:
+        """Database handle on the process-wide client (its connection pool is shared by all requests)."""
         try:
-            client = motor.AsyncIOMotorClient(MongoClient.conn_url)
-            db = client[DB_NAME]
-            return db
+            return MongoClientRegistry.get_db(MongoClient.conn_url, DB_NAME)
 
         except Exception as e:
             print(e)
             raise Exception()
+
+    @staticmethod
+    async def startup() -> None:
+        await MongoClientRegistry.startup(MongoClient.conn_url)
+
+    @staticmethod
+    def shutdown() -> None:
+        MongoClientRegistry.close_all()
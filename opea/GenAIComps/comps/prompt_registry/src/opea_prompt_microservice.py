@@ -3,6 +3,7 @@
 import os
 from typing import Optional
 
+from integrations.mongo.mongo_conn import MongoClient
 from prompt_store import PromptStore
 from pydantic import BaseModel
 
@@ -31,11 +32,18 @@ class PromptId(BaseModel):
     Attributes:
         user (str): The user of the requested prompt.
         prompt_id (str): The prompt_id of prompt to be retrieved from database.
+        prompt_text (str): Keywords to search the prompts for.
+        user_only (bool): Only search the prompts of the user.
+        limit (int): Number of search results to return.
+        offset (int): Number of best search results to skip, for the next pages.
     """
 
     user: str
     prompt_id: Optional[str] = None
     prompt_text: Optional[str] = None
+    user_only: bool = False
+    limit: int = 5
+    offset: int = 0
 
 
 @register_microservice(
@@ -93,7 +101,9 @@ async def get_prompt(prompt: PromptId):
         if prompt.prompt_id is not None:
             response = await prompt_store.get_user_prompt_by_id(prompt.prompt_id)
         elif prompt.prompt_text:
-            response = await prompt_store.prompt_search(prompt.prompt_text)
+            response = await prompt_store.prompt_search(
+                prompt.prompt_text, user_only=prompt.user_only, limit=prompt.limit, offset=prompt.offset
+            )
         else:
             response = await prompt_store.get_all_prompt_of_user()
         if logflag:
@@ -139,5 +149,19 @@ async def delete_prompt(prompt: PromptId):
         return None
 
 
+async def ensure_indexes():
+    prompt_store = PromptStore(user="")
+    prompt_store.initialize_storage()
+    try:
+        await prompt_store.ensure_indexes()
+    except Exception as e:
+        logger.info(f"Failed to create the prompt indexes: {str(e)}")
+
+
 if __name__ == "__main__":
+    # One Mongo client (and connection pool) for the whole service
+    app = opea_microservices["opea_service@prompt"].app
+    app.add_event_handler("startup", MongoClient.startup)
+    app.add_event_handler("startup", ensure_indexes)
+    app.add_event_handler("shutdown", MongoClient.shutdown)
     opea_microservices["opea_service@prompt"].start()
@@ -1,11 +1,44 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+from collections import OrderedDict
 
 import bson.errors as BsonError
 from bson.objectid import ObjectId
-from integrations.mongo.config import COLLECTION_NAME
+from integrations.mongo.config import COLLECTION_NAME, PROMPT_SEARCH_CACHE_SIZE
 from integrations.mongo.mongo_conn import MongoClient
+from pymongo import ASCENDING, TEXT
+
+PROMPT_TEXT_INDEX = "prompt_text_text"
+MAX_SEARCH_RESULTS = 100
+
+
+class PromptSearchCache:
+    """In-process LRU of recent keyword search results, cleared whenever a prompt is saved or deleted."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value) -> None:
+        if self.size <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+search_cache = PromptSearchCache(PROMPT_SEARCH_CACHE_SIZE)
 
 
 class PromptStore:
@@ -13,14 +46,31 @@ class PromptStore:
     def __init__(
         self,
         user: str,
+        db_client=None,
     ):
         self.user = user
+        # shared database handle; defaults to the process-wide Mongo client
+        self.db_client = db_client
 
     def initialize_storage(self, db_type="mongo") -> None:
-        if db_type == "mongo":
+        if db_type == "mongo" and self.db_client is None:
             self.db_client = MongoClient.get_db_client()
         self.collection = self.db_client[COLLECTION_NAME]
 
+    async def ensure_indexes(self) -> None:
+        """Creates the search indexes (idempotent, called at service startup).
+
+        A collection has at most one text index: the wildcard one that prompt_search
+        used to create is replaced by a text index on prompt_text only.
+        """
+        indexes = await self.collection.index_information()
+        for name, index in indexes.items():
+            is_text = any(kind == TEXT for _, kind in index["key"])
+            if is_text and name != PROMPT_TEXT_INDEX:
+                await self.collection.drop_index(name)
+        await self.collection.create_index([("prompt_text", TEXT)], name=PROMPT_TEXT_INDEX)
+        await self.collection.create_index([("user", ASCENDING)])
+
     async def save_prompt(self, prompt) -> str:
         """Stores a new prompt into the storage.
 
@@ -38,6 +88,7 @@ class PromptStore:
                 prompt.model_dump(by_alias=True, mode="json", exclude={"id"})
             )
             prompt_id = str(inserted_prompt.inserted_id)
+            search_cache.clear()
             return prompt_id
 
         except Exception as e:
@@ -95,11 +146,14 @@ class PromptStore:
             print(e)
             raise Exception(e)
 
-    async def prompt_search(self, keyword) -> list | None:
+    async def prompt_search(self, keyword, user_only: bool = False, limit: int = 5, offset: int = 0) -> list | None:
         """Retrieves prompt from the collection based on keyword provided.
 
         Args:
             keyword (str): The keyword of prompt to search for.
+            user_only (bool): Only search the prompts of the user.
+            limit (int): Number of results to return (capped at MAX_SEARCH_RESULTS).
+            offset (int): Number of best results to skip, for the next pages.
 
         Returns:
             list | None: The list of relevant prompt if found, None otherwise.
@@ -108,14 +162,22 @@ class PromptStore:
             Exception: If there is an error while searching data.
         """
         try:
-            # Create a text index if not already created
-            self.collection.create_index([("$**", "text")])
-            # Perform text search
-            results = self.collection.find({"$text": {"$search": keyword}}, {"score": {"$meta": "textScore"}})
-            sorted_results = results.sort([("score", {"$meta": "textScore"})])
-
-            # Return a list of top 5 most relevant data
-            relevant_data = await sorted_results.to_list(length=5)
+            limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+            offset = max(0, offset)
+            cache_key = (keyword, self.user if user_only else None, limit, offset)
+            cached = search_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+
+            # Perform text search (the text index is created at startup)
+            query = {"$text": {"$search": keyword}}
+            if user_only:
+                query["user"] = self.user
+            results = self.collection.find(query, {"score": {"$meta": "textScore"}})
+            sorted_results = results.sort([("score", {"$meta": "textScore"})]).skip(offset).limit(limit)
+
+            # Return a list of the most relevant data
+            relevant_data = await sorted_results.to_list(length=limit)
 
             # Serialize data and return
             serialized_data = [
@@ -123,6 +185,7 @@ class PromptStore:
                 for doc in relevant_data
             ]
 
+            search_cache.put(cache_key, serialized_data)
             return serialized_data
 
         except Exception as e:
@@ -148,6 +211,8 @@ class PromptStore:
 
             delete_count = result.deleted_count
             print(f"Deleted {delete_count} documents!")
+            if delete_count:
+                search_cache.clear()
 
             return True if delete_count == 1 else False
 
@@ -5,7 +5,6 @@ import os
 from typing import Any, Union
 
 import openai
-from arango import ArangoClient
 from arango.database import StandardDatabase
 from fastapi import HTTPException
 from langchain_arangodb import ArangoVector
@@ -15,6 +14,7 @@ from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 from comps import CustomLogger, EmbedDoc, OpeaComponent, OpeaComponentRegistry, ServiceType
 from comps.cores.proto.api_protocol_genieai import ChatCompletionRequest, RetrievalRequest, RetrievalRequestArangoDB
+from comps.cores.storages.arango_client import ArangoConnectionManager
 
 from .config import (
     ARANGO_DB_NAME,
@@ -112,29 +112,18 @@ class OpeaArangoRetriever(OpeaComponent):
             raise HTTPException(status_code=400, detail="No LLM environment variables are set, cannot generate graphs.")
 
     def _initialize_client(self):
-        """Initialize the ArangoDB connection."""
-        self.client = ArangoClient(hosts=ARANGO_URL)
-        sys_db = self.client.db(name="_system", username=ARANGO_USERNAME, password=ARANGO_PASSWORD, verify=True)
-
-        if not sys_db.has_database(ARANGO_DB_NAME):
-            sys_db.create_database(ARANGO_DB_NAME)
-
-        self.db = self.client.db(name=ARANGO_DB_NAME, username=ARANGO_USERNAME, password=ARANGO_PASSWORD, verify=True)
-        if logflag:
-            logger.info(f"Connected to ArangoDB {self.db.version()}.")
+        """Initialize the ArangoDB connection, shared by the ArangoDB components of the process (with retry logic)."""
+        self.client = ArangoConnectionManager.get_client(ARANGO_URL)
+        self.db = ArangoConnectionManager.get_db(ARANGO_URL, ARANGO_DB_NAME, ARANGO_USERNAME, ARANGO_PASSWORD)
 
     def check_health(self) -> bool:
         """Checks the health of the retriever service."""
         if logflag:
             logger.info("[ check health ] start to check health of ArangoDB")
-        try:
-            version = self.db.version()
-            if logflag:
-                logger.info(f"[ check health ] Successfully connected to ArangoDB {version}!")
-            return True
-        except Exception as e:
-            logger.info(f"[ check health ] Failed to connect to ArangoDB: {e}")
-            return False
+        healthy = ArangoConnectionManager.check_health(self.db, ARANGO_URL)
+        if healthy and logflag:
+            logger.info("[ check health ] Successfully connected to ArangoDB!")
+        return healthy
 
     def fetch_neighborhoods(
         self,
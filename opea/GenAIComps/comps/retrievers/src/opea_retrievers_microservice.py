@@ -43,6 +43,7 @@ from comps.cores.proto.api_protocol_genieai import (
     RetrievalResponse,
     RetrievalResponseData,
 )
+from comps.cores.storages.arango_client import ArangoConnectionManager
 
 logger = CustomLogger("opea_retrievers_microservice")
 logflag = os.getenv("LOGFLAG", False)
@@ -123,4 +124,7 @@ async def retrieve_docs(
 
 if __name__ == "__main__":
     logger.info("OPEA Retriever Microservice is starting...")
+    app = opea_microservices["opea_service@retrievers"].app
+    # Close the shared ArangoDB connection pools
+    app.add_event_handler("shutdown", ArangoConnectionManager.close_all)
     opea_microservices["opea_service@retrievers"].start()
\ No newline at end of file
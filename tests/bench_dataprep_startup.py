@@ -0,0 +1,77 @@
+"""
+Cold-start benchmark of the dataprep extraction stack.
+
+Run inside the dataprep container (where `comps` is importable):
+
+    python bench_dataprep_startup.py
+
+Every configuration is measured in a fresh interpreter: time to import the
+dataprep utils module, time until the configured warm-up finished, and the RSS
+of the process tree (service process + PDF/OCR worker processes) at that point.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+CONFIGS = [
+    {"CONTENT_EXTRACTION_METHOD": "opea", "DATAPREP_WARMUP": "none"},
+    {"CONTENT_EXTRACTION_METHOD": "docling", "DATAPREP_WARMUP": "none"},
+    {"CONTENT_EXTRACTION_METHOD": "docling", "DATAPREP_WARMUP": "auto"},
+    {"CONTENT_EXTRACTION_METHOD": "opea", "DATAPREP_WARMUP": "ocr"},
+    {"CONTENT_EXTRACTION_METHOD": "docling", "DATAPREP_WARMUP": "docling,ocr"},
+]
+
+CHILD = r"""
+import json, os, time
+
+def rss_tree_mb(pid):
+    total = 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                total += int(line.split()[1])
+    children = f"/proc/{pid}/task/{pid}/children"
+    if os.path.exists(children):
+        with open(children) as f:
+            for child in f.read().split():
+                try:
+                    total += rss_tree_mb(int(child)) * 1024
+                except FileNotFoundError:
+                    pass
+    return total / 1024
+
+start = time.perf_counter()
+from comps.dataprep.src import genieai_dataprep_utils as utils
+imported = time.perf_counter()
+rss_import = rss_tree_mb(os.getpid())
+
+thread = utils.start_background_warmup()
+if thread is not None:
+    thread.join()
+ready = time.perf_counter()
+
+print(json.dumps({
+    "import_seconds": round(imported - start, 2),
+    "warmup_seconds": round(ready - imported, 2),
+    "rss_after_import_mb": round(rss_import, 1),
+    "rss_ready_mb": round(rss_tree_mb(os.getpid()), 1),
+}))
+"""
+
+results = []
+for config in CONFIGS:
+    env = {**os.environ, **config}
+    proc = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f"{config} failed:\n{proc.stderr}")
+        continue
+    result = {**config, **json.loads(proc.stdout.strip().splitlines()[-1])}
+    results.append(result)
+    print(result)
+
+with open("dataprep_startup_bench.json", "w") as f:
+    json.dump(results, f, indent=2)
+
+print("Saved dataprep_startup_bench.json")
@@ -0,0 +1,102 @@
+"""
+Benchmark of the crawler text cleanup (html_main_content and uni_pro).
+
+Run inside the dataprep container (where `comps` is importable):
+
+    python bench_html_cleanup.py [URL or saved .html file ...]
+
+Every page is fetched (or read) once, then the previous implementations and
+the current ones are timed on the same parsed pages. Without arguments a few
+public government pages are crawled.
+"""
+
+import re
+import sys
+import time
+import unicodedata
+
+from comps.dataprep.src.utils import Crawler, html_main_content, uni_pro
+
+DEFAULT_PAGES = [
+    "https://www.gov.uk/browse/benefits",
+    "https://www.usa.gov/benefits",
+    "https://europa.eu/youreurope/citizens/index_en.htm",
+    "https://www.itu.int/en/about/Pages/default.aspx",
+]
+
+
+def legacy_uni_pro(text):
+    normalized_text = unicodedata.normalize("NFKD", text)
+    filtered_text = ""
+    for char in normalized_text:
+        if ord(char) < 128 or unicodedata.category(char) == "Mn":
+            filtered_text += char
+    return filtered_text
+
+
+def legacy_html_main_content(soup, crawler):
+    all_text = crawler.clean_text(soup.select_one("body").text)
+    main_content = ""
+    for element_name in ["main", "container"]:
+        main_block = None
+        if soup.select(f".{element_name}"):
+            main_block = soup.select(f".{element_name}")
+        elif soup.select(f"#{element_name}"):
+            main_block = soup.select(f"#{element_name}")
+        if main_block:
+            for element in main_block:
+                text = crawler.clean_text(element.text)
+                if text not in main_content:
+                    main_content += f"\n{text}"
+            main_content = crawler.clean_text(main_content)
+    main_content = all_text if main_content == "" else main_content
+    main_content = main_content.replace("\n", "")
+    main_content = main_content.replace("\n\n", "")
+    main_content = re.sub(r"\s+", " ", main_content)
+    return main_content
+
+
+def load_pages(sources):
+    crawler = Crawler()
+    pages = []
+    for source in sources:
+        if re.match(r"^https?://", source):
+            res = crawler.fetch(source)
+            if res is None:
+                print(f"skipped {source}: fetch failed")
+                continue
+            html = res.text
+        else:
+            with open(source, "r", encoding="utf-8", errors="ignore") as f:
+                html = f.read()
+        pages.append((source, html, crawler.parse(html)))
+    return crawler, pages
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+crawler, pages = load_pages(sys.argv[1:] or DEFAULT_PAGES)
+if not pages:
+    sys.exit("no page could be loaded")
+
+totals = {"legacy": 0.0, "current": 0.0}
+for source, html, soup in pages:
+    legacy_seconds, legacy = timed(lambda: legacy_uni_pro(legacy_html_main_content(soup, crawler)))
+    current_seconds, current = timed(lambda: uni_pro(html_main_content(soup, crawler)))
+    totals["legacy"] += legacy_seconds
+    totals["current"] += current_seconds
+    same = "same text" if legacy == current else f"text differs ({len(legacy)} -> {len(current)} chars)"
+    print(
+        f"{source}: {len(html) / 1e3:.0f} kB html, "
+        f"legacy {legacy_seconds * 1000:.1f} ms, current {current_seconds * 1000:.1f} ms, {same}"
+    )
+
+print(f"total: legacy {totals['legacy'] * 1000:.1f} ms, current {totals['current'] * 1000:.1f} ms, "
+      f"speed-up {totals['legacy'] / totals['current']:.1f}x")
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark of the dataprep chunk screen (is_valid_content).
+
+Run inside the dataprep container (where `comps` is importable):
+
+    python bench_is_valid_content.py
+
+Compares the previous per-line / per-character implementation with the
+regex + translate-table one on a synthetic document mixing prose, MIME
+headers and base64 blocks, and checks that both accept/reject the same chunks.
+"""
+
+import base64
+import os
+import random
+import time
+
+from comps.dataprep.src.genieai_dataprep_utils import is_valid_content, validate_chunks
+
+
+def legacy_is_valid_content(chunk):
+    if not chunk:
+        return False
+    lines = chunk.split('\n')
+    problematic_lines = 0
+    for line in lines:
+        line = line.strip()
+        if (line.startswith('//') or
+            'base64' in line.lower() or
+            'MIME-Version' in line or
+            'Content-Type:' in line or
+            'Content-Transfer-Encoding' in line or
+            line.startswith('------=_NextPart_') or
+            (len(line) > 50 and line.replace('+', '').replace('/', '').replace('=', '').isalnum())):
+            problematic_lines += 1
+    if len(lines) > 0 and problematic_lines / len(lines) > 0.5:
+        return False
+    readable_chars = sum(1 for char in chunk if char.isalnum() or char.isspace())
+    if len(chunk) > 0 and readable_chars / len(chunk) < 0.7:
+        return False
+    return True
+
+
+def make_chunks(count=5000, size=1000, seed=42):
+    random.seed(seed)
+    words = "the citizen must submit the application form to the local authority office within thirty days".split()
+    chunks = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            text = " ".join(random.choice(words) for _ in range(size // 6))
+        elif kind == 1:
+            text = "MIME-Version: 1.0\nContent-Type: text/html\nContent-Transfer-Encoding: base64\n\n"
+            text += base64.encodebytes(os.urandom(size)).decode("ascii")
+        elif kind == 2:
+            text = "Procedura de înregistrare și eliberare a certificatului fiscal. " * (size // 64)
+        else:
+            text = "// comment\n" + " ".join(random.choice(words) for _ in range(size // 12)) + " ;;;{}[]" * 20
+        chunks.append(text[:size])
+    return chunks
+
+
+def timed(fn, chunks, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+chunks = make_chunks()
+total_mb = sum(len(c) for c in chunks) / 1e6
+
+legacy_seconds, legacy = timed(lambda cs: [legacy_is_valid_content(c) for c in cs], chunks)
+single_seconds, single = timed(lambda cs: [is_valid_content(c) for c in cs], chunks)
+batch_seconds, batch = timed(validate_chunks, chunks)
+
+assert legacy == single == batch, "accept/reject decisions differ"
+print(f"{len(chunks)} chunks, {total_mb:.1f} MB, {sum(batch)} valid")
+print(f"legacy : {legacy_seconds * 1000:.1f} ms ({total_mb / legacy_seconds:.1f} MB/s)")
+print(f"single : {single_seconds * 1000:.1f} ms ({total_mb / single_seconds:.1f} MB/s)")
+print(f"batch  : {batch_seconds * 1000:.1f} ms ({total_mb / batch_seconds:.1f} MB/s)")
+print(f"speed-up: {legacy_seconds / batch_seconds:.1f}x")